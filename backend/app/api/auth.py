@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 import jwt
 from datetime import datetime, timedelta
 import os
 
+from app import crud
 from app.database import get_db
-from app.models import User
+from app.models import RevokedToken, User
+from app.services.passwords import MAX_PASSWORD_BYTES, PasswordHasherBusy, password_hasher
+from app.services.token_cache import Principal, token_cache, token_fingerprint
 
 router = APIRouter()
 
@@ -17,24 +22,36 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Roles allowed to create, delete and re-role other users
+MANAGER_ROLES = {"admin", "manager"}
+# Every self-registered account starts here; only a manager can change it (PUT /users/{id})
+REGISTERED_USER_ROLE = "sales_rep"
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
+    user_id: int
+    exp: float
 
 class UserCreate(BaseModel):
     username: str
     email: str
     password: str
-    role: str = "sales_rep"
+
+    @field_validator("password")
+    @classmethod
+    def password_fits_bcrypt(cls, password: str) -> str:
+        if not 8 <= len(password.encode()) <= MAX_PASSWORD_BYTES:
+            raise ValueError(f"Password must be between 8 and {MAX_PASSWORD_BYTES} bytes")
+        return password
 
 class UserResponse(BaseModel):
     id: int
-    username: str
+    name: str
     email: str
     role: str
     slack_user_id: Optional[str] = None
@@ -49,7 +66,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+def decode_access_token(token: str) -> TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,45 +74,131 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except jwt.PyJWTError:
+        return TokenData(user_id=int(payload["sub"]), exp=payload["exp"])
+    except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+        raise credentials_exception
+
+async def sync_user_changes(db: AsyncSession, since: datetime):
+    """Evict cached tokens of users whose profile changed (on any worker) since the last read"""
+    read_at = datetime.utcnow()
+    changed = (await db.scalars(select(User.id).where(User.auth_changed_at >= since))).all()
+    token_cache.apply_changes(changed, read_at)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    """The user a bearer token belongs to.
+
+    Tokens seen recently resolve from token_cache without decoding or a
+    query; the session only connects on a miss, or on a hit when the
+    once-a-second read of users.auth_changed_at is due. A changed role shows
+    up at once on the worker that changed it (see users.update_user) and on
+    the others at that next read. A logout on another worker is seen on the
+    next miss, via revoked_tokens.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if token_cache.is_revoked(token):
+        raise credentials_exception
+    principal = token_cache.get(token)
+    if principal is not None:
+        since = token_cache.sync_due()
+        if since is None:
+            return principal
+        await sync_user_changes(db, since)
+        principal = token_cache.get(token)
+        if principal is not None:
+            return principal
+
+    token_data = decode_access_token(token)
+    # The user and the shared revocation check in one query
+    user = await db.scalar(select(User).where(
+        User.id == token_data.user_id,
+        ~exists().where(RevokedToken.token_hash == token_fingerprint(token)),
+    ))
+    if user is None:
         raise credentials_exception
-    
-    # In a real app, you'd query the database for the user
-    # For now, return a mock user
-    return {"username": token_data.username, "id": 1, "role": "sales_rep"}
+    principal = Principal.model_validate(user)
+    token_cache.put(token, principal, token_data.exp)
+    return principal
+
+def require_manager(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """The current user, if they may manage other accounts and roles"""
+    if current_user.role not in MANAGER_ROLES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Requires a manager or admin account")
+    return current_user
+
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    # In a real app, you'd verify the user credentials against the database
-    # For now, accept any username/password for demo purposes
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    # The username field carries the user's email
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    try:
+        # bcrypt runs on the hasher's thread pool; unknown users still pay for a (dummy) check
+        verified = await password_hasher.verify(form_data.password, user.password_hash if user else None)
+        if verified and password_hasher.needs_rehash(user.password_hash):
+            # BCRYPT_ROUNDS changed since this password was set
+            await crud.update(db, User, user.id, {"password_hash": await password_hasher.hash(form_data.password)})
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": form_data.username}, expires_delta=access_token_expires
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme), current_user: Principal = Depends(get_current_user),
+                 db: AsyncSession = Depends(get_db)):
+    """Revoke the bearer token used for this request, on every worker"""
+    token_data = decode_access_token(token)
+    token_cache.revoke(token, token_data.exp)
+    now = datetime.utcnow()
+    # Expired tokens fail verification on their own; stop tracking them
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+    try:
+        await db.execute(insert(RevokedToken).values(
+            token_hash=token_fingerprint(token),
+            user_id=current_user.id,
+            expires_at=datetime.utcfromtimestamp(token_data.exp),
+            revoked_at=now,
+        ))
+        await db.commit()
+    except IntegrityError:
+        # Already revoked by a concurrent logout with the same token
+        await db.rollback()
+    return {"message": "Logged out"}
+
 @router.post("/register", response_model=UserResponse)
 async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
-    # In a real app, you'd create the user in the database
-    # For now, return a mock response
-    return {
-        "id": 1,
-        "username": user.username,
-        "email": user.email,
-        "role": user.role,
-        "slack_user_id": None
-    }
+    try:
+        password_hash = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    try:
+        return await crud.create(db, User, {
+            "name": user.username,
+            "email": user.email,
+            "role": REGISTERED_USER_ROLE,
+            "password_hash": password_hash,
+        })
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="A user with that email already exists")
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: dict = Depends(get_current_user)):
-    return {
-        "id": current_user["id"],
-        "username": current_user["username"],
-        "email": f"{current_user['username']}@example.com",
-        "role": current_user["role"],
-        "slack_user_id": None
-    } 
\ No newline at end of file
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
+    return current_user
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+from app import crud
+from app.database import get_db
+from app.models import Goal
+from app.schemas import Goal as GoalResponse, GoalCreate, GoalUpdate
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 200
+
+class GoalPage(BaseModel):
+    items: List[GoalResponse]
+    next_cursor: Optional[int] = None
+    limit: int
+
+@router.get("/", response_model=GoalPage)
+async def get_goals(
+    owner_id: Optional[int] = Query(None, description="Only goals owned by this user"),
+    project_id: Optional[int] = Query(None, description="Only goals in this project"),
+    week_start: Optional[date] = Query(None, description="Only goals for the week starting on this date"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List goals in id order"""
+    goals, next_cursor = await crud.page(
+        db, Goal, limit, cursor, owner_id=owner_id, project_id=project_id, week_start=week_start
+    )
+    return GoalPage(items=goals, next_cursor=next_cursor, limit=limit)
+
+@router.post("/", response_model=GoalResponse)
+async def create_goal(goal: GoalCreate, db: AsyncSession = Depends(get_db)):
+    """Create a new goal"""
+    try:
+        return await crud.create(db, Goal, goal.model_dump())
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid owner or project: {e.orig}")
+
+@router.get("/{goal_id}", response_model=GoalResponse)
+async def get_goal(goal_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a specific goal"""
+    goal = await crud.get(db, Goal, goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return goal
+
+@router.put("/{goal_id}", response_model=GoalResponse)
+async def update_goal(goal_id: int, goal: GoalUpdate, db: AsyncSession = Depends(get_db)):
+    """Update a goal"""
+    updated = await crud.update(db, Goal, goal_id, goal.model_dump(exclude_unset=True))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return updated
+
+@router.delete("/{goal_id}")
+async def delete_goal(goal_id: int, db: AsyncSession = Depends(get_db)):
+    """Delete a goal"""
+    if not await crud.delete(db, Goal, goal_id):
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return {"message": f"Goal {goal_id} deleted successfully"}
@@ -1,99 +1,192 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import case, delete, exists, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import date, datetime
+import hashlib
+import os
 
+from app import crud
 from app.database import get_db
-from app.models import Project
+from app.models import Project, Task, Goal
+from app.responses import JSON_MEDIA_TYPE
+from app.schemas import ORMModel, ProjectCreate, ProjectUpdate
+from app.services.task_operations import TASK_STATUSES
 
 router = APIRouter()
 
-class ProjectCreate(BaseModel):
-    name: str
-    description: Optional[str] = None
-    start_date: Optional[datetime] = None
-    end_date: Optional[datetime] = None
-
-class ProjectUpdate(BaseModel):
-    name: Optional[str] = None
-    description: Optional[str] = None
-    start_date: Optional[datetime] = None
-    end_date: Optional[datetime] = None
+# How long clients may reuse a project list/detail response before revalidating with If-None-Match
+PROJECTS_CACHE_MAX_AGE = int(os.getenv("PROJECTS_CACHE_MAX_AGE", "30"))
+MAX_PAGE_SIZE = 200
 
-class ProjectResponse(BaseModel):
+class ProjectResponse(ORMModel):
     id: int
     name: str
     description: Optional[str] = None
-    start_date: Optional[datetime] = None
-    end_date: Optional[datetime] = None
-    created_at: datetime
-    updated_at: datetime
-
-@router.get("/", response_model=List[ProjectResponse])
-async def get_projects(db: AsyncSession = Depends(get_db)):
-    """Get all projects"""
-    # In a real app, you'd query the database
-    # For now, return mock data
-    return [
-        {
-            "id": 1,
-            "name": "Q4 Sales Campaign",
-            "description": "End of year sales push",
-            "start_date": datetime.now(),
-            "end_date": None,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    owner_id: int
+    created_at: Optional[datetime] = None
+    tasks_total: int = 0
+    task_counts: Dict[str, int] = Field(default_factory=lambda: dict.fromkeys(TASK_STATUSES, 0))
+    goals_total: int = 0
+    goals_achieved: int = 0
+
+class ProjectPage(BaseModel):
+    items: List[ProjectResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
+def _status_key(status: str) -> str:
+    return "tasks_" + status.lower().replace(" ", "_")
+
+
+def project_page_query(limit: int = 50, cursor: Optional[int] = None, owner_id: Optional[int] = None,
+                       project_id: Optional[int] = None):
+    """Newest-first page of projects with their task and goal counts, one extra row to detect a next page.
+
+    The page of project ids is picked first; task and goal counts are then
+    aggregated for just those ids in one GROUP BY each and joined back, so a
+    page costs one query no matter how many projects it holds (instead of
+    lazy-loading Project.tasks and Project.goals per row).
+    """
+    page = select(Project.id)
+    if owner_id is not None:
+        page = page.where(Project.owner_id == owner_id)
+    if project_id is not None:
+        page = page.where(Project.id == project_id)
+    if cursor is not None:
+        page = page.where(Project.id < cursor)
+    page = page.order_by(Project.id.desc()).limit(limit + 1).subquery("page")
+
+    task_counts = (
+        select(
+            Task.project_id,
+            func.count().label("tasks_total"),
+            *(func.count(case((Task.status == status, 1))).label(_status_key(status)) for status in TASK_STATUSES),
+        )
+        .where(Task.project_id.in_(select(page.c.id)))
+        .group_by(Task.project_id)
+        .subquery("task_counts")
+    )
+    goal_counts = (
+        select(
+            Goal.project_id,
+            func.count().label("goals_total"),
+            func.count(case((Goal.achieved.is_(True), 1))).label("goals_achieved"),
+        )
+        .where(Goal.project_id.in_(select(page.c.id)))
+        .group_by(Goal.project_id)
+        .subquery("goal_counts")
+    )
+
+    counts = [
+        func.coalesce(task_counts.c[name], 0).label(name)
+        for name in ("tasks_total", *(_status_key(status) for status in TASK_STATUSES))
+    ] + [
+        func.coalesce(goal_counts.c[name], 0).label(name) for name in ("goals_total", "goals_achieved")
     ]
+    return (
+        select(*Project.__table__.columns, *counts)
+        .join(page, page.c.id == Project.id)
+        .outerjoin(task_counts, task_counts.c.project_id == Project.id)
+        .outerjoin(goal_counts, goal_counts.c.project_id == Project.id)
+        .order_by(Project.id.desc())
+    )
+
+
+def project_from_row(row) -> ProjectResponse:
+    return ProjectResponse(
+        id=row["id"],
+        name=row["name"],
+        description=row["description"],
+        start_date=row["start_date"],
+        end_date=row["end_date"],
+        owner_id=row["owner_id"],
+        created_at=row["created_at"],
+        tasks_total=row.get("tasks_total", 0),
+        task_counts={status: row.get(_status_key(status), 0) for status in TASK_STATUSES},
+        goals_total=row.get("goals_total", 0),
+        goals_achieved=row.get("goals_achieved", 0),
+    )
+
+
+def cacheable(request: Request, payload: BaseModel) -> Response:
+    """Serialize the payload once, tag it with an ETag of those bytes, and answer 304 when the client already has it"""
+    body = payload.model_dump_json()
+    etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={PROJECTS_CACHE_MAX_AGE}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+async def load_project(db: AsyncSession, project_id: int) -> ProjectResponse:
+    row = (await db.execute(project_page_query(1, project_id=project_id))).mappings().first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project_from_row(row)
+
+
+@router.get("/", response_model=ProjectPage)
+async def get_projects(
+    request: Request,
+    owner_id: Optional[int] = Query(None, description="Only projects owned by this user"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List projects newest first with task counts by status and goal counts"""
+    try:
+        after_id = int(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = (await db.execute(project_page_query(limit, after_id, owner_id=owner_id))).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]["id"])
+    page = ProjectPage(items=[project_from_row(row) for row in rows], next_cursor=next_cursor, limit=limit)
+    return cacheable(request, page)
 
 @router.post("/", response_model=ProjectResponse)
 async def create_project(project: ProjectCreate, db: AsyncSession = Depends(get_db)):
     """Create a new project"""
-    # In a real app, you'd create the project in the database
-    # For now, return mock data
-    return {
-        "id": 1,
-        "name": project.name,
-        "description": project.description,
-        "start_date": project.start_date,
-        "end_date": project.end_date,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    try:
+        return await crud.create(db, Project, project.model_dump())
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid owner: {e.orig}")
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: int, db: AsyncSession = Depends(get_db)):
-    """Get a specific project"""
-    # In a real app, you'd query the database
-    # For now, return mock data
-    return {
-        "id": project_id,
-        "name": "Q4 Sales Campaign",
-        "description": "End of year sales push",
-        "start_date": datetime.now(),
-        "end_date": None,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+async def get_project(project_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get a specific project with its task and goal counts"""
+    return cacheable(request, await load_project(db, project_id))
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(project_id: int, project: ProjectUpdate, db: AsyncSession = Depends(get_db)):
     """Update a project"""
-    # In a real app, you'd update the project in the database
-    # For now, return mock data
-    return {
-        "id": project_id,
-        "name": project.name or "Q4 Sales Campaign",
-        "description": project.description or "End of year sales push",
-        "start_date": project.start_date or datetime.now(),
-        "end_date": project.end_date,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    if await crud.update(db, Project, project_id, project.model_dump(exclude_unset=True)) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return await load_project(db, project_id)
 
 @router.delete("/{project_id}")
 async def delete_project(project_id: int, db: AsyncSession = Depends(get_db)):
-    """Delete a project"""
-    # In a real app, you'd delete the project from the database
-    return {"message": f"Project {project_id} deleted successfully"} 
\ No newline at end of file
+    """Delete a project that has no tasks or goals left"""
+    result = await db.execute(
+        delete(Project).where(
+            Project.id == project_id,
+            ~exists().where(Task.project_id == project_id),
+            ~exists().where(Goal.project_id == project_id),
+        )
+    )
+    await db.commit()
+    if result.rowcount == 0:
+        if await db.scalar(select(Project.id).where(Project.id == project_id)) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise HTTPException(status_code=409, detail="Project still has tasks or goals")
+    return {"message": f"Project {project_id} deleted successfully"}
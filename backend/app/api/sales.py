@@ -4,13 +4,22 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime
 from pydantic import BaseModel
+import logging
+import pytz
 
 from app.database import get_db
-from app.services.sales_agent import SalesAgentService
+from app.services.sales_agent import SalesAgentService, get_sales_agent
+from app.services.sales_metrics import SalesMetricsService, week_start_for
 from app.services.scheduler import sales_scheduler
+from app.services.job_ledger import JobLedger
+from app.services.slack_service import SlackService, get_slack_service
+from app.nlp import goal_parser
+from app.responses import json_response, model_response
 from app.models import User, WeeklyGoal, SalesConversation, TeamLeaderboard
 from app.services.auto_sync_users import auto_sync_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["Sales Agent"])
 
 
@@ -58,6 +67,22 @@ class WeeklyProgressResponse(BaseModel):
     rank: Optional[int] = None
 
 
+_PROGRESS_COUNTS = ("calls_target", "calls_completed", "demos_target", "demos_completed",
+                    "proposals_target", "proposals_completed")
+_PROGRESS_PERCENTAGES = ("calls_percentage", "demos_percentage", "proposals_percentage", "overall_percentage")
+
+
+def progress_row(user_id: int, user_name: str, week_start: date, progress: Dict, rank: Optional[int] = None) -> Dict:
+    """A WeeklyProgressResponse as a plain dict, zero-filled where progress is missing"""
+    row = {"user_id": user_id, "user_name": user_name, "week_start": week_start}
+    for field in _PROGRESS_COUNTS:
+        row[field] = int(progress.get(field, 0))
+    for field in _PROGRESS_PERCENTAGES:
+        row[field] = float(progress.get(field, 0.0))
+    row["rank"] = rank
+    return row
+
+
 class LeaderboardEntry(BaseModel):
     user_id: int
     name: str
@@ -68,10 +93,17 @@ class LeaderboardEntry(BaseModel):
     total_score: float
 
 
+_LEADERBOARD_SCORES = ("overall_pct", "calls_pct", "demos_pct", "proposals_pct", "total_score")
+
+
 class MessageRequest(BaseModel):
     message: str
 
 
+class TimezoneRequest(BaseModel):
+    timezone: str
+
+
 # ================== MANUAL TRIGGERS ==================
 
 @router.post("/triggers/monday-prompts", response_model=SalesResponse)
@@ -79,7 +111,7 @@ async def trigger_monday_prompts():
     """Manually trigger Monday goal-setting prompts for all sales reps"""
     try:
         # Run the scheduled job manually
-        await sales_scheduler.monday_goal_prompts()
+        await sales_scheduler.monday_goal_prompts(manual=True)
         return SalesResponse(
             success=True,
             message="Monday goal prompts sent to all sales reps",
@@ -93,7 +125,7 @@ async def trigger_monday_prompts():
 async def trigger_wednesday_nudges():
     """Manually trigger Wednesday coaching nudges"""
     try:
-        await sales_scheduler.wednesday_nudges()
+        await sales_scheduler.wednesday_nudges(manual=True)
         return SalesResponse(
             success=True,
             message="Wednesday coaching nudges sent",
@@ -107,7 +139,7 @@ async def trigger_wednesday_nudges():
 async def trigger_friday_summaries():
     """Manually trigger Friday weekly summaries and leaderboard generation"""
     try:
-        await sales_scheduler.friday_summaries()
+        await sales_scheduler.friday_summaries(manual=True)
         return SalesResponse(
             success=True,
             message="Friday summaries and leaderboards generated",
@@ -121,7 +153,7 @@ async def trigger_friday_summaries():
 async def trigger_milestone_check():
     """Manually trigger milestone achievement check"""
     try:
-        await sales_scheduler.daily_milestone_check()
+        await sales_scheduler.daily_milestone_check(manual=True)
         return SalesResponse(
             success=True,
             message="Milestone check completed",
@@ -134,14 +166,15 @@ async def trigger_milestone_check():
 # ================== GOAL MANAGEMENT ==================
 
 @router.post("/goals/{user_id}/set", response_model=SalesResponse)
-async def set_user_goals(
+def set_user_goals(
     user_id: int,
     goals: SalesGoalsRequest,
-    db: AsyncSession = Depends(get_db)
+    sales_agent: SalesAgentService = Depends(get_sales_agent)
 ):
     """Set weekly goals for a specific user"""
     try:
-        sales_agent = SalesAgentService(db)
+        if not sales_agent.db.get(User, user_id):
+            raise HTTPException(status_code=404, detail="User not found")
         
         # Create goals text similar to what a user would respond with
         goals_text = f"I'll do {goals.calls} calls, {goals.demos} demos, and {goals.proposals} proposals this week"
@@ -149,48 +182,59 @@ async def set_user_goals(
             goals_text += f". {goals.stretch_goal}"
         
         # Parse and create tasks
-        parsed_goals = await sales_agent.parse_sales_response(goals_text)
-        tasks_created = await sales_agent.create_weekly_sales_tasks(user_id, parsed_goals)
+        parsed_goals = goal_parser.parse(goals_text)
+        tasks_created = sales_agent.create_weekly_sales_tasks(
+            user_id, sales_agent.get_current_week_start(), parsed_goals
+        )
         
         return SalesResponse(
             success=True,
             message=f"Goals set successfully for user {user_id}",
             data={
                 "goals": parsed_goals,
-                "tasks_created": len(tasks_created),
-                "tasks": [{"id": task.id, "title": task.title} for task in tasks_created]
+                "tasks_created": tasks_created
             }
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set goals: {str(e)}")
 
 
 @router.get("/goals/{user_id}/current", response_model=WeeklyProgressResponse)
-async def get_current_goals(user_id: int, db: AsyncSession = Depends(get_db)):
+def get_current_goals(user_id: int, sales_agent: SalesAgentService = Depends(get_sales_agent)):
     """Get current week's goals and progress for a user"""
     try:
-        from sqlalchemy import select
-        sales_agent = SalesAgentService(db)
-        week_start = sales_agent.get_current_week_start()
-        progress = await sales_agent.get_weekly_progress(user_id, week_start)
-        
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = sales_agent.db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        return WeeklyProgressResponse(
+        week_start = sales_agent.get_current_week_start()
+        progress = sales_agent.get_weekly_progress(user_id, week_start)
+        
+        # Validated once here, then serialized by pydantic-core without FastAPI re-validating it
+        return model_response(WeeklyProgressResponse(
             user_id=user_id,
             user_name=user.name,
             week_start=week_start,
             **progress
-        )
+        ))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get goals: {str(e)}")
 
 
+@router.get("/goals/parser/stats", response_model=SalesResponse)
+async def get_goal_parser_stats():
+    """How many goal replies were parsed from cache, by the fast path, or by the LLM"""
+    return SalesResponse(
+        success=True,
+        message="Goal parser stats retrieved",
+        data=goal_parser.stats()
+    )
+
+
 # ================== PROGRESS TRACKING ==================
 
 @router.post("/progress/{user_id}/update", response_model=SalesResponse)
@@ -241,64 +285,36 @@ async def update_progress(
 
 
 @router.get("/progress/team", response_model=List[WeeklyProgressResponse])
-async def get_team_progress(
-    week_start: Optional[date] = Query(None, description="Week start date (defaults to current week)")
+def get_team_progress(
+    week_start: Optional[date] = Query(None, description="Week start date (defaults to current week)"),
+    sales_agent: SalesAgentService = Depends(get_sales_agent)
 ):
     """Get progress for entire sales team"""
     try:
-        # Use sync session for SalesAgentService compatibility
-        sync_db = get_sync_session()
-        try:
-            sales_agent = SalesAgentService(sync_db)
-            
-            if not week_start:
-                week_start = sales_agent.get_current_week_start()
-            
-            # Get all sales users using sync session
-            sales_users = sync_db.query(User).filter(User.role == "sales").all()
-            
-            team_progress = []
-            for user in sales_users:
-                try:
-                    progress = sales_agent.get_weekly_progress(user.id, week_start)
-                    team_progress.append(WeeklyProgressResponse(
-                        user_id=user.id,
-                        user_name=user.name,
-                        week_start=week_start,
-                        **progress
-                    ))
-                except Exception as user_error:
-                    # Handle individual user progress errors gracefully
-                    print(f"Error getting progress for user {user.name}: {user_error}")
-                    # Add empty progress for user
-                    team_progress.append(WeeklyProgressResponse(
-                        user_id=user.id,
-                        user_name=user.name,
-                        week_start=week_start,
-                        calls_target=0,
-                        calls_completed=0,
-                        calls_percentage=0.0,
-                        demos_target=0,
-                        demos_completed=0,
-                        demos_percentage=0.0,
-                        proposals_target=0,
-                        proposals_completed=0,
-                        proposals_percentage=0.0,
-                        overall_percentage=0.0
-                    ))
-            
-            # Sort by overall percentage descending
-            team_progress.sort(key=lambda x: x.overall_percentage, reverse=True)
-            
-            # Add ranks
-            for rank, progress in enumerate(team_progress, 1):
-                progress.rank = rank
-            
-            return team_progress
-        finally:
-            sync_db.close()
+        if not week_start:
+            week_start = sales_agent.get_current_week_start()
+        
+        # Get all sales users using sync session
+        sales_users = sales_agent.db.query(User).filter(User.role == "sales").all()
+        
+        # Every rep's progress from one grouped query instead of one query per rep
+        progress_by_user = sales_agent.get_team_weekly_progress([user.id for user in sales_users], week_start)
+        team_progress = [
+            progress_row(user.id, user.name, week_start, progress_by_user[user.id]) for user in sales_users
+        ]
+        
+        # Sort by overall percentage descending
+        team_progress.sort(key=lambda row: row["overall_percentage"], reverse=True)
+        
+        # Add ranks
+        for rank, row in enumerate(team_progress, 1):
+            row["rank"] = rank
+        
+        # Rows are built to WeeklyProgressResponse's shape; encode them directly
+        # instead of validating a model per rep and then re-validating the list
+        return json_response(team_progress)
     except Exception as e:
-        print(f"Database error in get_team_progress: {e}")
+        logger.error("Database error in get_team_progress: %s", e)
         # Return empty team progress instead of 500 error
         return []
 
@@ -306,21 +322,19 @@ async def get_team_progress(
 # ================== LEADERBOARD ==================
 
 @router.get("/leaderboard/current", response_model=List[LeaderboardEntry])
-async def get_current_leaderboard():
+def get_current_leaderboard(sales_agent: SalesAgentService = Depends(get_sales_agent)):
     """Get current week's leaderboard"""
     try:
-        # Use sync session for SalesAgentService compatibility
-        sync_db = get_sync_session()
-        try:
-            sales_agent = SalesAgentService(sync_db)
-            week_start = sales_agent.get_current_week_start()
-            leaderboard = sales_agent.get_team_leaderboard(week_start)
-            
-            return [LeaderboardEntry(**entry) for entry in leaderboard]
-        finally:
-            sync_db.close()
+        week_start = sales_agent.get_current_week_start()
+        leaderboard = sales_agent.get_team_leaderboard(week_start)
+        
+        return json_response([
+            {"user_id": entry["user_id"], "name": entry["name"],
+             **{field: float(entry[field]) for field in _LEADERBOARD_SCORES}}
+            for entry in leaderboard
+        ])
     except Exception as e:
-        print(f"Error generating leaderboard: {e}")
+        logger.error("Error generating leaderboard: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get leaderboard: {str(e)}")
 
 
@@ -371,15 +385,31 @@ async def get_leaderboard_history(
 
 # ================== COACHING ==================
 
+@router.get("/coaching/team/tips", response_model=SalesResponse)
+def get_team_coaching_tips(
+    week_start: Optional[date] = Query(None, description="Week start date (defaults to current week)"),
+    sales_agent: SalesAgentService = Depends(get_sales_agent)
+):
+    """Get coaching tips for every sales rep, selected from the tips knowledge base"""
+    try:
+        tips = sales_agent.generate_team_coaching_tips(week_start)
+        return SalesResponse(
+            success=True,
+            message=f"Coaching tips generated for {len(tips)} reps",
+            data={"tips": tips}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get team coaching tips: {str(e)}")
+
+
 @router.get("/coaching/{user_id}/tips", response_model=SalesResponse)
-async def get_coaching_tips(user_id: int, db: AsyncSession = Depends(get_db)):
+def get_coaching_tips(user_id: int, sales_agent: SalesAgentService = Depends(get_sales_agent)):
     """Get personalized coaching tips for a user"""
     try:
-        sales_agent = SalesAgentService(db)
         week_start = sales_agent.get_current_week_start()
-        progress = await sales_agent.get_weekly_progress(user_id, week_start)
+        progress = sales_agent.get_weekly_progress(user_id, week_start)
         
-        tips = await sales_agent.generate_coaching_tips(progress)
+        tips = sales_agent.generate_coaching_tips(progress, user_id, week_start)
         
         return SalesResponse(
             success=True,
@@ -413,7 +443,7 @@ async def send_coaching_message(
         # In production, this would send via Slack
         if not user.slack_user_id:
             # Simulate sending message for demo purposes
-            print(f"📧 Simulated message to {user.name}: {request.message}")
+            logger.debug("📧 Simulated message to %s: %s", user.name, request.message)
             return SalesResponse(
                 success=True,
                 message=f"Message sent to {user.name} (simulated - Slack disabled)",
@@ -451,6 +481,64 @@ async def get_scheduler_status():
         raise HTTPException(status_code=500, detail=f"Failed to get scheduler status: {str(e)}")
 
 
+@router.get("/scheduler/runs", response_model=SalesResponse)
+async def get_scheduler_runs(
+    job_id: Optional[str] = Query(None, description="Only show runs of this job"),
+    limit: int = Query(20, ge=1, le=200, description="Number of runs to retrieve")
+):
+    """Get scheduled job run history with p50/p95 per-user durations"""
+    try:
+        ledger = JobLedger()
+        try:
+            history = ledger.get_run_history(job_id=job_id, limit=limit)
+        finally:
+            ledger.close()
+        return SalesResponse(
+            success=True,
+            message="Scheduler run history retrieved",
+            data=history
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get scheduler runs: {str(e)}")
+
+
+@router.get("/scheduler/runs/{run_id}", response_model=SalesResponse)
+async def get_scheduler_run_items(run_id: int):
+    """Get per-user outcomes and latencies for a single scheduled job run"""
+    try:
+        ledger = JobLedger()
+        try:
+            items = ledger.get_run_items(run_id)
+        finally:
+            ledger.close()
+        return SalesResponse(
+            success=True,
+            message="Scheduler run items retrieved",
+            data={"run_id": run_id, "items": items}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get scheduler run items: {str(e)}")
+
+
+@router.put("/users/{user_id}/timezone", response_model=SalesResponse)
+async def set_user_timezone(user_id: int, request: TimezoneRequest, db: AsyncSession = Depends(get_db)):
+    """Set the IANA timezone a rep's scheduled prompts are delivered in"""
+    if request.timezone not in pytz.all_timezones_set:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {request.timezone}")
+    
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user.timezone = request.timezone
+    await db.commit()
+    return SalesResponse(
+        success=True,
+        message=f"Timezone for {user.name} set to {request.timezone}",
+        data={"user_id": user_id, "timezone": request.timezone}
+    )
+
+
 @router.post("/scheduler/start", response_model=SalesResponse)
 async def start_scheduler():
     """Start the sales agent scheduler"""
@@ -519,8 +607,6 @@ async def get_team_analytics(
 ):
     """Get team performance analytics"""
     try:
-        sales_agent = SalesAgentService(db)
-        
         # Get data for multiple weeks
         from sqlalchemy import select
         result = await db.execute(select(User).where(User.role == "sales"))
@@ -546,14 +632,82 @@ async def get_team_analytics(
         raise HTTPException(status_code=500, detail=f"Failed to get team analytics: {str(e)}")
 
 
+# ================== FUNNEL METRICS ==================
+
+@router.get("/metrics/funnel/team", response_model=SalesResponse)
+async def get_team_funnel(
+    week_start: Optional[date] = Query(None, description="Week start date (defaults to current week)")
+):
+    """Get funnel counts and conversion rates for the whole sales team from the weekly rollup"""
+    try:
+        sync_db = get_sync_session()
+        try:
+            metrics = SalesMetricsService(sync_db)
+            if not week_start:
+                week_start = week_start_for(date.today())
+            
+            return SalesResponse(
+                success=True,
+                message="Team funnel retrieved",
+                data=metrics.get_team_funnel(week_start)
+            )
+        finally:
+            sync_db.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get team funnel: {str(e)}")
+
+
+@router.get("/metrics/{user_id}/funnel", response_model=SalesResponse)
+async def get_user_funnel(
+    user_id: int,
+    week_start: Optional[date] = Query(None, description="Week start date (defaults to current week)")
+):
+    """Get funnel counts and conversion rates for a single rep from the weekly rollup"""
+    try:
+        sync_db = get_sync_session()
+        try:
+            metrics = SalesMetricsService(sync_db)
+            if not week_start:
+                week_start = week_start_for(date.today())
+            
+            return SalesResponse(
+                success=True,
+                message="Funnel retrieved",
+                data=metrics.get_user_funnel(user_id, week_start)
+            )
+        finally:
+            sync_db.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get funnel: {str(e)}")
+
+
+@router.post("/metrics/backfill", response_model=SalesResponse)
+async def backfill_sales_metrics(
+    since: Optional[date] = Query(None, description="Only rebuild weeks starting on or after this date")
+):
+    """Rebuild the weekly funnel rollup from historical tasks"""
+    try:
+        sync_db = get_sync_session()
+        try:
+            result = SalesMetricsService(sync_db).backfill(since=since)
+            return SalesResponse(
+                success=True,
+                message=f"Backfill completed: {result['created']} created, {result['updated']} updated",
+                data=result
+            )
+        finally:
+            sync_db.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to backfill sales metrics: {str(e)}")
+
+
 # ================== TASK COMPLETION ==================
 
 @router.post("/tasks/{task_id}/complete", response_model=SalesResponse)
-async def mark_task_complete(task_id: int, db: AsyncSession = Depends(get_db)):
+def mark_task_complete(task_id: int, sales_agent: SalesAgentService = Depends(get_sales_agent)):
     """Mark a sales task as complete and trigger celebration"""
     try:
-        sales_agent = SalesAgentService(db)
-        success = await sales_agent.mark_task_complete(task_id)
+        success = sales_agent.mark_task_complete(task_id)
         
         if success:
             return SalesResponse(
@@ -562,7 +716,7 @@ async def mark_task_complete(task_id: int, db: AsyncSession = Depends(get_db)):
                 data={"task_id": task_id}
             )
         else:
-            raise HTTPException(status_code=500, detail="Failed to mark task as complete")
+            raise HTTPException(status_code=404, detail="Task not found")
             
     except HTTPException:
         raise
@@ -591,7 +745,12 @@ async def manual_sync_users():
 # ================== SLACK TESTING ==================
 
 @router.post("/test-slack/{user_id}", response_model=SalesResponse)
-async def test_slack_message(user_id: int, request: MessageRequest, db: AsyncSession = Depends(get_db)):
+async def test_slack_message(
+    user_id: int,
+    request: MessageRequest,
+    db: AsyncSession = Depends(get_db),
+    slack_service: SlackService = Depends(get_slack_service)
+):
     """Test sending a Slack message to a specific user"""
     try:
         from sqlalchemy import select
@@ -604,10 +763,6 @@ async def test_slack_message(user_id: int, request: MessageRequest, db: AsyncSes
         if not user.slack_user_id:
             raise HTTPException(status_code=400, detail="User has no Slack ID")
         
-        # Initialize Slack service
-        from app.services.slack_service import SlackService
-        slack_service = SlackService()
-        
         # Check if Slack is configured
         if not slack_service.is_configured():
             return SalesResponse(
@@ -650,12 +805,12 @@ async def test_slack_message(user_id: int, request: MessageRequest, db: AsyncSes
 
 
 @router.post("/test-slack-channel", response_model=SalesResponse)
-async def test_slack_channel_message(request: MessageRequest):
+async def test_slack_channel_message(
+    request: MessageRequest,
+    slack_service: SlackService = Depends(get_slack_service)
+):
     """Test sending a message to the main Slack channel"""
     try:
-        from app.services.slack_service import SlackService
-        slack_service = SlackService()
-        
         # Check if Slack is configured
         if not slack_service.is_configured():
             return SalesResponse(
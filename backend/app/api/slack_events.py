@@ -2,13 +2,15 @@ from fastapi import APIRouter, Request, HTTPException, Depends
 from sqlalchemy.orm import Session
 import json
 from datetime import datetime, date
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
-from app.database import get_db
+from app.database import get_sync_db
 from app.services.sales_agent import SalesAgentService
-from app.services.slack_service import SlackService
+from app.services.slack_service import SlackService, get_slack_service, slack_service as shared_slack_service
 from app.services.ai_service import ai_service
+from app.services.loop_bridge import loop_bridge
+from app.services.conversation_memory import conversation_memory
 from app.models import User, SalesConversation
 from app.services.auto_sync_users import auto_sync_service
 
@@ -20,23 +22,17 @@ router = APIRouter(prefix="/slack", tags=["slack"])
 class SlackEventRouter:
     """Routes Slack events to appropriate sales agent handlers"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, slack_service: Optional[SlackService] = None):
         self.db = db
-        self.sales_agent = SalesAgentService(db)
-        self.slack_service = SlackService()
+        self.slack_service = slack_service or shared_slack_service
+        self.sales_agent = SalesAgentService(db, slack_service=self.slack_service)
     
     def is_reply_to_weekly_prompt(self, user_id: str, text: str, thread_ts: str = None) -> bool:
         """Check if this is a reply to Monday's goal-setting prompt"""
         try:
-            # Look for an active conversation for this week
+            # Look for this week's prompt that has not been answered yet
             week_start = self.sales_agent.get_current_week_start()
-            conversation = self.db.query(SalesConversation).filter(
-                SalesConversation.user_slack_id == user_id,
-                SalesConversation.week_start == week_start,
-                SalesConversation.conversation_type == "weekly_goals"
-            ).first()
-            
-            return conversation is not None
+            return self.sales_agent.find_goal_prompt(user_id, week_start) is not None
         except Exception as e:
             logger.error(f"Error checking weekly prompt reply: {e}")
             return False
@@ -89,6 +85,7 @@ class SlackEventRouter:
                 return "Sorry, I couldn't find your user profile."
             
             progress = self.sales_agent.get_weekly_progress(user.id, week_start)
+            tips = "\n".join(self.sales_agent.generate_coaching_tips(progress, user.id, week_start))
             
             summary = f"""📊 **Your Week Progress Summary**
             
@@ -99,7 +96,7 @@ class SlackEventRouter:
 
 **Overall: {progress['overall_percentage']}% complete**
 
-{self.sales_agent.generate_coaching_tips(user.id, progress)}
+{tips}
 
 Keep pushing! 💪"""
             
@@ -130,13 +127,8 @@ Keep pushing! 💪"""
             Use emojis appropriately and keep responses concise but helpful."""
             
             try:
-                # Use the AI service for a more intelligent response
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                response = loop.run_until_complete(ai_service.generate_response(text, system_message))
-                loop.close()
-                return response
+                # Use the AI service for a more intelligent response, on the shared background loop
+                return loop_bridge.run(loop_bridge.ai_service.generate_response(text, system_message))
             except Exception as e:
                 logger.error(f"Error generating AI response: {e}")
                 # Fallback response
@@ -170,7 +162,8 @@ Keep pushing! 💪"""
                 name=user_data.get("real_name", user_data.get("name", "Unknown")),
                 email=user_data.get("profile", {}).get("email", f"{user_data['name']}@example.com"),
                 slack_user_id=user_id,
-                role="sales"
+                role="sales",
+                timezone=user_data.get("tz")  # Slack's IANA zone drives the rep's local schedule
             )
             
             self.db.add(new_user)
@@ -221,7 +214,11 @@ Ready to crush some sales goals? Let's do this! 💪
 
 
 @router.post("/events")
-async def handle_slack_events(request: Request, db: Session = Depends(get_db)):
+async def handle_slack_events(
+    request: Request,
+    db: Session = Depends(get_sync_db),
+    slack_service: SlackService = Depends(get_slack_service)
+):
     """Main Slack event handler - routes all sales interactions through autonomous agent"""
     try:
         payload = await request.json()
@@ -253,7 +250,6 @@ async def handle_slack_events(request: Request, db: Session = Depends(get_db)):
                         
                         if action == "created":
                             # Send team announcement for new users
-                            slack_service = SlackService()
                             team_message = f"🎉 Welcome <@{user_id}> to the PSV Sales Team! They've been automatically added to DealTracker. 🚀\n\n📊 View the team dashboard: http://35.175.231.57"
                             await slack_service.send_message(channel_id, team_message)
                             
@@ -280,7 +276,7 @@ async def handle_slack_events(request: Request, db: Session = Depends(get_db)):
                     return {"status": "ignored"}
                 
                 # Initialize event router
-                event_router = SlackEventRouter(db)
+                event_router = SlackEventRouter(db, slack_service)
                 
                 # Auto-onboard user if they don't exist (for DMs from new users)
                 user = db.query(User).filter(User.slack_user_id == user_id).first()
@@ -326,20 +322,20 @@ async def handle_weekly_goal_response(event_router: SlackEventRouter,
             return {"status": "error"}
         
         # Parse the goals from the response
-        goals = event_router.sales_agent.parse_sales_response(text)
+        goals = await event_router.sales_agent.parse_sales_response_async(text)
         
         # Create weekly tasks
         week_start = event_router.sales_agent.get_current_week_start()
         num_tasks = event_router.sales_agent.create_weekly_sales_tasks(user.id, week_start, goals)
         
-        # Create conversation record
-        conversation = SalesConversation(
+        # The answered prompt becomes the week's goals record, so later DMs are routed normally
+        conversation = event_router.sales_agent.find_goal_prompt(user_id, week_start) or SalesConversation(
             user_slack_id=user_id,
             week_start=week_start,
-            conversation_type="weekly_goals",
-            goals_data=json.dumps(goals),
             created_at=datetime.now()
         )
+        conversation.conversation_type = "weekly_goals"
+        conversation.goals_data = json.dumps(goals)
         db.add(conversation)
         db.commit()
         
@@ -379,10 +375,17 @@ async def handle_progress_update(event_router: SlackEventRouter,
         
         # Get current progress
         week_start = event_router.sales_agent.get_current_week_start()
+        
+        # Feed self-reported numbers into the weekly funnel rollup
+        event_router.sales_agent.metrics.record_slack_update(user.id, text, week_start)
+        db.commit()
+        
         current_progress = event_router.sales_agent.get_weekly_progress(user.id, week_start)
         
         # Generate coaching response
-        coaching_tips = event_router.sales_agent.generate_coaching_tips(user.id, current_progress)
+        coaching_tips = "\n".join(
+            event_router.sales_agent.generate_coaching_tips(current_progress, user.id, week_start)
+        )
         
         response = f"""Thanks for the update! 📊
 
@@ -462,10 +465,25 @@ async def handle_general_query(event_router: SlackEventRouter,
         
         If they ask about technical features or non-sales topics, gently redirect to sales-related aspects."""
         
+        # Pull in earlier exchanges and weekly summaries relevant to this question
+        try:
+            history = await conversation_memory.recall(user_id, text)
+        except Exception as e:
+            logger.warning(f"Could not retrieve conversation memory: {e}")
+            history = []
+        if history:
+            system_message += "\n\nRelevant history with this rep (most relevant first):\n"
+            system_message += "\n---\n".join(history)
+        
         # Use AI service for intelligent response
         response = await ai_service.generate_response(text, system_message)
         
         await event_router.slack_service.send_message(channel_id, response)
+        # Gated on the embedding backend, not the chat model: the hashing backend stores exchanges offline
+        if conversation_memory.embeddings.is_configured():
+            conversation_memory.remember_in_background(
+                conversation_memory.remember_exchange(user_id, text, response)
+            )
         return {"status": "general_handled"}
         
     except Exception as e:
@@ -476,7 +494,7 @@ async def handle_general_query(event_router: SlackEventRouter,
 
 
 @router.post("/commands")
-async def handle_slash_commands(request: Request, db: Session = Depends(get_db)):
+async def handle_slash_commands(request: Request, db: Session = Depends(get_sync_db)):
     """Handle Slack slash commands like /done, /progress"""
     try:
         form = await request.form()
@@ -494,13 +512,18 @@ async def handle_slash_commands(request: Request, db: Session = Depends(get_db))
         
         if command == "/done":
             # Mark task as complete
-            result = sales_agent.mark_task_complete(user.id, text.strip())
-            return {"text": result["message"]}
+            task_id = text.strip().lstrip("#")
+            if not task_id.isdigit():
+                return {"text": "Usage: /done [task-id]"}
+            if sales_agent.mark_task_complete(int(task_id)):
+                return {"text": f"✅ Task {task_id} marked as completed"}
+            return {"text": f"Sorry, I couldn't find task {task_id}."}
         
         elif command == "/progress":
             # Get current progress
             week_start = sales_agent.get_current_week_start()
             progress = sales_agent.get_weekly_progress(user.id, week_start)
+            tips = "\n".join(sales_agent.generate_coaching_tips(progress, user.id, week_start))
             
             progress_text = f"""📊 **Your Sales Progress for Week {week_start.strftime('%b %d')}**
 
@@ -510,7 +533,7 @@ async def handle_slash_commands(request: Request, db: Session = Depends(get_db))
 
 **Overall Progress:** {progress['overall_percentage']}%
 
-{sales_agent.generate_coaching_tips(user.id, progress)}"""
+{tips}"""
             
             return {"text": progress_text}
         
@@ -535,17 +558,18 @@ async def handle_slash_commands(request: Request, db: Session = Depends(get_db))
 
 # Additional endpoint for manual agent actions (for testing/admin)
 @router.post("/agent/send-monday-prompts")
-async def send_monday_prompts(db: Session = Depends(get_db)):
+async def send_monday_prompts(db: Session = Depends(get_sync_db),
+                              slack_service: SlackService = Depends(get_slack_service)):
     """Manually trigger Monday goal prompts for all sales reps"""
     try:
-        sales_agent = SalesAgentService(db)
+        sales_agent = SalesAgentService(db, slack_service=slack_service)
         
         # Get all sales users
         sales_users = db.query(User).filter(User.role == "sales").all()
         
         results = []
         for user in sales_users:
-            success = sales_agent.send_monday_goal_prompt(user.id)
+            success = await sales_agent.send_monday_goal_prompt_async(user.id)
             results.append({"user_id": user.id, "name": user.name, "success": success})
         
         return {"message": f"Monday prompts sent to {len(sales_users)} sales reps", "results": results}
@@ -555,16 +579,17 @@ async def send_monday_prompts(db: Session = Depends(get_db)):
 
 
 @router.post("/agent/send-midweek-nudges")
-async def send_midweek_nudges(db: Session = Depends(get_db)):
+async def send_midweek_nudges(db: Session = Depends(get_sync_db),
+                              slack_service: SlackService = Depends(get_slack_service)):
     """Manually trigger Wednesday nudges for all sales reps"""
     try:
-        sales_agent = SalesAgentService(db)
+        sales_agent = SalesAgentService(db, slack_service=slack_service)
         
         sales_users = db.query(User).filter(User.role == "sales").all()
         
         results = []
         for user in sales_users:
-            success = sales_agent.send_midweek_nudge(user.id)
+            success = await sales_agent.send_midweek_nudge_async(user.id)
             results.append({"user_id": user.id, "name": user.name, "success": success})
         
         return {"message": f"Midweek nudges sent to {len(sales_users)} sales reps", "results": results}
@@ -574,16 +599,17 @@ async def send_midweek_nudges(db: Session = Depends(get_db)):
 
 
 @router.post("/agent/send-weekly-summaries")
-async def send_weekly_summaries(db: Session = Depends(get_db)):
+async def send_weekly_summaries(db: Session = Depends(get_sync_db),
+                                slack_service: SlackService = Depends(get_slack_service)):
     """Manually trigger Friday summaries for all sales reps"""
     try:
-        sales_agent = SalesAgentService(db)
+        sales_agent = SalesAgentService(db, slack_service=slack_service)
         
         sales_users = db.query(User).filter(User.role == "sales").all()
         
         results = []
         for user in sales_users:
-            success = sales_agent.send_weekly_summary(user.id)
+            success = await sales_agent.send_weekly_summary_async(user.id)
             results.append({"user_id": user.id, "name": user.name, "success": success})
         
         return {"message": f"Weekly summaries sent to {len(sales_users)} sales reps", "results": results}
@@ -1,140 +1,181 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
+import base64
+import json
 
+from app import crud
 from app.database import get_db
 from app.models import Task
+from app.responses import json_response
+from app.schemas import Task as TaskResponse, TaskCreate, TaskStatus, TaskUpdate
+from app.services.sales_metrics import week_start_for
+from app.services.task_operations import TaskOperations, get_task_operations
 
 router = APIRouter()
 
-class TaskCreate(BaseModel):
-    title: str
-    description: Optional[str] = None
-    project_id: Optional[int] = None
-    assigned_to: Optional[int] = None
-    status: str = "pending"
-    priority: str = "medium"
-    task_type: str = "general"
-    due_date: Optional[datetime] = None
-
-class TaskUpdate(BaseModel):
-    title: Optional[str] = None
-    description: Optional[str] = None
-    status: Optional[str] = None
-    priority: Optional[str] = None
-    task_type: Optional[str] = None
-    due_date: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
-
-class TaskResponse(BaseModel):
-    id: int
-    title: str
-    description: Optional[str] = None
-    project_id: Optional[int] = None
-    assigned_to: Optional[int] = None
-    status: str
-    priority: str
-    task_type: str
-    due_date: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
-    created_at: datetime
-    updated_at: datetime
-
-@router.get("/", response_model=List[TaskResponse])
-async def get_tasks(db: AsyncSession = Depends(get_db)):
-    """Get all tasks"""
-    # In a real app, you'd query the database
-    # For now, return mock data
-    return [
-        {
-            "id": 1,
-            "title": "Follow up with lead",
-            "description": "Call potential client about proposal",
-            "project_id": 1,
-            "assigned_to": 1,
-            "status": "pending",
-            "priority": "high",
-            "task_type": "sales_call",
-            "due_date": datetime.now(),
-            "completed_at": None,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
-    ]
+class TaskPage(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    limit: int
+
+class BulkStatusUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+    status: TaskStatus
+
+class BulkTaskRequest(BaseModel):
+    create: List[TaskCreate] = []
+    update: List[BulkStatusUpdate] = []
+
+class BulkTaskResponse(BaseModel):
+    created: List[Dict[str, Any]]
+    results: Dict[int, str]
+    rollups_updated: int
+
+
+# Columns the listing can return; `fields` picks a subset, id and created_at always included for the cursor
+TASK_LIST_FIELDS = {column.name: column for column in Task.__table__.columns}
+DEFAULT_TASK_FIELDS = ("id", "title", "status", "priority", "task_type", "due_date", "completed_at",
+                       "owner_id", "project_id", "created_at")
+MAX_PAGE_SIZE = 500
+# Creates plus updated ids in one bulk request
+MAX_BULK_TASKS = 5000
+
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), task_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def task_page_query(columns: Sequence[str] = DEFAULT_TASK_FIELDS, limit: int = 50,
+                    cursor: Optional[Tuple[datetime, int]] = None, owner_id: Optional[int] = None,
+                    project_id: Optional[int] = None, week_start: Optional[date] = None,
+                    status: Optional[Sequence[str]] = None, task_type: Optional[Sequence[str]] = None):
+    """Newest-first page of tasks after the cursor, fetching one extra row to tell if there is a next page.
+
+    Seeking past the last (created_at, id) seen walks the (created_at, id) indexes
+    straight to the next page, so page 10,000 costs the same as page 1; OFFSET
+    has to read and discard every earlier row.
+    """
+    stmt = select(*(TASK_LIST_FIELDS[name] for name in columns))
+    if owner_id is not None:
+        stmt = stmt.where(Task.owner_id == owner_id)
+    if project_id is not None:
+        stmt = stmt.where(Task.project_id == project_id)
+    if week_start is not None:
+        stmt = stmt.where(Task.created_at >= week_start, Task.created_at < week_start + timedelta(days=7))
+    if status:
+        stmt = stmt.where(Task.status.in_(status))
+    if task_type:
+        stmt = stmt.where(Task.task_type.in_(task_type))
+    if cursor is not None:
+        stmt = stmt.where(tuple_(Task.created_at, Task.id) < tuple_(*cursor))
+    return stmt.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+
+
+@router.get("/", response_model=TaskPage)
+async def get_tasks(
+    owner_id: Optional[int] = Query(None, description="Only tasks owned by this user"),
+    project_id: Optional[int] = Query(None, description="Only tasks in this project"),
+    week: Optional[date] = Query(None, description="Only tasks created in the week containing this date"),
+    status: Optional[List[str]] = Query(None, description="Only tasks with one of these statuses"),
+    task_type: Optional[List[str]] = Query(None, description="Only tasks of one of these types"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List tasks newest first, one keyset-paginated page at a time"""
+    columns = list(DEFAULT_TASK_FIELDS)
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in TASK_LIST_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        columns = list(dict.fromkeys(["id", "created_at", *requested]))
+
+    stmt = task_page_query(
+        columns, limit, decode_cursor(cursor) if cursor else None, owner_id=owner_id, project_id=project_id,
+        week_start=week_start_for(week) if week else None, status=status, task_type=task_type
+    )
+    rows = (await db.execute(stmt)).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return json_response({"items": [dict(row) for row in rows], "next_cursor": next_cursor, "limit": limit})
+
+@router.post("/bulk", response_model=BulkTaskResponse)
+def bulk_tasks(request: BulkTaskRequest, operations: TaskOperations = Depends(get_task_operations)):
+    """Create tasks and change task statuses in one transaction.
+
+    Each status in `update` is a single UPDATE over its ids; results report
+    every id as updated, unchanged (already in that status) or not_found.
+    """
+    size = len(request.create) + sum(len(update.ids) for update in request.update)
+    if size > MAX_BULK_TASKS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_TASKS} tasks per bulk request")
+    try:
+        result = operations.apply(
+            create=[task.model_dump() for task in request.create],
+            updates=[(update.ids, update.status) for update in request.update],
+        )
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid owner or project: {e.orig}")
+    return BulkTaskResponse(**result)
 
 @router.post("/", response_model=TaskResponse)
-async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):
+def create_task(task: TaskCreate, operations: TaskOperations = Depends(get_task_operations)):
     """Create a new task"""
-    # In a real app, you'd create the task in the database
-    # For now, return mock data
-    return {
-        "id": 1,
-        "title": task.title,
-        "description": task.description,
-        "project_id": task.project_id,
-        "assigned_to": task.assigned_to,
-        "status": task.status,
-        "priority": task.priority,
-        "task_type": task.task_type,
-        "due_date": task.due_date,
-        "completed_at": None,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    try:
+        return operations.create(task.model_dump())
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid owner or project: {e.orig}")
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(task_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific task"""
-    # In a real app, you'd query the database
-    # For now, return mock data
-    return {
-        "id": task_id,
-        "title": "Follow up with lead",
-        "description": "Call potential client about proposal",
-        "project_id": 1,
-        "assigned_to": 1,
-        "status": "pending",
-        "priority": "high",
-        "task_type": "sales_call",
-        "due_date": datetime.now(),
-        "completed_at": None,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    task = await crud.get(db, Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
 
 @router.put("/{task_id}", response_model=TaskResponse)
-async def update_task(task_id: int, task: TaskUpdate, db: AsyncSession = Depends(get_db)):
+def update_task(task_id: int, task: TaskUpdate, operations: TaskOperations = Depends(get_task_operations)):
     """Update a task"""
-    # In a real app, you'd update the task in the database
-    # For now, return mock data
-    return {
-        "id": task_id,
-        "title": task.title or "Follow up with lead",
-        "description": task.description or "Call potential client about proposal",
-        "project_id": 1,
-        "assigned_to": 1,
-        "status": task.status or "pending",
-        "priority": task.priority or "high",
-        "task_type": task.task_type or "sales_call",
-        "due_date": task.due_date or datetime.now(),
-        "completed_at": task.completed_at,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    updated = operations.edit(task_id, task.model_dump(exclude_unset=True))
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return updated
 
 @router.delete("/{task_id}")
-async def delete_task(task_id: int, db: AsyncSession = Depends(get_db)):
+def delete_task(task_id: int, operations: TaskOperations = Depends(get_task_operations)):
     """Delete a task"""
-    # In a real app, you'd delete the task from the database
+    if not operations.delete(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
     return {"message": f"Task {task_id} deleted successfully"}
 
 @router.post("/{task_id}/complete")
-async def complete_task(task_id: int, db: AsyncSession = Depends(get_db)):
+def complete_task(task_id: int, operations: TaskOperations = Depends(get_task_operations)):
     """Mark a task as completed"""
-    # In a real app, you'd update the task status in the database
+    result = operations.complete([task_id])[task_id]
+    if result == "not_found":
+        raise HTTPException(status_code=404, detail="Task not found")
     return {
         "message": f"Task {task_id} marked as completed",
-        "completed_at": datetime.now()
-    } 
\ No newline at end of file
+        "result": result
+    }
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+from app import crud
+from app.api.auth import MANAGER_ROLES, get_current_user, require_manager
+from app.database import get_db
+from app.models import User
+from app.schemas import User as UserResponse, UserCreate, UserUpdate
+from app.services.token_cache import Principal, token_cache
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 200
+
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[int] = None
+    limit: int
+
+@router.get("/", response_model=UserPage)
+async def get_users(
+    role: Optional[str] = Query(None, description="Only users with this role"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List users in id order"""
+    users, next_cursor = await crud.page(db, User, limit, cursor, role=role)
+    return UserPage(items=users, next_cursor=next_cursor, limit=limit)
+
+@router.post("/", response_model=UserResponse)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db),
+                      current_user: Principal = Depends(require_manager)):
+    """Create a new user (managers and admins)"""
+    try:
+        return await crud.create(db, User, user.model_dump())
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="A user with that email or Slack id already exists")
+
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a specific user"""
+    user = await crud.get(db, User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+@router.put("/{user_id}", response_model=UserResponse)
+async def update_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_db),
+                      current_user: Principal = Depends(get_current_user)):
+    """Update a user: anyone may edit their own profile, managers and admins any user and any role"""
+    values = user.model_dump(exclude_unset=True)
+    if current_user.role not in MANAGER_ROLES and (user_id != current_user.id or "role" in values):
+        raise HTTPException(status_code=403, detail="Only managers and admins can change roles or other users")
+    if values:
+        # Tells the other workers to drop their cached tokens for this user
+        values["auth_changed_at"] = datetime.utcnow()
+    try:
+        updated = await crud.update(db, User, user_id, values)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="A user with that email or Slack id already exists")
+    if not updated:
+        raise HTTPException(status_code=404, detail="User not found")
+    # Signed-in sessions pick up the new role/email on their next request
+    token_cache.invalidate_user(user_id)
+    return updated
+
+@router.delete("/{user_id}")
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db),
+                      current_user: Principal = Depends(require_manager)):
+    """Delete a user that owns no projects, tasks or goals (managers and admins)"""
+    try:
+        deleted = await crud.delete(db, User, user_id)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="User still owns projects, tasks or goals")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="User not found")
+    token_cache.invalidate_user(user_id)
+    return {"message": f"User {user_id} deleted successfully"}
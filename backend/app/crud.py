@@ -1,49 +1,60 @@
+"""
+CRUD layer for DealTracker Sales Agent
+SQLAlchemy 2.0 statements shared by the app/api routers; writes come back with RETURNING
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from sqlalchemy import delete as delete_stmt, insert, select, update as update_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from . import models, schemas
 
-async def get_user(db: AsyncSession, user_id: int):
-    result = await db.execute(select(models.User).where(models.User.id == user_id))
-    return result.scalar_one_or_none()
+from app.models import Base
 
-async def create_user(db: AsyncSession, user: schemas.UserCreate):
-    db_user = models.User(**user.dict())
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
+ModelT = TypeVar("ModelT", bound=Base)
 
-async def get_project(db: AsyncSession, project_id: int):
-    result = await db.execute(select(models.Project).where(models.Project.id == project_id))
-    return result.scalar_one_or_none()
 
-async def create_project(db: AsyncSession, project: schemas.ProjectCreate, owner_id: int):
-    db_project = models.Project(**project.dict(), owner_id=owner_id)
-    db.add(db_project)
-    await db.commit()
-    await db.refresh(db_project)
-    return db_project
+async def get(db: AsyncSession, model: Type[ModelT], obj_id: int) -> Optional[ModelT]:
+    return await db.scalar(select(model).where(model.id == obj_id))
+
 
-async def get_task(db: AsyncSession, task_id: int):
-    result = await db.execute(select(models.Task).where(models.Task.id == task_id))
-    return result.scalar_one_or_none()
+async def page(db: AsyncSession, model: Type[ModelT], limit: int = 50, after_id: Optional[int] = None,
+               **filters: Any) -> Tuple[List[ModelT], Optional[int]]:
+    """Rows in id order after after_id, plus the id to continue from (None on the last page).
 
-async def create_task(db: AsyncSession, task: schemas.TaskCreate, project_id: int):
-    db_task = models.Task(**task.dict(), project_id=project_id)
-    db.add(db_task)
+    filters are column=value equality filters; None values are ignored.
+    """
+    stmt = select(model)
+    for column, value in filters.items():
+        if value is not None:
+            stmt = stmt.where(getattr(model, column) == value)
+    if after_id is not None:
+        stmt = stmt.where(model.id > after_id)
+    rows = list(await db.scalars(stmt.order_by(model.id).limit(limit + 1)))
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
+
+
+async def create(db: AsyncSession, model: Type[ModelT], values: Dict[str, Any]) -> ModelT:
+    """INSERT ... RETURNING the new row as an ORM object: one round-trip, no refresh after commit"""
+    obj = await db.scalar(insert(model).values(**values).returning(model))
     await db.commit()
-    await db.refresh(db_task)
-    return db_task
+    return obj
 
-async def get_goal(db: AsyncSession, goal_id: int):
-    result = await db.execute(select(models.Goal).where(models.Goal.id == goal_id))
-    return result.scalar_one_or_none()
 
-async def create_goal(db: AsyncSession, goal: schemas.GoalCreate, project_id: int):
-    db_goal = models.Goal(**goal.dict(), project_id=project_id)
-    db.add(db_goal)
+async def update(db: AsyncSession, model: Type[ModelT], obj_id: int, values: Dict[str, Any]) -> Optional[ModelT]:
+    """UPDATE ... RETURNING the changed row, or None if there is no such row"""
+    if not values:
+        return await get(db, model, obj_id)
+    obj = await db.scalar(
+        update_stmt(model).where(model.id == obj_id).values(**values).returning(model)
+        .execution_options(populate_existing=True)
+    )
     await db.commit()
-    await db.refresh(db_goal)
-    return db_goal
+    return obj
 
-# Similar CRUD for Project, Task, Goal (to be expanded) 
\ No newline at end of file
+
+async def delete(db: AsyncSession, model: Type[ModelT], obj_id: int) -> bool:
+    result = await db.execute(delete_stmt(model).where(model.id == obj_id))
+    await db.commit()
+    return result.rowcount > 0
@@ -1,11 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine
+from sqlalchemy import UniqueConstraint, create_engine, inspect, text
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 def get_database_url():
     """Get database URL from environment variables"""
     # Use SQLite for local development if no DATABASE_URL is provided
@@ -29,15 +32,16 @@ def get_sync_database_url():
 DATABASE_URL = get_database_url()
 SYNC_DATABASE_URL = get_sync_database_url()
 
-# Async engine and session
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Async engine and session; SQL statement logging goes through app.logging_config (LOG_SQL),
+# not echo=True, which writes every statement to stdout synchronously
+engine = create_async_engine(DATABASE_URL)
 
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
 # Sync engine and session for SalesAgentService compatibility
-sync_engine = create_engine(SYNC_DATABASE_URL, echo=True)
+sync_engine = create_engine(SYNC_DATABASE_URL)
 
 SessionLocal = sessionmaker(
     bind=sync_engine, class_=Session, expire_on_commit=False
@@ -45,4 +49,78 @@ SessionLocal = sessionmaker(
 
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session 
\ No newline at end of file
+        yield session
+
+def get_sync_db():
+    """FastAPI dependency: a sync Session for handlers built on SalesAgentService (db.query style)"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def add_missing_columns(connection, metadata):
+    """Add nullable columns that exist on the models but not yet in the database.
+
+    create_all only creates missing tables, so columns added to existing models
+    (e.g. users.timezone) are patched in here at startup.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+def add_missing_indexes(connection, metadata):
+    """Create indexes declared on the models that existing tables don't have yet.
+
+    Like add_missing_columns, this covers tables create_all skipped because they already existed.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name and index.name not in existing_indexes:
+                index.create(connection)
+
+def add_missing_unique_constraints(connection, metadata):
+    """Create the models' unique constraints that existing tables don't have yet, as unique indexes.
+
+    Tables that predate a constraint may already hold rows it would reject; those
+    duplicates are dropped first, keeping the newest row (highest id) of each
+    group. Returns the names of the tables that had duplicates removed.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    deduplicated = set()
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_unique = {tuple(constraint["column_names"]) for constraint in inspector.get_unique_constraints(table.name)}
+        existing_unique |= {tuple(index["column_names"]) for index in inspector.get_indexes(table.name) if index["unique"]}
+        for constraint in table.constraints:
+            if not isinstance(constraint, UniqueConstraint) or not constraint.name:
+                continue
+            columns = tuple(column.name for column in constraint.columns)
+            if columns in existing_unique:
+                continue
+            column_list = ", ".join(columns)
+            if "id" in table.columns:
+                removed = connection.execute(text(
+                    f"DELETE FROM {table.name} WHERE id NOT IN "
+                    f"(SELECT MAX(id) FROM {table.name} GROUP BY {column_list})"
+                )).rowcount
+                if removed:
+                    logger.warning("Removed %d duplicate %s rows before adding %s", removed, table.name, constraint.name)
+                    deduplicated.add(table.name)
+            connection.execute(text(f"CREATE UNIQUE INDEX {constraint.name} ON {table.name} ({column_list})"))
+    return deduplicated
@@ -0,0 +1,162 @@
+"""
+Logging for DealTracker Sales Agent
+JSON log lines with job/user correlation ids, written by a background thread so logging never blocks the event loop.
+
+Per-user lines (one per rep per scheduler run) are sampled by user:
+
+    logger.info("Sent Monday prompt to %s", user.name, extra=PER_USER)
+
+keeps every line for LOG_PER_USER_SAMPLE_RATE of the reps and none for the
+rest, so a sampled rep's whole run can still be followed. Warnings and errors
+are never sampled.
+"""
+
+import os
+import sys
+import atexit
+import logging
+import queue
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from random import random
+from typing import Any, Dict, Optional
+
+import orjson
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" for log shippers, "text" for reading a terminal
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Share of reps whose per-user lines are kept (1.0 = all, 0 = none)
+LOG_PER_USER_SAMPLE_RATE = float(os.getenv("LOG_PER_USER_SAMPLE_RATE", "0.1"))
+# Every SQL statement at INFO, through the same queue (replaces create_engine(echo=True))
+LOG_SQL = os.getenv("LOG_SQL", "false").lower() in ("1", "true", "yes")
+
+# Pass as extra= on lines logged once per user, so they are sampled
+PER_USER = {"per_user": True}
+
+# Correlation fields (job_id, run_key, user_id, ...) added to every line logged in this context
+_log_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+# LogRecord attributes that are not extra= fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "context", "per_user"}
+
+
+@contextmanager
+def log_context(**fields):
+    """Add correlation fields to every line logged inside the block (including the threadpool and LoopBridge)"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def user_sampled(user_id: Any, rate: float = LOG_PER_USER_SAMPLE_RATE) -> bool:
+    """Stable per-user decision, the same on every run and worker"""
+    if rate >= 1:
+        return True
+    return zlib.crc32(str(user_id).encode()) % 10000 < rate * 10000
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the current log_context and drops unsampled per-user lines.
+
+    Runs in the logging thread (on the QueueHandler), where the contextvars are visible.
+    """
+
+    def __init__(self, sample_rate: float = LOG_PER_USER_SAMPLE_RATE):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.context = context
+        if getattr(record, "per_user", False) and record.levelno < logging.WARNING:
+            user_id = context.get("user_id")
+            if user_id is None:
+                return random() < self.sample_rate
+            return user_sampled(user_id, self.sample_rate)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", None) or {})
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = getattr(record, "context", None)
+        if context:
+            line += " [" + " ".join(f"{key}={value}" for key, value in context.items()) + "]"
+        return line
+
+
+class _AsyncQueueHandler(QueueHandler):
+    """Merges args into the message and renders tracebacks before enqueueing, so the record
+    holds no references to live objects, but leaves the output format to the listener"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None) -> QueueListener:
+    """Route the root logger through a queue to a stdout writer thread; safe to call more than once"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _AsyncQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if LOG_SQL else logging.WARNING)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued lines and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
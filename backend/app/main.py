@@ -1,62 +1,123 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
-from app.database import engine
+from app.logging_config import configure_logging, shutdown_logging
+
+# Before the other app imports, so lines they log at import time go through the queue too
+configure_logging()
+
+from app.database import (
+    engine, sync_engine, SessionLocal, add_missing_columns, add_missing_indexes, add_missing_unique_constraints
+)
+from app.metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, instrument_engine, mark_worker_dead, render_metrics
+from app import query_counter
 from app.models import Base
-from app.api import auth, projects, tasks, sales
+from app.api import auth, users, projects, tasks, goals, sales
 from app.api.slack_events import router as slack_events_router
 from app.services.scheduler import sales_scheduler
+from app.services.loop_bridge import loop_bridge
+from app.services.slack_service import slack_service
+from app.services.ai_service import ai_service
+from app.services.sales_agent import sales_templates
+from app.services.sales_metrics import SalesMetricsService
+from app.memory import memory_store
+from app.services.embedding_service import embedding_service
+from app.services.passwords import password_hasher
 from app.services.auto_sync_users import auto_sync_service
 
+logger = logging.getLogger(__name__)
+
 # Add get_database_url function to database.py
 def get_database_url():
     """Get database URL from environment variables"""
     return os.getenv('DATABASE_URL', 'postgresql+asyncpg://postgres:password@db:5432/dealtracker')
 
+def rebuild_sales_metrics():
+    db = SessionLocal()
+    try:
+        SalesMetricsService(db).backfill()
+    finally:
+        db.close()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🚀 Starting DealTracker Sales Agent...")
+    logger.info("🚀 Starting DealTracker Sales Agent...")
     
     # Create database tables
-    print("🗄️ Creating database tables...")
+    logger.info("🗄️ Creating database tables...")
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-        print("✅ Database tables created")
+            await conn.run_sync(add_missing_columns, Base.metadata)
+            await conn.run_sync(add_missing_indexes, Base.metadata)
+            deduplicated = await conn.run_sync(add_missing_unique_constraints, Base.metadata)
+        logger.info("✅ Database tables created")
+        if "sales_metrics" in deduplicated:
+            # The dropped duplicates each held part of a week's task counts; recount them from the tasks
+            await asyncio.to_thread(rebuild_sales_metrics)
+    except Exception as e:
+        logger.exception("❌ Database table creation error: %s", e)
+    
+    # Compile the prompt templates now so a bad placeholder is reported at startup, not mid-run
+    template_errors = sales_templates.preload()
+    for name, error in template_errors.items():
+        logger.error("❌ Template error: %s", error)
+    if not template_errors:
+        logger.info("✅ Sales templates compiled")
+    
+    # Memory-map the saved conversational memory; pages are read from disk on first search
+    try:
+        loaded = await asyncio.to_thread(memory_store.load)
+        logger.info("✅ Memory store loaded (%d namespaces)", loaded)
     except Exception as e:
-        print(f"❌ Database table creation error: {e}")
+        logger.error("❌ Memory store load error: %s", e)
+    
+    # Open the shared Slack connection pool on this loop before anything sends messages
+    await slack_service.open()
     
     # Start the sales scheduler
     sales_scheduler.start()
-    print("✅ Sales scheduler started")
+    logger.info("✅ Sales scheduler started")
     
     # Auto-sync users from Slack channel
-    print("🔄 Auto-syncing users from Slack channel...")
+    logger.info("🔄 Auto-syncing users from Slack channel...")
     try:
         sync_result = await auto_sync_service.sync_all_users()
         if sync_result["success"]:
-            print(f"✅ Auto-sync completed: {sync_result['created']} created, {sync_result['updated']} updated")
+            logger.info("✅ Auto-sync completed: %s created, %s updated", sync_result['created'], sync_result['updated'])
         else:
-            print(f"⚠️ Auto-sync failed: {sync_result.get('error', 'Unknown error')}")
+            logger.warning("⚠️ Auto-sync failed: %s", sync_result.get('error', 'Unknown error'))
     except Exception as e:
-        print(f"❌ Auto-sync error: {e}")
+        logger.error("❌ Auto-sync error: %s", e)
     
     yield
     
     # Shutdown
-    print("🛑 Shutting down DealTracker Sales Agent...")
+    logger.info("🛑 Shutting down DealTracker Sales Agent...")
     sales_scheduler.stop()
-    print("✅ Sales scheduler stopped")
+    logger.info("✅ Sales scheduler stopped")
+    loop_bridge.stop()
+    await slack_service.close()
+    await ai_service.close()
+    await asyncio.to_thread(memory_store.save)
+    memory_store.close()
+    embedding_service.close()
+    password_hasher.close()
+    mark_worker_dead()
+    shutdown_logging()
 
 app = FastAPI(
     title="DealTracker Sales Agent",
     description="An autonomous AI-powered sales project manager",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -68,13 +129,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Statement counts per request/job and N+1 warnings (QUERY_COUNTER_ENABLED, for development)
+query_counter.install(engine.sync_engine)
+query_counter.install(sync_engine)
+if query_counter.QUERY_COUNTER_ENABLED:
+    app.add_middleware(query_counter.QueryCounterMiddleware)
+
+# Added last, so it is the outermost layer and latency includes every other middleware
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine.sync_engine, "async")
+instrument_engine(sync_engine, "sync")
+
 # Include API routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
+app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(projects.router, prefix="/projects", tags=["projects"])
 app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+app.include_router(goals.router, prefix="/goals", tags=["goals"])
 app.include_router(sales.router, prefix="/sales", tags=["sales"])
 app.include_router(slack_events_router)
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint; sums all workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -88,6 +167,7 @@ async def health_check():
             "message": "DealTracker Sales Agent is running",
             "scheduler": {
                 "status": scheduler_status,
+                "leader": sales_scheduler.is_leader,
                 "jobs": job_count
             }
         }
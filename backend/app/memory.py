@@ -1,18 +1,412 @@
-# Placeholder for FAISS vector store integration
+"""
+Conversational memory for DealTracker Sales Agent
+Namespaced FAISS vector store with batched add/search, deletes, on-disk persistence
+and optional approximate-nearest-neighbor (IVF-PQ / HNSW) indexes
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote, unquote
+
 import faiss
 import numpy as np
 
+try:
+    from fcntl import LOCK_EX, LOCK_SH, flock as _flock
+except ImportError:  # Windows dev machines run a single worker; there is nothing to coordinate with
+    LOCK_EX = LOCK_SH = 0
+
+    def _flock(f, operation):
+        pass
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1536
+DEFAULT_NAMESPACE = "default"
+MEMORY_STORE_PATH = os.getenv("MEMORY_STORE_PATH", "data/memory")
+MEMORY_SEARCH_THREADS = int(os.getenv("MEMORY_SEARCH_THREADS", "4"))
+
+# Index type for large namespaces: flat (exact), ivfpq or hnsw. Namespaces start exact and are
+# rebuilt into the ANN index once they hold MEMORY_ANN_MIN_VECTORS snippets.
+INDEX_KINDS = ("flat", "ivfpq", "hnsw")
+MEMORY_INDEX = os.getenv("MEMORY_INDEX", "flat")
+MEMORY_ANN_MIN_VECTORS = int(os.getenv("MEMORY_ANN_MIN_VECTORS", "20000"))
+
+# IVF-PQ: up to nlist coarse cells (scaled down for smaller sets), PQ with m sub-quantizers of nbits
+MEMORY_IVF_NLIST = int(os.getenv("MEMORY_IVF_NLIST", "4096"))
+MEMORY_IVF_NPROBE = int(os.getenv("MEMORY_IVF_NPROBE", "16"))
+MEMORY_PQ_M = int(os.getenv("MEMORY_PQ_M", "64"))
+MEMORY_PQ_NBITS = int(os.getenv("MEMORY_PQ_NBITS", "8"))
+
+# HNSW: graph degree M, build-time and search-time beam widths
+MEMORY_HNSW_M = int(os.getenv("MEMORY_HNSW_M", "32"))
+MEMORY_HNSW_EF_CONSTRUCTION = int(os.getenv("MEMORY_HNSW_EF_CONSTRUCTION", "200"))
+MEMORY_HNSW_EF_SEARCH = int(os.getenv("MEMORY_HNSW_EF_SEARCH", "64"))
+
+
+def ivf_nlist_for(n_vectors: int, max_nlist: int = MEMORY_IVF_NLIST) -> int:
+    """Coarse cell count for n vectors: ~4*sqrt(n), capped, and small enough to train (39 points per cell)"""
+    return int(max(1, min(max_nlist, 4 * np.sqrt(n_vectors), n_vectors // 39)))
+
+
+def build_index(dim: int, kind: str = "flat", n_vectors: int = 0, nlist: Optional[int] = None,
+                pq_m: int = MEMORY_PQ_M, pq_nbits: int = MEMORY_PQ_NBITS, hnsw_m: int = MEMORY_HNSW_M,
+                ef_construction: int = MEMORY_HNSW_EF_CONSTRUCTION) -> faiss.Index:
+    """Create an empty index that accepts explicit int64 ids.
+
+    flat  - exact L2 search, no training
+    ivfpq - inverted lists over PQ codes (dim/pq_m dims per byte); needs train() before adding
+    hnsw  - graph over full vectors, no training; deletes are handled as tombstones by MemoryStore
+    """
+    if kind == "flat":
+        return faiss.index_factory(dim, "IDMap2,Flat")
+    if kind == "ivfpq":
+        if dim % pq_m:
+            raise ValueError(f"PQ sub-quantizers ({pq_m}) must divide the dimension ({dim})")
+        nlist = nlist or ivf_nlist_for(n_vectors)
+        return faiss.index_factory(dim, f"IVF{nlist},PQ{pq_m}x{pq_nbits}")
+    if kind == "hnsw":
+        index = faiss.index_factory(dim, f"IDMap2,HNSW{hnsw_m}")
+        faiss.downcast_index(index.index).hnsw.efConstruction = ef_construction
+        return index
+    raise ValueError(f"Unknown index kind {kind!r}; expected one of {INDEX_KINDS}")
+
+
+class _Namespace:
+    """One FAISS index plus the text and metadata for each vector id.
+
+    The vectors themselves live only inside the index.
+    """
+
+    def __init__(self, index: faiss.Index, texts: Dict[int, str], metadata: Dict[int, Dict[str, Any]],
+                 next_id: int = 0, mapped_from: Optional[str] = None, kind: str = "flat"):
+        self.index = index
+        self.kind = kind
+        self.texts = texts
+        self.metadata = metadata
+        self.next_id = next_id
+        self.mapped_from = mapped_from  # index file this namespace is memory-mapped from, if any
+        self.dirty = False
+        self.lock = threading.Lock()
+
+
 class MemoryStore:
-    def __init__(self, dim=1536):
-        self.index = faiss.IndexFlatL2(dim)
-        self.vectors = []
-        self.texts = []
-
-    def add(self, vector, text):
-        self.index.add(np.array([vector]).astype('float32'))
-        self.vectors.append(vector)
-        self.texts.append(text)
-
-    def search(self, vector, k=5):
-        D, I = self.index.search(np.array([vector]).astype('float32'), k)
-        return [self.texts[i] for i in I[0] if i < len(self.texts)] 
\ No newline at end of file
+    """Namespaced conversational memory (e.g. one namespace per rep: "user:42").
+
+    All writes and searches on a namespace hold its lock, so the store is safe
+    to share between request threads, the scheduler and the async helpers,
+    which run the FAISS calls on a small thread pool instead of the event loop.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, path: Optional[str] = MEMORY_STORE_PATH,
+                 search_threads: int = MEMORY_SEARCH_THREADS, index_kind: str = MEMORY_INDEX,
+                 ann_min_vectors: int = MEMORY_ANN_MIN_VECTORS, nprobe: int = MEMORY_IVF_NPROBE,
+                 ef_search: int = MEMORY_HNSW_EF_SEARCH):
+        if index_kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind {index_kind!r}; expected one of {INDEX_KINDS}")
+        self.dim = dim
+        self.path = Path(path) if path else None
+        self.index_kind = index_kind
+        self.ann_min_vectors = ann_min_vectors
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=search_threads, thread_name_prefix="memory-search")
+
+    # ------------------------------------------------------------------ indexes
+
+    def _new_index(self) -> faiss.Index:
+        # New namespaces are exact; _maybe_promote switches them to the ANN index once they are large
+        return build_index(self.dim, "flat")
+
+    def _search_params(self, ns: _Namespace, nprobe: Optional[int], ef_search: Optional[int]):
+        # Per-call parameters leave the shared index untouched, so concurrent searches can differ
+        if ns.kind == "ivfpq":
+            return faiss.SearchParametersIVF(nprobe=nprobe or self.nprobe)
+        if ns.kind == "hnsw":
+            return faiss.SearchParametersHNSW(efSearch=ef_search or self.ef_search)
+        return None
+
+    def _rebuild_locked(self, ns: _Namespace, kind: str, training_vectors: Optional[np.ndarray] = None):
+        """Re-index a flat namespace's live vectors into a trained index of the given kind"""
+        if ns.kind != "flat":
+            raise ValueError(f"Only exact (flat) namespaces can be rebuilt, this one is {ns.kind}")
+        flat = faiss.downcast_index(ns.index.index)
+        ids = faiss.vector_to_array(ns.index.id_map).astype(np.int64)
+        vectors = flat.reconstruct_n(0, flat.ntotal)
+        live = np.fromiter((int(i) in ns.texts for i in ids), dtype=bool, count=len(ids))
+        ids, vectors = ids[live], vectors[live]
+
+        index = build_index(self.dim, kind, n_vectors=len(vectors))
+        if not index.is_trained:
+            index.train(training_vectors if training_vectors is not None else vectors)
+        index.add_with_ids(vectors, ids)
+        ns.index = index
+        ns.kind = kind
+        ns.mapped_from = None
+        ns.dirty = True
+
+    def _maybe_promote(self, ns: _Namespace):
+        if self.index_kind != "flat" and ns.kind == "flat" and len(ns.texts) >= self.ann_min_vectors:
+            logger.info(f"Rebuilding memory namespace with {len(ns.texts)} vectors as {self.index_kind}")
+            self._rebuild_locked(ns, self.index_kind)
+
+    def rebuild(self, namespace: str, kind: Optional[str] = None, training_vectors=None):
+        """Train and switch an exact namespace to an ANN index now, e.g. after a bulk import"""
+        ns = self._namespace(namespace, create=False)
+        if ns is None:
+            raise KeyError(namespace)
+        sample = self._as_matrix(training_vectors) if training_vectors is not None else None
+        with ns.lock:
+            self._make_writable(ns)
+            self._rebuild_locked(ns, kind or self.index_kind, sample)
+
+    def _namespace(self, namespace: str, create: bool = True) -> Optional[_Namespace]:
+        ns = self._namespaces.get(namespace)
+        if ns is None and create:
+            with self._lock:
+                ns = self._namespaces.get(namespace)
+                if ns is None:
+                    ns = self._namespaces[namespace] = _Namespace(self._new_index(), {}, {})
+        return ns
+
+    def _as_matrix(self, vectors) -> np.ndarray:
+        """View the input as a contiguous float32 (n, dim) matrix - copies only if the dtype/layout differ"""
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got shape {matrix.shape}")
+        return matrix
+
+    @staticmethod
+    def _make_writable(ns: _Namespace):
+        # A memory-mapped index is read-only; the first write reads it fully into memory
+        if ns.mapped_from:
+            ns.index = faiss.read_index(ns.mapped_from)
+            ns.mapped_from = None
+
+    # ------------------------------------------------------------------ writes
+
+    def add_batch(self, namespace: str, vectors, texts: Sequence[str],
+                  metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+                  ids: Optional[Sequence[int]] = None) -> List[int]:
+        """Add many vectors in one FAISS call. Returns the ids assigned to them.
+
+        With explicit ids (e.g. database row ids), ids the namespace already holds
+        are skipped and the rest are returned.
+        """
+        matrix = self._as_matrix(vectors)
+        if len(texts) != len(matrix):
+            raise ValueError(f"Got {len(matrix)} vectors but {len(texts)} texts")
+        if metadata is not None and len(metadata) != len(matrix):
+            raise ValueError(f"Got {len(matrix)} vectors but {len(metadata)} metadata entries")
+        if ids is not None and len(ids) != len(matrix):
+            raise ValueError(f"Got {len(matrix)} vectors but {len(ids)} ids")
+
+        ns = self._namespace(namespace)
+        with ns.lock:
+            self._make_writable(ns)
+            if ids is None:
+                positions = list(range(len(matrix)))
+                new_ids = np.arange(ns.next_id, ns.next_id + len(matrix), dtype=np.int64)
+            else:
+                positions = [position for position, vector_id in enumerate(ids) if int(vector_id) not in ns.texts]
+                new_ids = np.asarray([ids[position] for position in positions], dtype=np.int64)
+            if not positions:
+                return []
+            ns.index.add_with_ids(matrix[positions], new_ids)
+            ns.next_id = max(ns.next_id, int(new_ids.max()) + 1)
+            for position, vector_id in zip(positions, new_ids.tolist()):
+                ns.texts[vector_id] = texts[position]
+                if metadata is not None and metadata[position]:
+                    ns.metadata[vector_id] = dict(metadata[position])
+            ns.dirty = True
+            self._maybe_promote(ns)
+        return new_ids.tolist()
+
+    def add(self, vector, text: str, namespace: str = DEFAULT_NAMESPACE,
+            metadata: Optional[Dict[str, Any]] = None) -> int:
+        return self.add_batch(namespace, vector, [text], [metadata])[0]
+
+    def delete(self, namespace: str, ids: Sequence[int]) -> int:
+        """Remove vectors by id. Returns how many were removed."""
+        ns = self._namespace(namespace, create=False)
+        if ns is None or not len(ids):
+            return 0
+        with ns.lock:
+            self._make_writable(ns)
+            removed = 0
+            for vector_id in ids:
+                if ns.texts.pop(int(vector_id), None) is not None:
+                    removed += 1
+                ns.metadata.pop(int(vector_id), None)
+            if ns.kind != "hnsw":
+                ns.index.remove_ids(np.asarray(ids, dtype=np.int64))
+            # HNSW graphs can't drop nodes: the vector stays as a tombstone that searches skip
+            ns.dirty = True
+        return removed
+
+    def drop_namespace(self, namespace: str):
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+        if self.path:
+            for suffix in (".faiss", ".json"):
+                (self.path / f"{quote(namespace, safe='')}{suffix}").unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------ reads
+
+    def search_batch(self, namespace: str, queries, k: int = 5, nprobe: Optional[int] = None,
+                     ef_search: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Nearest stored snippets for each query vector, closest first.
+
+        nprobe (IVF cells visited) and ef_search (HNSW beam width) trade speed
+        for recall on ANN namespaces and are ignored on exact ones.
+        """
+        matrix = self._as_matrix(queries)
+        ns = self._namespace(namespace, create=False)
+        if ns is None or k <= 0:
+            return [[] for _ in range(len(matrix))]
+        with ns.lock:
+            if not ns.texts:
+                return [[] for _ in range(len(matrix))]
+            # Ask for extra neighbours to cover HNSW tombstones that are filtered out below
+            tombstones = ns.index.ntotal - len(ns.texts)
+            fetch = min(k + tombstones, ns.index.ntotal)
+            params = self._search_params(ns, nprobe, ef_search)
+            if params is None:
+                distances, ids = ns.index.search(matrix, fetch)
+            else:
+                distances, ids = ns.index.search(matrix, fetch, params=params)
+            results = []
+            for row_distances, row_ids in zip(distances, ids):
+                hits = []
+                for distance, vector_id in zip(row_distances.tolist(), row_ids.tolist()):
+                    if vector_id < 0 or vector_id not in ns.texts:
+                        continue
+                    if len(hits) == k:
+                        break
+                    hits.append({
+                        "id": vector_id,
+                        "text": ns.texts.get(vector_id),
+                        "distance": distance,
+                        "metadata": ns.metadata.get(vector_id, {}),
+                    })
+                results.append(hits)
+        return results
+
+    def search(self, vector, k: int = 5, namespace: str = DEFAULT_NAMESPACE) -> List[str]:
+        """Texts of the k nearest snippets to a single query vector"""
+        return [hit["text"] for hit in self.search_batch(namespace, vector, k)[0]]
+
+    def count(self, namespace: str) -> int:
+        ns = self._namespace(namespace, create=False)
+        return len(ns.texts) if ns else 0
+
+    def namespaces(self) -> List[str]:
+        return list(self._namespaces)
+
+    # ------------------------------------------------------------------ async
+
+    async def asearch_batch(self, namespace: str, queries, k: int = 5, nprobe: Optional[int] = None,
+                            ef_search: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.search_batch, namespace, queries, k, nprobe, ef_search
+        )
+
+    async def asearch(self, vector, k: int = 5, namespace: str = DEFAULT_NAMESPACE) -> List[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.search, vector, k, namespace)
+
+    async def aadd_batch(self, namespace: str, vectors, texts: Sequence[str],
+                         metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+                         ids: Optional[Sequence[int]] = None) -> List[int]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.add_batch, namespace, vectors, texts, metadata, ids)
+
+    def high_water(self, namespace: str) -> int:
+        """One past the highest id the namespace holds (0 if it does not exist)"""
+        ns = self._namespace(namespace, create=False)
+        return ns.next_id if ns else 0
+
+    # ------------------------------------------------------------------ persistence
+
+    def save(self, only_dirty: bool = True) -> int:
+        """Write each namespace's index and texts to the store directory. Returns namespaces written.
+
+        Several API workers share the directory, so each namespace's pair of files
+        is replaced under an exclusive flock; a namespace is always read back as
+        the index and texts of the same worker.
+        """
+        if not self.path:
+            return 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for namespace, ns in list(self._namespaces.items()):
+            if only_dirty and not ns.dirty:
+                continue
+            stem = self.path / quote(namespace, safe='')
+            with ns.lock, open(self.path / ".lock", "a") as lock_file:
+                _flock(lock_file, LOCK_EX)
+                # Write to temporary files and rename, so a crash never leaves a half-written index
+                faiss.write_index(ns.index, f"{stem}.faiss.tmp")
+                with open(f"{stem}.json.tmp", "w") as f:
+                    json.dump({
+                        "dim": self.dim,
+                        "kind": ns.kind,
+                        "next_id": ns.next_id,
+                        "texts": {str(i): text for i, text in ns.texts.items()},
+                        "metadata": {str(i): meta for i, meta in ns.metadata.items()},
+                    }, f)
+                os.replace(f"{stem}.faiss.tmp", f"{stem}.faiss")
+                os.replace(f"{stem}.json.tmp", f"{stem}.json")
+                ns.dirty = False
+            written += 1
+        return written
+
+    def load(self, mmap: bool = True) -> int:
+        """Load every saved namespace. With mmap the index data is paged in lazily from disk."""
+        if not self.path or not self.path.exists():
+            return 0
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+        loaded = 0
+        for index_file in sorted(self.path.glob("*.faiss")):
+            namespace = unquote(index_file.stem)
+            try:
+                with open(self.path / ".lock", "a") as lock_file:
+                    _flock(lock_file, LOCK_SH)
+                    with open(index_file.with_suffix(".json")) as f:
+                        state = json.load(f)
+                    if state.get("dim", self.dim) != self.dim:
+                        raise ValueError(f"index dimension {state.get('dim')} does not match {self.dim}")
+                    index = faiss.read_index(str(index_file), flags)
+            except Exception as e:
+                logger.error(f"Could not load memory namespace {namespace}: {e}")
+                continue
+            with self._lock:
+                self._namespaces[namespace] = _Namespace(
+                    index,
+                    {int(i): text for i, text in state.get("texts", {}).items()},
+                    {int(i): meta for i, meta in state.get("metadata", {}).items()},
+                    next_id=state.get("next_id", index.ntotal),
+                    mapped_from=str(index_file) if mmap else None,
+                    kind=state.get("kind", "flat")
+                )
+            loaded += 1
+        return loaded
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+# Process-wide store; loaded at startup and saved on shutdown. ConversationMemory keeps it in
+# step with the memory_snippets table, which every worker shares.
+memory_store = MemoryStore()
@@ -0,0 +1,199 @@
+"""
+Request metrics for DealTracker Sales Agent
+Per-route latency histograms, in-flight requests, and DB / Slack / OpenAI time per request,
+exposed in Prometheus text format
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+
+# Seconds; request latency and outbound calls share the same buckets so they line up on a dashboard
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+PROMETHEUS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+UNMATCHED_ROUTE = "<unmatched>"
+
+# With several uvicorn workers each keeps its own metrics, and a scrape lands on one of them at random.
+# Set PROMETHEUS_MULTIPROC_DIR (an empty directory, cleared before the workers start, as Dockerfile.prod
+# does) and every worker writes its samples there; /metrics then sums all workers.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", multiprocess_mode="livesum")
+requests_total = Counter(
+    "http_requests", "HTTP requests served", ("method", "route", "status"))
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"), buckets=LATENCY_BUCKETS)
+request_db_time = Histogram(
+    "http_request_db_seconds", "Time a request spent executing SQL", ("method", "route"), buckets=LATENCY_BUCKETS)
+request_external_time = Histogram(
+    "http_request_external_seconds", "Time a request spent waiting on an outbound API",
+    ("method", "route", "service"), buckets=LATENCY_BUCKETS)
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time, any caller", ("engine",),
+    buckets=DB_STATEMENT_BUCKETS)
+external_call_duration = Histogram(
+    "external_call_duration_seconds", "Outbound API call time, any caller", ("service",), buckets=LATENCY_BUCKETS)
+
+
+class RequestStats:
+    """Time spent inside one request, filled in by the DB and outbound-call hooks"""
+    __slots__ = ("db_seconds", "db_statements", "external")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_statements = 0
+        self.external: Dict[str, float] = {}
+
+
+# Set by MetricsMiddleware for the duration of a request; copied into the threadpool
+# for sync endpoints and across LoopBridge.run for their Slack/OpenAI calls
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+# ================== DATABASE ==================
+
+def instrument_engine(engine, label: str):
+    """Time every statement on a (sync) Engine; pass async_engine.sync_engine for an AsyncEngine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("metrics_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        db_statement_duration.labels(label).observe(elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_seconds += elapsed
+            stats.db_statements += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("metrics_started"):
+            connection.info["metrics_started"].pop()
+
+
+# ================== OUTBOUND CALLS ==================
+
+def record_external(service: str, elapsed: float):
+    external_call_duration.labels(service).observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.external[service] = stats.external.get(service, 0.0) + elapsed
+
+
+@contextmanager
+def external_call(service: str):
+    """Time a block as an outbound call to `service`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_external(service, time.perf_counter() - start)
+
+
+def aiohttp_trace_config(service: str):
+    """aiohttp TraceConfig that records every request a session makes as an outbound call"""
+    import aiohttp
+
+    async def on_start(session, context, params):
+        context.started = time.perf_counter()
+
+    async def on_end(session, context, params):
+        if getattr(context, "started", None) is not None:
+            record_external(service, time.perf_counter() - context.started)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_start)
+    trace_config.on_request_end.append(on_end)
+    trace_config.on_request_exception.append(on_end)
+    return trace_config
+
+
+def timed_httpx_transport(transport, service: str):
+    """Wrap an httpx async transport so each request is recorded as an outbound call"""
+    import httpx
+
+    class TimedTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            with external_call(service):
+                return await transport.handle_async_request(request)
+
+        async def aclose(self):
+            await transport.aclose()
+
+    return TimedTransport()
+
+
+# ================== ASGI MIDDLEWARE ==================
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware body buffering) recording per-route metrics.
+
+    The route label is the matched path template, e.g. /sales/goals/{user_id}/current,
+    so series stay bounded no matter how many ids are requested.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight.dec()
+            current_request.reset(token)
+
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+            requests_total.labels(*labels, str(status_code)).inc()
+            request_duration.labels(*labels).observe(elapsed)
+            request_db_time.labels(*labels).observe(stats.db_seconds)
+            for service, seconds in stats.external.items():
+                request_external_time.labels(*labels, service).observe(seconds)
+
+
+def render_metrics() -> bytes:
+    """Every worker's metrics in multiprocess mode, otherwise this process's"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_worker_dead():
+    """On worker shutdown: drop this worker's live gauges (in-flight requests) from the sum"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Boolean, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Boolean, Text, DateTime, JSON, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -11,7 +11,11 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False)
     slack_user_id = Column(String(50), unique=True, nullable=True)  # For Slack integration
     role = Column(String(50), default="user")  # Added role for sales team identification
+    timezone = Column(String(64), nullable=True)  # IANA name, e.g. America/Denver; DEFAULT_TIMEZONE if unset
+    password_hash = Column(String(100), nullable=True)  # bcrypt; users synced from Slack have none
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Set whenever the profile changes; every worker polls it to drop cached tokens (see token_cache)
+    auth_changed_at = Column(DateTime, nullable=True, index=True)
     projects = relationship('Project', back_populates='owner')
     tasks = relationship('Task', back_populates='owner')
     goals = relationship('Goal', back_populates='owner')
@@ -31,6 +35,12 @@ class Project(Base):
 
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id); the owner/project variants serve filtered listings
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_owner_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_tasks_project_created_at_id", "project_id", "created_at", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(300), nullable=False)
     description = Column(Text)
@@ -89,7 +99,7 @@ class SalesConversation(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_slack_id = Column(String(50), nullable=False)  # Slack user ID
     week_start = Column(Date, nullable=False)
-    conversation_type = Column(String(50), nullable=False)  # weekly_goals, midweek_check, weekly_summary
+    conversation_type = Column(String(50), nullable=False)  # weekly_goals_prompt (awaiting a reply), weekly_goals, midweek_check, weekly_summary
     
     # Store conversation data as JSON
     goals_data = Column(JSON, nullable=True)  # Store parsed goals
@@ -102,6 +112,9 @@ class SalesConversation(Base):
 class SalesMetric(Base):
     """Track detailed sales metrics and performance"""
     __tablename__ = "sales_metrics"
+    __table_args__ = (
+        UniqueConstraint("user_id", "week_start", name="uq_sales_metrics_user_week"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -135,6 +148,9 @@ class SalesMetric(Base):
 class TeamLeaderboard(Base):
     """Store weekly team leaderboard snapshots"""
     __tablename__ = "team_leaderboards"
+    __table_args__ = (
+        UniqueConstraint("week_start", "user_id", name="uq_team_leaderboards_week_user"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     week_start = Column(Date, nullable=False)
@@ -156,4 +172,83 @@ class TeamLeaderboard(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    user = relationship("User") 
\ No newline at end of file
+    user = relationship("User") 
+
+class SchedulerLease(Base):
+    """Leader lease so only one API worker runs the scheduled sales jobs"""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(200), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    generation = Column(Integer, nullable=True, default=1)  # Bumped every time the lease changes hands
+
+class JobRun(Base):
+    """Ledger entry for one execution of a scheduled sales job"""
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        UniqueConstraint("job_id", "run_key", name="uq_job_runs_job_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(100), nullable=False, index=True)  # monday_goal_prompts, friday_summaries, ...
+    run_key = Column(String(100), nullable=False)  # Period the run covers, e.g. the week start
+    status = Column(String(20), default="running")  # running, completed, failed
+    worker = Column(String(200), nullable=True)
+    lease_generation = Column(Integer, nullable=True)  # Lease generation the worker held while running it
+    
+    total_items = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    resume_count = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    
+    items = relationship("JobRunItem", back_populates="run")
+
+class JobRunItem(Base):
+    """Per-user outcome of a scheduled job run, written as a checkpoint"""
+    __tablename__ = "job_run_items"
+    __table_args__ = (
+        UniqueConstraint("run_id", "user_id", name="uq_job_run_items_run_user"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("job_runs.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(String(20), default="started")  # started, sent, skipped, failed, interrupted
+    error = Column(Text, nullable=True)
+    
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    
+    run = relationship("JobRun", back_populates="items")
+
+class RevokedToken(Base):
+    """Access tokens revoked by logout, shared by every API worker until the token would have expired"""
+    __tablename__ = "revoked_tokens"
+    
+    token_hash = Column(String(64), primary_key=True)  # sha256 of the JWT signature
+    user_id = Column(Integer, nullable=False)  # No foreign key, so revocations never block deleting a user
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+
+class MemorySnippet(Base):
+    """Conversational memory shared by every API worker; each worker's FAISS index is built from these rows"""
+    __tablename__ = "memory_snippets"
+    __table_args__ = (
+        # Workers catch up on a namespace by reading the rows past the highest id they hold
+        Index("ix_memory_snippets_namespace_id", "namespace", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    namespace = Column(String(200), nullable=False)  # "user:<slack id>"
+    text = Column(Text, nullable=False)
+    meta = Column(JSON, nullable=True)
+    vector = Column(LargeBinary, nullable=False)  # float32 embedding, unit length
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,216 @@
-# Placeholder for LangChain or HuggingFace LLM integration
+"""
+Goal parsing for DealTracker Sales Agent
+Extracts call/demo/proposal targets from a rep's reply: a compiled deterministic
+extractor first, the LLM (JSON mode) only when the extractor is unsure
+"""
 
-def parse_goal_from_text(text: str):
-    # Use LLM to extract goal/task from text
-    return {"parsed_goal": text} 
\ No newline at end of file
+import os
+import re
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.services.ai_service import ai_service as shared_ai_service
+from app.services.loop_bridge import loop_bridge
+
+logger = logging.getLogger(__name__)
+
+GOAL_FIELDS = ("calls_target", "demos_target", "proposals_target")
+
+# Replies the extractor scores below this go to the LLM
+GOAL_PARSE_MIN_CONFIDENCE = float(os.getenv("GOAL_PARSE_MIN_CONFIDENCE", "0.75"))
+GOAL_PARSE_CACHE_SIZE = int(os.getenv("GOAL_PARSE_CACHE_SIZE", "2048"))
+# Anything above this is a typo or not a weekly target (e.g. a dollar amount)
+GOAL_MAX_TARGET = int(os.getenv("GOAL_MAX_TARGET", "500"))
+
+_WORD_NUMBERS = {
+    "zero": 0, "no": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "twenty": 20,
+    "thirty": 30, "forty": 40, "fifty": 50,
+}
+_NUMBER = r"\d+|" + "|".join(sorted(_WORD_NUMBERS, key=len, reverse=True))
+_KEYWORDS = {
+    "calls_target": r"calls?|dials?|phone\s*calls?",
+    "demos_target": r"demos?|demonstrations?|presentations?",
+    "proposals_target": r"proposals?|quotes?|pitches",
+}
+# "5 discovery calls", "ten new demos" - up to two words between the number and the keyword
+_NUMBER_FIRST = {
+    field: re.compile(rf"\b(?P<number>{_NUMBER})\s+(?:[a-z'-]+\s+){{0,2}}?(?:{keywords})\b")
+    for field, keywords in _KEYWORDS.items()
+}
+# "calls: 5", "demos - 2", "proposals 3"
+_KEYWORD_FIRST = {
+    field: re.compile(rf"\b(?:{keywords})\s*[:=-]?\s*(?P<number>\d+)\b")
+    for field, keywords in _KEYWORDS.items()
+}
+_ANY_NUMBER = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Cache key for a reply: case and spacing never change what it means"""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _to_int(token: str) -> int:
+    return int(token) if token.isdigit() else _WORD_NUMBERS[token]
+
+
+def _assign(text: str, passes) -> Tuple[Dict[str, int], list]:
+    goals = {field: 0 for field in GOAL_FIELDS}
+    claimed = []
+    for patterns in passes:
+        for field in GOAL_FIELDS:
+            for match in patterns[field].finditer(text):
+                span = match.span("number")
+                if span in claimed:
+                    continue
+                claimed.append(span)
+                goals[field] += _to_int(match.group("number"))
+    return goals, claimed
+
+
+def extract_goals(text: str) -> Tuple[Dict[str, int], float]:
+    """Deterministic goals and a confidence in [0, 1].
+
+    1.0 when every digit in the reply is attached to a category keyword; lower
+    when numbers are left over or had to be assigned by position.
+    """
+    text = normalize(text)
+    # "5 calls 3 demos" and "calls 5 demos 3" share the substring "calls 5"/"5 demos"; try both
+    # readings and keep the one that attributes numbers to more distinct categories
+    goals, claimed = max(
+        (_assign(text, (_NUMBER_FIRST, _KEYWORD_FIRST)), _assign(text, (_KEYWORD_FIRST, _NUMBER_FIRST))),
+        key=lambda reading: sum(1 for value in reading[0].values() if value)
+    )
+
+    digits = [match.span() for match in _ANY_NUMBER.finditer(text)]
+    unclaimed = [span for span in digits if span not in claimed]
+    if claimed:
+        confidence = 1.0 if not unclaimed else 0.5
+    elif len(digits) >= 3:
+        # "10, 3, 2" - the order the weekly prompt asks in
+        for field, (start, end) in zip(GOAL_FIELDS, digits):
+            goals[field] = int(text[start:end])
+        confidence = 0.4
+    elif len(digits) == 1:
+        goals["calls_target"] = int(text[digits[0][0]:digits[0][1]])
+        confidence = 0.3
+    else:
+        confidence = 0.0
+
+    if any(value > GOAL_MAX_TARGET for value in goals.values()):
+        confidence = min(confidence, 0.2)
+    return goals, confidence
+
+
+def _clean_llm_goals(data) -> Optional[Dict[str, int]]:
+    if not isinstance(data, dict):
+        return None
+    goals = {}
+    for field in GOAL_FIELDS:
+        try:
+            value = int(data.get(field) or 0)
+        except (TypeError, ValueError):
+            return None
+        goals[field] = min(max(value, 0), GOAL_MAX_TARGET)
+    return goals
+
+
+class GoalParser:
+    """Goal replies to {calls_target, demos_target, proposals_target}, cached by normalized text.
+
+    Most replies ("10 calls, 3 demos, 2 proposals") are fully explained by the
+    extractor and never leave the process. The rest are sent to the LLM in
+    JSON mode; if that is unavailable or fails, the extractor's best guess is
+    used (and not cached, so the reply is retried next time).
+    """
+
+    def __init__(self, min_confidence: float = GOAL_PARSE_MIN_CONFIDENCE, cache_size: int = GOAL_PARSE_CACHE_SIZE):
+        self.min_confidence = min_confidence
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"cache": 0, "fast_path": 0, "llm": 0, "fallback": 0}
+
+    def _cached(self, key: str) -> Optional[Dict[str, int]]:
+        with self._lock:
+            goals = self._cache.get(key)
+            if goals is not None:
+                self._cache.move_to_end(key)
+                self._counts["cache"] += 1
+                return dict(goals)
+        return None
+
+    def _store(self, key: str, goals: Dict[str, int], path: str):
+        with self._lock:
+            self._counts[path] += 1
+            if path == "fallback":
+                return
+            self._cache[key] = dict(goals)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _fast_path(self, text: str) -> Tuple[str, Optional[Dict[str, int]], Dict[str, int]]:
+        key = normalize(text)
+        cached = self._cached(key)
+        if cached is not None:
+            return key, cached, cached
+        goals, confidence = extract_goals(text)
+        if confidence >= self.min_confidence:
+            self._store(key, goals, "fast_path")
+            return key, goals, goals
+        return key, None, goals
+
+    def _finish(self, key: str, llm_goals, guess: Dict[str, int]) -> Dict[str, int]:
+        goals = _clean_llm_goals(llm_goals)
+        if goals is None:
+            self._store(key, guess, "fallback")
+            return guess
+        self._store(key, goals, "llm")
+        return goals
+
+    async def aparse(self, text: str, ai_service=None) -> Dict[str, int]:
+        key, goals, guess = self._fast_path(text)
+        if goals is not None:
+            return goals
+        ai_service = ai_service or shared_ai_service
+        return self._finish(key, await ai_service.extract_goals(text), guess)
+
+    def parse(self, text: str, ai_service=None) -> Dict[str, int]:
+        """Synchronous parse; an LLM call runs on the shared background loop"""
+        key, goals, guess = self._fast_path(text)
+        if goals is not None:
+            return goals
+        try:
+            llm_goals = loop_bridge.run(
+                (ai_service or loop_bridge.ai_service).extract_goals(text)
+            )
+        except Exception as e:
+            logger.error(f"Goal parsing LLM call failed: {e}")
+            llm_goals = None
+        return self._finish(key, llm_goals, guess)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+            cached = len(self._cache)
+        total = sum(counts.values())
+        return {
+            "parsed": total,
+            **counts,
+            "cached_replies": cached,
+            "fast_path_rate": round((counts["cache"] + counts["fast_path"]) / total, 3) if total else 0.0,
+            "llm_rate": round((counts["llm"] + counts["fallback"]) / total, 3) if total else 0.0,
+        }
+
+
+# Process-wide parser so every caller shares the cache and the hit-rate counters
+goal_parser = GoalParser()
+
+
+def parse_goal_from_text(text: str) -> Dict[str, int]:
+    """Weekly targets from a rep's reply, e.g. {"calls_target": 10, "demos_target": 3, "proposals_target": 2}"""
+    return goal_parser.parse(text)
@@ -0,0 +1,214 @@
+"""
+Query counting for DealTracker Sales Agent
+Counts SQL statements per request or job, groups them by statement shape and flags N+1 patterns.
+
+Also a pytest plugin: add `pytest_plugins = ["app.query_counter"]` to a conftest.py and use the
+query_budget fixture:
+
+    def test_team_progress(client, query_budget):
+        with query_budget(3):
+            client.get("/sales/progress/team")
+"""
+
+import os
+import re
+import time
+import logging
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Count queries for every request and scheduler job (development); tests use query_budget directly
+QUERY_COUNTER_ENABLED = os.getenv("QUERY_COUNTER_ENABLED", "false").lower() in ("1", "true", "yes")
+# The same statement shape run this many times in one request/job is reported as a likely N+1
+QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5"))
+# Raise NPlusOneError instead of logging a warning
+QUERY_COUNTER_STRICT = os.getenv("QUERY_COUNTER_STRICT", "false").lower() in ("1", "true", "yes")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Bound parameters in every paramstyle our drivers use: ?, :name, %(name)s, $1 (Postgres ::casts excluded)
+_PARAMETER = re.compile(r"%\(\w+\)s|(?<!:):\w+|\$\d+|\?")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    """A request or job ran the same statement shape QUERY_N_PLUS_ONE_THRESHOLD times or more"""
+
+
+@lru_cache(maxsize=4096)
+def statement_shape(statement: str) -> str:
+    """The statement with literals and parameters replaced, so per-row repeats group together.
+
+    "... WHERE id = 3", "... WHERE id = ?" and "... WHERE id IN (?, ?, ?)" all
+    become "... WHERE id = ?" / "... WHERE id IN (?)".
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PARAMETER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAMETER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryCounter:
+    """Statements executed inside one scope, grouped by shape"""
+
+    def __init__(self, name: str):
+        self.name = name
+        # shape -> [executions, seconds]
+        self.shapes: Dict[str, List] = {}
+
+    def record(self, statement: str, seconds: float):
+        entry = self.shapes.setdefault(statement_shape(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    @property
+    def count(self) -> int:
+        return sum(executions for executions, _ in self.shapes.values())
+
+    @property
+    def seconds(self) -> float:
+        return sum(seconds for _, seconds in self.shapes.values())
+
+    def repeated(self, threshold: int = QUERY_N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Shapes run at least `threshold` times, most repeated first"""
+        return sorted(
+            ((shape, executions) for shape, (executions, _) in self.shapes.items() if executions >= threshold),
+            key=lambda item: item[1], reverse=True
+        )
+
+    def format(self, limit: int = 10) -> str:
+        lines = [f"{self.name}: {self.count} statements in {self.seconds * 1000:.1f} ms"]
+        ranked = sorted(self.shapes.items(), key=lambda item: item[1][0], reverse=True)
+        for shape, (executions, seconds) in ranked[:limit]:
+            lines.append(f"  {executions:>5}x {seconds * 1000:8.1f} ms  {shape[:200]}")
+        return "\n".join(lines)
+
+
+_active: ContextVar[Tuple[QueryCounter, ...]] = ContextVar("query_counters", default=())
+
+
+def report(counter: QueryCounter, threshold: int = QUERY_N_PLUS_ONE_THRESHOLD, strict: bool = QUERY_COUNTER_STRICT):
+    suspects = counter.repeated(threshold)
+    if not suspects:
+        return
+    message = f"Possible N+1 in {counter.name}: " + "; ".join(
+        f"{executions}x {shape[:120]}" for shape, executions in suspects
+    )
+    if strict:
+        raise NPlusOneError(message + "\n" + counter.format())
+    logger.warning(message)
+
+
+@contextmanager
+def count_queries(name: str, threshold: Optional[int] = QUERY_N_PLUS_ONE_THRESHOLD,
+                  strict: bool = QUERY_COUNTER_STRICT):
+    """Count every statement run in this context (including nested scopes and threadpool/bridge calls).
+
+    Pass threshold=None to only count, without N+1 reporting.
+    """
+    counter = QueryCounter(name)
+    token = _active.set(_active.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
+    if threshold is not None:
+        report(counter, threshold, strict)
+
+
+def query_scope(name: str, **options):
+    """count_queries when QUERY_COUNTER_ENABLED, otherwise a no-op yielding None"""
+    return count_queries(name, **options) if QUERY_COUNTER_ENABLED else nullcontext()
+
+
+# ================== ENGINE HOOKS ==================
+
+_instrumented = set()
+
+
+def install(engine):
+    """Attach the counter to a (sync) Engine; pass async_engine.sync_engine for an AsyncEngine"""
+    if id(engine) in _instrumented:
+        return
+    _instrumented.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if _active.get():
+            conn.info.setdefault("query_counter_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        counters = _active.get()
+        started = conn.info.get("query_counter_started")
+        if not counters or not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        for counter in counters:
+            counter.record(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_counter_started"):
+            connection.info["query_counter_started"].pop()
+
+
+def install_app_engines():
+    from app.database import engine, sync_engine
+    install(engine.sync_engine)
+    install(sync_engine)
+
+
+# ================== ASGI MIDDLEWARE ==================
+
+class QueryCounterMiddleware:
+    """Counts statements per request and reports N+1 shapes under the route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with count_queries(scope["path"]) as counter:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get("route")
+                counter.name = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+# ================== PYTEST PLUGIN ==================
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def query_budget():
+        """`with query_budget(3): ...` fails the test if the block runs more than 3 statements,
+        or any statement shape QUERY_N_PLUS_ONE_THRESHOLD times (pass n_plus_one=None to allow it)"""
+        install_app_engines()
+
+        @contextmanager
+        def budget(max_queries: int, n_plus_one: Optional[int] = QUERY_N_PLUS_ONE_THRESHOLD, name: str = "block"):
+            with count_queries(name, threshold=None) as counter:
+                yield counter
+            if counter.count > max_queries:
+                pytest.fail(f"Query budget exceeded: {counter.count} > {max_queries}\n{counter.format()}")
+            if n_plus_one is not None and counter.repeated(n_plus_one):
+                pytest.fail(f"Possible N+1 (same statement {n_plus_one}+ times)\n{counter.format()}")
+
+        return budget
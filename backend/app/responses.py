@@ -0,0 +1,33 @@
+"""
+JSON responses for DealTracker Sales Agent
+orjson as the app-wide encoder, plus a fast path for hot endpoints that skips FastAPI's response_model pass
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Encode already-shaped content (dicts, lists, dates, numbers) straight to JSON.
+
+    Returning a Response from an endpoint skips FastAPI validating the value
+    against the route's response_model and re-encoding it; the response_model
+    still documents the route. Only use it where the content is built to
+    match that model.
+    """
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def model_response(payload: BaseModel, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialize a pydantic model once, in pydantic-core, without FastAPI dumping and re-validating it"""
+    return Response(payload.model_dump_json(), status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def adapter_response(adapter: TypeAdapter, value: Any, status_code: int = 200,
+                     headers: Optional[Dict[str, str]] = None) -> Response:
+    """model_response for lists and other non-model types, e.g. TypeAdapter(List[SomeModel])"""
+    return Response(adapter.dump_json(value), status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
@@ -1,17 +0,0 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from .. import models, schemas, crud, database
-from typing import List
-
-router = APIRouter(prefix="/users", tags=["users"])
-
-@router.post("/", response_model=schemas.User)
-async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(database.get_db)):
-    return await crud.create_user(db, user)
-
-@router.get("/{user_id}", response_model=schemas.User)
-async def get_user(user_id: int, db: AsyncSession = Depends(database.get_db)):
-    user = await crud.get_user(db, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user 
\ No newline at end of file
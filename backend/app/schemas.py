@@ -1,57 +1,102 @@
-from pydantic import BaseModel
-from typing import Optional, List
-from datetime import date
+from pydantic import BaseModel, ConfigDict
+from typing import Literal, Optional
+from datetime import date, datetime
 
-class UserBase(BaseModel):
+TaskStatus = Literal["Not Started", "In Progress", "Completed"]
+
+
+class ORMModel(BaseModel):
+    """Response models read straight off ORM objects"""
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserCreate(BaseModel):
     name: str
     email: str
-    slack_id: Optional[str]
+    slack_user_id: Optional[str] = None
+    role: str = "user"
+    timezone: Optional[str] = None
 
-class UserCreate(UserBase):
-    pass
+class UserUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    slack_user_id: Optional[str] = None
+    role: Optional[str] = None
+    timezone: Optional[str] = None
 
-class User(UserBase):
+class User(ORMModel):
     id: int
-    class Config:
-        orm_mode = True
-
-class ProjectBase(BaseModel):
     name: str
-    description: Optional[str]
+    email: str
+    slack_user_id: Optional[str] = None
+    role: Optional[str] = None
+    timezone: Optional[str] = None
+    created_at: Optional[datetime] = None
 
-class ProjectCreate(ProjectBase):
-    pass
 
-class Project(ProjectBase):
-    id: int
+class ProjectCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
     owner_id: int
-    class Config:
-        orm_mode = True
 
-class TaskBase(BaseModel):
+class ProjectUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+class TaskCreate(BaseModel):
     title: str
-    description: Optional[str]
-    completed: bool = False
+    description: Optional[str] = None
+    status: TaskStatus = "Not Started"
+    priority: str = "Medium"
+    task_type: str = "general"
+    due_date: Optional[date] = None
+    owner_id: int
+    project_id: int
 
-class TaskCreate(TaskBase):
-    pass
+class TaskUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[TaskStatus] = None
+    priority: Optional[str] = None
+    task_type: Optional[str] = None
+    due_date: Optional[date] = None
 
-class Task(TaskBase):
+class Task(ORMModel):
     id: int
+    title: str
+    description: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    task_type: Optional[str] = None
+    due_date: Optional[date] = None
+    completed_at: Optional[datetime] = None
+    owner_id: int
     project_id: int
-    class Config:
-        orm_mode = True
+    created_at: Optional[datetime] = None
 
-class GoalBase(BaseModel):
+
+class GoalCreate(BaseModel):
     description: str
     week_start: date
     achieved: bool = False
+    owner_id: int
+    project_id: int
 
-class GoalCreate(GoalBase):
-    pass
+class GoalUpdate(BaseModel):
+    description: Optional[str] = None
+    week_start: Optional[date] = None
+    achieved: Optional[bool] = None
 
-class Goal(GoalBase):
+class Goal(ORMModel):
     id: int
+    description: str
+    week_start: date
+    achieved: bool = False
+    owner_id: int
     project_id: int
-    class Config:
-        orm_mode = True 
\ No newline at end of file
+    created_at: Optional[datetime] = None
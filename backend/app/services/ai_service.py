@@ -10,24 +10,67 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Connection pool for the OpenAI HTTP client; keep-alive skips the TLS handshake on repeat calls
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", "20"))
+OPENAI_KEEPALIVE_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "60"))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+
+# Embeddings for conversational memory
+EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
+
+# Goal parsing needs a model that supports JSON-mode responses
+GOAL_PARSER_MODEL = os.getenv("OPENAI_GOAL_PARSER_MODEL", "gpt-3.5-turbo-1106")
+
+
+def create_http_client():
+    """httpx client tuned for OpenAI: pooled keep-alive connections and a bounded timeout"""
+    import httpx
+    from app.metrics import timed_httpx_transport
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=OPENAI_POOL_SIZE,
+            max_keepalive_connections=OPENAI_POOL_SIZE,
+            keepalive_expiry=OPENAI_KEEPALIVE_SECONDS
+        )
+    )
+    # Every OpenAI call is timed for the /metrics endpoint
+    return httpx.AsyncClient(
+        transport=timed_httpx_transport(transport, "openai"),
+        timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=10.0)
+    )
+
+
 class AIService:
     """Service for AI-powered content generation"""
     
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = None
+        self._client = None
+        self._client_initialized = False
         
-        if self.api_key:
-            try:
-                from openai import AsyncOpenAI
-                self.client = AsyncOpenAI(api_key=self.api_key)
-                logger.info("OpenAI client initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize OpenAI client: {e}. AI functionality will be disabled.")
-                self.client = None
-        else:
+        if not self.api_key:
             logger.warning("OPENAI_API_KEY not found. AI functionality will be disabled.")
     
+    @property
+    def client(self):
+        """OpenAI client, built on first use so requests that never call the model don't pay for it"""
+        if not self._client_initialized:
+            self._client_initialized = True
+            if self.api_key:
+                try:
+                    from openai import AsyncOpenAI
+                    self._client = AsyncOpenAI(api_key=self.api_key, http_client=create_http_client())
+                    logger.info("OpenAI client initialized successfully")
+                except Exception as e:
+                    logger.warning(f"Failed to initialize OpenAI client: {e}. AI functionality will be disabled.")
+                    self._client = None
+        return self._client
+    
+    @client.setter
+    def client(self, value):
+        self._client = value
+        self._client_initialized = True
+    
     async def generate_weekly_goal_prompt(self, user_name: str, previous_performance: Dict = None) -> str:
         """Generate a personalized weekly goal-setting prompt"""
         if not self.client:
@@ -143,6 +186,32 @@ class AIService:
             logger.error(f"Error analyzing goals: {str(e)}")
             return self._get_fallback_goal_analysis(goals_text)
     
+    async def extract_goals(self, goals_text: str) -> Optional[Dict[str, Any]]:
+        """Weekly call/demo/proposal targets from a rep's reply, via JSON mode. None if unavailable."""
+        if not self.client:
+            return None
+        
+        try:
+            response = await self.client.chat.completions.create(
+                model=GOAL_PARSER_MODEL,
+                messages=[
+                    {"role": "system", "content": "You are SalesPM. Extract the weekly sales targets from the rep's message. "
+                     "Respond with a JSON object with integer fields calls_target, demos_target and proposals_target; "
+                     "use 0 for any category the rep does not mention."},
+                    {"role": "user", "content": goals_text}
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=60,
+                temperature=0
+            )
+            
+            import json
+            return json.loads(response.choices[0].message.content)
+            
+        except Exception as e:
+            logger.error(f"Error extracting goals: {str(e)}")
+            return None
+    
     async def generate_milestone_celebration(self, user_name: str, achievement: str) -> str:
         """Generate a celebration message for achievements"""
         if not self.client:
@@ -193,6 +262,18 @@ class AIService:
         except Exception as e:
             logger.error(f"Error generating AI response: {str(e)}")
             return f"I apologize, but I'm having trouble generating a response right now. Error: {str(e)}"
+
+    async def embed_texts(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Embed texts in a single API request. Returns None when AI is unavailable.
+
+        Callers keep within the API's input limits; EmbeddingService plans the batches.
+        """
+        if not self.client:
+            return None
+
+        response = await self.client.embeddings.create(model=EMBEDDING_MODEL, input=list(texts))
+        # The API may return items out of order; index tells which input each one belongs to
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
     
     def _get_fallback_goal_prompt(self, user_name: str) -> str:
         """Fallback goal prompt when AI is not available"""
@@ -261,6 +342,11 @@ Keep up the great work! Every week is a new opportunity to excel. 🚀"""
     def is_configured(self) -> bool:
         """Check if AI service is properly configured"""
         return self.client is not None and self.api_key is not None
+    
+    async def close(self):
+        """Close the pooled HTTP client, if it was ever created"""
+        if self._client is not None:
+            await self._client.close()
 
 # Global instance - initialize safely
 try:
@@ -269,4 +355,9 @@ except Exception as e:
     logger.error(f"Failed to initialize AI service: {e}")
     # Create a fallback instance
     ai_service = AIService()
-    ai_service.client = None 
\ No newline at end of file
+    ai_service.client = None
+
+
+def get_ai_service() -> AIService:
+    """FastAPI dependency returning the process-wide AI client"""
+    return ai_service
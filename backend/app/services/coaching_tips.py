@@ -0,0 +1,151 @@
+"""
+Coaching Tips for DealTracker Sales Agent
+Parses the coaching_tips.txt knowledge base once and picks tips for the whole team in one NumPy pass
+"""
+
+import re
+import logging
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Category order used for every (reps, 3) array below
+CATEGORIES = ("calls", "demos", "proposals")
+BEHIND_SECTIONS = ("CALLS_BEHIND_TIPS", "DEMOS_BEHIND_TIPS", "PROPOSALS_BEHIND_TIPS")
+CATEGORY_EMOJI = ("📞", "🎬", "📋")
+MOTIVATION_SECTION = "GENERAL_MOTIVATION"
+STRETCH_SECTION = "STRETCH_GOAL_SUGGESTIONS"
+
+# A category below this percentage of its target gets a "behind" tip
+BEHIND_PERCENTAGE = 80
+# Reps at or above this overall percentage get a stretch-goal suggestion instead of motivation
+STRETCH_PERCENTAGE = 100
+MAX_TIPS = 3
+
+_section_header = re.compile(r"^([A-Z][A-Z_]+):\s*$")
+_tip_line = re.compile(r'^-\s*"?(.*?)"?\s*$')
+
+
+def parse_tip_file(text: str) -> Dict[str, List[str]]:
+    """SECTION_NAME: headers followed by - "tip" lines"""
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        header = _section_header.match(line)
+        if header:
+            current = sections.setdefault(header.group(1), [])
+            continue
+        tip = _tip_line.match(line)
+        if tip and current is not None and tip.group(1):
+            current.append(tip.group(1))
+    return sections
+
+
+def rotation_index(user_ids: np.ndarray, week_start: date) -> np.ndarray:
+    """Per-rep offset that advances by one every week, so a rep walks through a
+    section in order and only sees a tip again after the whole section"""
+    week = week_start.toordinal() // 7
+    # Spread reps across the list so teammates don't all get the same tip in the same week
+    return (np.asarray(user_ids, dtype=np.int64) * 7919 + week).astype(np.int64)
+
+
+class CoachingTipBook:
+    """The coaching tip knowledge base as NumPy string tables, one per section"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._sections: Optional[Dict[str, np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def sections(self) -> Dict[str, np.ndarray]:
+        if self._sections is None:
+            with self._lock:
+                if self._sections is None:
+                    self._sections = self._load()
+        return self._sections
+
+    def _load(self) -> Dict[str, np.ndarray]:
+        try:
+            parsed = parse_tip_file(self.path.read_text())
+        except FileNotFoundError:
+            logger.warning(f"Coaching tips file {self.path} not found; using built-in tips")
+            parsed = {}
+        defaults = {
+            "CALLS_BEHIND_TIPS": ["Block time each morning for prospecting calls"],
+            "DEMOS_BEHIND_TIPS": ["Follow up with your warmest leads to book demos"],
+            "PROPOSALS_BEHIND_TIPS": ["Send proposals within 24 hours of a demo"],
+            MOTIVATION_SECTION: ["Focus on your daily activities and the results will follow"],
+            STRETCH_SECTION: ["You're ahead of schedule - time to go after bigger prospects"],
+        }
+        for name, tips in defaults.items():
+            if not parsed.get(name):
+                parsed[name] = tips
+        return {name: np.asarray(tips, dtype=object) for name, tips in parsed.items()}
+
+    def reload(self):
+        with self._lock:
+            self._sections = None
+
+    def select(self, percentages: np.ndarray, has_target: np.ndarray, overall: np.ndarray,
+               user_ids: np.ndarray, week_start: date, max_tips: int = MAX_TIPS) -> List[List[str]]:
+        """Tips for every rep at once.
+
+        percentages and has_target are (reps, 3) in CATEGORIES order. Each rep
+        gets a tip for each category they are behind on, furthest behind first,
+        topped up with a stretch suggestion (ahead overall) or motivation.
+        """
+        sections = self.sections
+        percentages = np.asarray(percentages, dtype=np.float64).reshape(-1, len(CATEGORIES))
+        has_target = np.asarray(has_target, dtype=bool).reshape(percentages.shape)
+        overall = np.asarray(overall, dtype=np.float64)
+        n = len(percentages)
+        rotation = rotation_index(user_ids, week_start)
+
+        behind = has_target & (percentages < BEHIND_PERCENTAGE)
+        # Furthest behind first; categories that are on track sort last
+        order = np.argsort(np.where(behind, percentages, np.inf), axis=1, kind="stable")
+        behind_sorted = np.take_along_axis(behind, order, axis=1)
+
+        # One candidate tip per (rep, category), each category rotating through its own list
+        category_tips = np.empty((n, len(CATEGORIES)), dtype=object)
+        for column, (section, emoji) in enumerate(zip(BEHIND_SECTIONS, CATEGORY_EMOJI)):
+            tips = sections[section]
+            category_tips[:, column] = np.char.add(f"{emoji} ", tips[(rotation + column) % len(tips)].astype(str))
+        category_tips = np.take_along_axis(category_tips, order, axis=1)
+
+        closing_stretch = sections[STRETCH_SECTION][rotation % len(sections[STRETCH_SECTION])]
+        closing_motivation = sections[MOTIVATION_SECTION][rotation % len(sections[MOTIVATION_SECTION])]
+        closing = np.where(
+            overall >= STRETCH_PERCENTAGE,
+            np.char.add("🚀 ", closing_stretch.astype(str)),
+            np.char.add("💪 ", closing_motivation.astype(str)),
+        )
+
+        counts = behind_sorted.sum(axis=1)
+        result = []
+        for row in range(n):
+            tips = category_tips[row, :counts[row]].tolist()[:max_tips]
+            if len(tips) < max_tips:
+                tips.append(str(closing[row]))
+            result.append(tips)
+        return result
+
+    def select_for_progress(self, progress_list: Sequence[Dict], user_ids: Sequence[int],
+                            week_start: date) -> List[List[str]]:
+        """select() over get_weekly_progress dicts"""
+        if not progress_list:
+            return []
+        percentages = np.array([[p[f"{c}_percentage"] for c in CATEGORIES] for p in progress_list], dtype=np.float64)
+        targets = np.array([[p[f"{c}_target"] for c in CATEGORIES] for p in progress_list], dtype=np.int64)
+        # No call target still earns a calls tip (nothing booked yet); demos/proposals need a target
+        has_target = targets > 0
+        has_target[:, 0] = True
+        overall = np.array([p["overall_percentage"] for p in progress_list], dtype=np.float64)
+        return self.select(percentages, has_target, overall, np.asarray(user_ids), week_start)
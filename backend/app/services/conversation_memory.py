@@ -0,0 +1,173 @@
+"""
+Conversation Memory for DealTracker Sales Agent
+Embeds past Slack exchanges and weekly summaries and retrieves the relevant ones for prompts
+"""
+
+import os
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from app.database import SessionLocal
+from app.memory import MemoryStore, memory_store as shared_memory_store
+from app.models import MemorySnippet
+from app.services.ai_service import AIService
+from app.services.embedding_service import (
+    EmbeddingService, embedding_service as shared_embedding_service, estimate_tokens
+)
+
+logger = logging.getLogger(__name__)
+
+# How many snippets to retrieve, how much of the prompt they may use, and how far (squared L2
+# between unit vectors, i.e. 2 - 2*cosine) a snippet may be from the question and still count
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "6"))
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "800"))
+RAG_MAX_DISTANCE = float(os.getenv("RAG_MAX_DISTANCE", "0.6"))
+
+# Catching up re-reads this many ids below the highest one held: concurrent inserts can commit
+# out of id order, and a row committed after a higher id was seen would otherwise be skipped
+MEMORY_SYNC_LOOKBACK = int(os.getenv("MEMORY_SYNC_LOOKBACK", "64"))
+
+
+def pack_snippets(hits: Sequence[Dict[str, Any]], token_budget: int) -> List[str]:
+    """Most relevant snippets first, skipping any that would overflow the budget"""
+    packed, used = [], 0
+    for hit in hits:
+        cost = estimate_tokens(hit["text"])
+        if used + cost > token_budget:
+            continue
+        packed.append(hit["text"])
+        used += cost
+    return packed
+
+
+class ConversationMemory:
+    """Per-rep memory of what was said, stored in the MemoryStore under "user:<slack id>".
+
+    The question of each exchange is the vector it is stored under, so a new
+    question finds the answers given to similar ones. Embeddings are cached by
+    content hash, so storing an exchange after answering it reuses the vector
+    computed to retrieve context for the same question.
+
+    Snippets are written to the memory_snippets table first and indexed under
+    their row id. Each worker's store is only a search index over that table:
+    recall first pulls in rows other workers (e.g. the scheduler leader's
+    weekly summaries) added since, so every worker answers from the same memory.
+    """
+
+    def __init__(self, store: Optional[MemoryStore] = None, embeddings: Optional[EmbeddingService] = None,
+                 session_factory=SessionLocal):
+        self.store = store or shared_memory_store
+        self.embeddings = embeddings or shared_embedding_service
+        self.session_factory = session_factory
+        self._background_tasks = set()
+
+    # ------------------------------------------------------------------ shared table
+
+    def _insert_snippets(self, namespace: str, vectors: np.ndarray, texts: Sequence[str],
+                         metadata: Sequence[Dict[str, Any]]) -> List[int]:
+        rows = [
+            {"namespace": namespace, "text": text, "meta": meta, "vector": vector.astype(np.float32).tobytes()}
+            for vector, text, meta in zip(vectors, texts, metadata)
+        ]
+        db = self.session_factory()
+        try:
+            ids = db.scalars(
+                insert(MemorySnippet).returning(MemorySnippet.id, sort_by_parameter_order=True), rows
+            ).all()
+            db.commit()
+            return list(ids)
+        finally:
+            db.close()
+
+    def _snippets_since(self, namespace: str, first_id: int):
+        db = self.session_factory()
+        try:
+            return db.execute(
+                select(MemorySnippet.id, MemorySnippet.text, MemorySnippet.meta, MemorySnippet.vector)
+                .where(MemorySnippet.namespace == namespace, MemorySnippet.id >= first_id)
+                .order_by(MemorySnippet.id)
+            ).all()
+        finally:
+            db.close()
+
+    async def sync(self, namespace: str) -> int:
+        """Index the namespace's rows this worker has not seen yet. Returns how many were added."""
+        first_id = max(0, self.store.high_water(namespace) - MEMORY_SYNC_LOOKBACK)
+        rows = await asyncio.to_thread(self._snippets_since, namespace, first_id)
+        if not rows:
+            return 0
+        vectors = np.stack([np.frombuffer(row.vector, dtype=np.float32) for row in rows])
+        added = await self.store.aadd_batch(
+            namespace, vectors, [row.text for row in rows], [row.meta for row in rows], [row.id for row in rows]
+        )
+        return len(added)
+
+    @staticmethod
+    def namespace(user_slack_id: str) -> str:
+        return f"user:{user_slack_id}"
+
+    async def embed(self, texts: Sequence[str], ai_service: Optional[AIService] = None) -> Optional[np.ndarray]:
+        """Unit-length embeddings for texts, through the shared cached batch embedder"""
+        return await self.embeddings.embed(texts, ai_service)
+
+    async def recall(self, user_slack_id: str, query: str, k: int = RAG_TOP_K,
+                     token_budget: int = RAG_CONTEXT_TOKENS, ai_service: Optional[AIService] = None) -> List[str]:
+        """Past snippets relevant to the query that fit in token_budget, most relevant first"""
+        namespace = self.namespace(user_slack_id)
+        await self.sync(namespace)
+        # Reps with no history skip the embedding call entirely
+        if not self.store.count(namespace):
+            return []
+        vectors = await self.embed([query], ai_service)
+        if vectors is None:
+            return []
+        hits = (await self.store.asearch_batch(namespace, vectors, k))[0]
+        return pack_snippets([hit for hit in hits if hit["distance"] <= RAG_MAX_DISTANCE], token_budget)
+
+    async def remember(self, user_slack_id: str, keys: Sequence[str], texts: Sequence[str],
+                       metadata: Sequence[Dict[str, Any]], ai_service: Optional[AIService] = None) -> List[int]:
+        """Store texts, each under the embedding of its key"""
+        vectors = await self.embed(keys, ai_service)
+        if vectors is None:
+            return []
+        namespace = self.namespace(user_slack_id)
+        ids = await asyncio.to_thread(self._insert_snippets, namespace, vectors, texts, metadata)
+        # Indexed through sync rather than added directly, so rows other workers inserted
+        # in between are picked up too and the highest id held never skips past them
+        await self.sync(namespace)
+        return ids
+
+    async def remember_exchange(self, user_slack_id: str, question: str, answer: str,
+                                ai_service: Optional[AIService] = None) -> List[int]:
+        text = f"Rep asked: {question}\nYou answered: {answer}"
+        meta = {"type": "exchange", "at": datetime.utcnow().isoformat()}
+        return await self.remember(user_slack_id, [question], [text], [meta], ai_service)
+
+    async def remember_summary(self, user_slack_id: str, week_start: date, summary: str,
+                               ai_service: Optional[AIService] = None) -> List[int]:
+        text = f"Weekly summary for the week of {week_start.strftime('%b %d, %Y')}:\n{summary}"
+        meta = {"type": "weekly_summary", "week_start": week_start.isoformat()}
+        return await self.remember(user_slack_id, [text], [text], [meta], ai_service)
+
+    def remember_in_background(self, coro):
+        """Run a remember_* coroutine without delaying the reply; failures are only logged"""
+        async def guarded():
+            try:
+                await coro
+            except Exception as e:
+                logger.warning(f"Could not store conversation memory: {e}")
+
+        task = asyncio.create_task(guarded())
+        # Keep a reference until the task finishes so it is not garbage collected mid-flight
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+
+# Process-wide memory shared by the Slack handlers and the sales agent
+conversation_memory = ConversationMemory()
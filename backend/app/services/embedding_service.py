@@ -0,0 +1,330 @@
+"""
+Embedding Service for DealTracker Sales Agent
+Batches texts to the embeddings API, deduplicates them by content hash and caches vectors on disk
+"""
+
+import os
+import re
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from fcntl import LOCK_EX, LOCK_SH, LOCK_UN, flock as _flock
+except ImportError:  # Windows dev machines run a single worker; there is nothing to coordinate with
+    LOCK_EX = LOCK_SH = LOCK_UN = 0
+
+    def _flock(f, operation):
+        pass
+
+from app.memory import EMBEDDING_DIM
+from app.services.ai_service import AIService, ai_service as shared_ai_service, EMBEDDING_MODEL
+
+logger = logging.getLogger(__name__)
+
+# openai (default) or hashing - the offline, deterministic stand-in for tests and local runs
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "data/embeddings")
+
+# Embeddings API limits: inputs per request, tokens per input and tokens per request
+EMBEDDING_MAX_INPUTS = int(os.getenv("EMBEDDING_MAX_INPUTS", "2048"))
+EMBEDDING_MAX_INPUT_TOKENS = int(os.getenv("EMBEDDING_MAX_INPUT_TOKENS", "8191"))
+EMBEDDING_MAX_REQUEST_TOKENS = int(os.getenv("EMBEDDING_MAX_REQUEST_TOKENS", "300000"))
+
+_token_pattern = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough GPT token count (~4 characters per token), close enough for budgeting"""
+    return len(text) // 4 + 1
+
+
+def content_key(model: str, text: str) -> str:
+    """Cache key: the same text embedded by a different model is a different vector"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def plan_batches(texts: Sequence[str], max_inputs: int = EMBEDDING_MAX_INPUTS,
+                 max_request_tokens: int = EMBEDDING_MAX_REQUEST_TOKENS) -> List[List[int]]:
+    """Split text positions into as few requests as the API allows"""
+    batches, batch, tokens = [], [], 0
+    for position, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if batch and (len(batch) == max_inputs or tokens + cost > max_request_tokens):
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(position)
+        tokens += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class OpenAIEmbedder:
+    """Embeds through AIService, splitting the work to the API's input limits"""
+
+    def __init__(self, model: str = EMBEDDING_MODEL, dim: int = EMBEDDING_DIM):
+        self.model = model
+        self.dim = dim
+
+    def is_configured(self, ai_service: Optional[AIService] = None) -> bool:
+        return (ai_service or shared_ai_service).client is not None
+
+    async def embed_batch(self, texts: Sequence[str], ai_service: Optional[AIService] = None) -> Optional[np.ndarray]:
+        ai_service = ai_service or shared_ai_service
+        if not ai_service.client:
+            return None
+        # Over-long inputs are rejected outright by the API; trim them to the limit instead
+        max_chars = EMBEDDING_MAX_INPUT_TOKENS * 4
+        texts = [text[:max_chars] or " " for text in texts]
+
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        for batch in plan_batches(texts):
+            embeddings = await ai_service.embed_texts([texts[position] for position in batch])
+            if embeddings is None:
+                return None
+            vectors[batch] = np.asarray(embeddings, dtype=np.float32)
+        return vectors
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder: signed feature hashing of lower-cased words.
+
+    Texts that share words get similar vectors, which is enough to exercise
+    retrieval end to end without network access or an API key.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.model = f"hashing-{dim}"
+        self.dim = dim
+
+    def is_configured(self, ai_service: Optional[AIService] = None) -> bool:
+        return True
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _token_pattern.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        return vector
+
+    async def embed_batch(self, texts: Sequence[str], ai_service: Optional[AIService] = None) -> np.ndarray:
+        return np.stack([self._embed(text) for text in texts]) if texts else np.empty((0, self.dim), np.float32)
+
+
+class EmbeddingCache:
+    """Vectors in one float32 memmap file, rows found through an append-only "<hash> <row>" index.
+
+    Rows are written and flushed before their index lines are appended, so a
+    crash can lose recent entries but never leaves the index pointing at an
+    unwritten row. The file grows by doubling, so appends are amortized O(1).
+
+    Every API worker shares the directory: rows are allocated under an
+    exclusive flock on the index, after reading the lines other processes
+    appended since, so two workers never hand out the same row. Misses
+    re-read that tail too, so a vector embedded by one worker is a hit in
+    the others.
+    """
+
+    def __init__(self, path: Optional[str], dim: int, initial_rows: int = 1024):
+        self.dim = dim
+        self.path = Path(path) if path else None
+        self._rows: Dict[str, int] = {}
+        self._next_row = 0
+        self._index_offset = 0
+        self._lock = threading.Lock()
+        self._initial_rows = initial_rows
+        self._vectors: Optional[np.ndarray] = None
+        self._loaded = False
+
+    @property
+    def vectors_file(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def index_file(self) -> Path:
+        return self.path / "index.txt"
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None:
+            self._vectors = np.empty((self._initial_rows, self.dim), dtype=np.float32)
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.index_file.touch()
+        with open(self.index_file, "rb") as f:
+            _flock(f, LOCK_SH)
+            try:
+                self._read_tail(f)
+            finally:
+                _flock(f, LOCK_UN)
+        self._open(max(self._initial_rows, self._next_row))
+
+    def _read_tail(self, f):
+        """Take in index lines appended (by any process) since the last read"""
+        f.seek(self._index_offset)
+        data = f.read()
+        # A line is only counted once its newline is there
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.decode().splitlines():
+            key, _, row = line.partition(" ")
+            if row:
+                self._rows[key] = int(row)
+                self._next_row = max(self._next_row, int(row) + 1)
+        self._index_offset += len(complete)
+        if self._vectors is not None and self._next_row > len(self._vectors):
+            self._open(self._next_row)
+
+    def _open(self, capacity: int):
+        if self.path is None:
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[:self._next_row] = self._vectors[:self._next_row]
+            self._vectors = grown
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self.vectors_file, "ab") as f:
+            # Another worker may already have grown the file further; never shrink it
+            capacity = max(capacity, f.tell() // (4 * self.dim))
+            f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            self._ensure_loaded()
+            if self.path is not None and any(key not in self._rows for key in keys) \
+                    and self.index_file.stat().st_size > self._index_offset:
+                with open(self.index_file, "rb") as f:
+                    _flock(f, LOCK_SH)
+                    try:
+                        self._read_tail(f)
+                    finally:
+                        _flock(f, LOCK_UN)
+            return {key: np.array(self._vectors[self._rows[key]]) for key in keys if key in self._rows}
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray):
+        with self._lock:
+            self._ensure_loaded()
+            if self.path is None:
+                self._append(keys, vectors)
+                return
+            with open(self.index_file, "ab+") as f:
+                _flock(f, LOCK_EX)
+                try:
+                    self._read_tail(f)
+                    lines = self._append(keys, vectors)
+                    if lines:
+                        self._vectors.flush()
+                        f.write("".join(lines).encode())
+                        f.flush()
+                        self._index_offset += len("".join(lines).encode())
+                finally:
+                    _flock(f, LOCK_UN)
+
+    def _append(self, keys: Sequence[str], vectors: np.ndarray) -> List[str]:
+        """Write vectors for the keys not cached yet at the next free rows; their index lines"""
+        new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._rows]
+        if not new:
+            return []
+        start = self._next_row
+        needed = start + len(new)
+        if needed > len(self._vectors):
+            self._open(max(needed, 2 * len(self._vectors)))
+        lines = []
+        for offset, (key, vector) in enumerate(new):
+            self._vectors[start + offset] = vector
+            self._rows[key] = start + offset
+            lines.append(f"{key} {start + offset}\n")
+        self._next_row = needed
+        return lines
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._rows)
+
+    def close(self):
+        with self._lock:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            self._vectors = None
+            self._rows = {}
+            self._next_row = 0
+            self._index_offset = 0
+            self._loaded = False
+
+
+class EmbeddingService:
+    """Unit-length embeddings for texts, computed once per distinct text and model.
+
+    Duplicate texts in a call are embedded once, texts seen before come from
+    the disk cache, and only the rest are sent, in as few requests as the API
+    limits allow.
+    """
+
+    def __init__(self, embedder=None, cache_path: Optional[str] = EMBEDDING_CACHE_PATH):
+        self.embedder = embedder or (HashingEmbedder() if EMBEDDING_BACKEND == "hashing" else OpenAIEmbedder())
+        # One cache directory per model so vectors from different models never mix
+        model_dir = str(Path(cache_path) / self.embedder.model.replace("/", "_")) if cache_path else None
+        self.cache = EmbeddingCache(model_dir, self.embedder.dim)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def dim(self) -> int:
+        return self.embedder.dim
+
+    def is_configured(self, ai_service: Optional[AIService] = None) -> bool:
+        """Whether embed() can produce vectors (the hashing backend always can, OpenAI needs a client)"""
+        return self.embedder.is_configured(ai_service)
+
+    async def embed(self, texts: Sequence[str], ai_service: Optional[AIService] = None) -> Optional[np.ndarray]:
+        """(len(texts), dim) float32 matrix, or None when the embedder is unavailable"""
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        keys = [content_key(self.embedder.model, text) for text in texts]
+        found = await asyncio.to_thread(self.cache.get_many, keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = await self.embedder.embed_batch(list(missing.values()), ai_service)
+            if vectors is None:
+                return None
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+            await asyncio.to_thread(self.cache.put_many, list(missing), vectors)
+            found.update(zip(missing, vectors))
+
+        return np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "model": self.embedder.model,
+            "cached_vectors": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        self.cache.close()
+
+
+# Process-wide embedding service; its disk cache is shared by every caller
+embedding_service = EmbeddingService()
@@ -0,0 +1,217 @@
+"""
+Job Ledger for DealTracker Sales Agent
+Records scheduled job runs and per-user outcomes so interrupted runs can resume from their last checkpoint
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import exists, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models import JobRun, JobRunItem, SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+# Item statuses that count as handled - a resumed run never touches these users again
+FINISHED_ITEM_STATUSES = ("sent", "skipped", "failed", "interrupted")
+
+
+class JobLedger:
+    """Writes the job_runs / job_run_items ledger on its own session.
+
+    Every per-user item is committed before and after the user is processed, so
+    the ledger survives a crash in the middle of a run. A user whose item was
+    still "started" when the process died may or may not have received the
+    message; on resume such items are marked "interrupted" and not retried,
+    which avoids sending the same DM twice.
+    """
+
+    def __init__(self, worker: Optional[str] = None, lease_generation: Optional[int] = None):
+        self.db = SessionLocal()
+        self.worker = worker
+        self.lease_generation = lease_generation
+        self._item_clock: Dict[int, float] = {}
+
+    def close(self):
+        self.db.close()
+
+    def start_run(self, job_id: str, run_key: str) -> Tuple[Optional[JobRun], Set[int]]:
+        """Start a run or resume an interrupted one.
+
+        Returns (run, user ids already handled), or (None, empty set) when a run
+        for this job and period has already completed.
+        """
+        run = self.db.execute(
+            select(JobRun).where(JobRun.job_id == job_id, JobRun.run_key == run_key)
+        ).scalar_one_or_none()
+
+        if run is None:
+            run = JobRun(job_id=job_id, run_key=run_key, status="running", worker=self.worker,
+                         lease_generation=self.lease_generation)
+            self.db.add(run)
+            try:
+                self.db.commit()
+            except IntegrityError:
+                # Another worker created the run first - fall through and treat it as existing
+                self.db.rollback()
+                run = self.db.execute(
+                    select(JobRun).where(JobRun.job_id == job_id, JobRun.run_key == run_key)
+                ).scalar_one()
+            else:
+                return run, set()
+
+        if run.status == "completed":
+            return None, set()
+
+        # Resume: anything left "started" by the previous process is not retried
+        self.db.execute(
+            update(JobRunItem)
+            .where(JobRunItem.run_id == run.id, JobRunItem.status == "started")
+            .values(status="interrupted", finished_at=datetime.utcnow())
+        )
+        run.status = "running"
+        run.worker = self.worker
+        run.lease_generation = self.lease_generation
+        run.resume_count = (run.resume_count or 0) + 1
+        run.error = None
+        self.db.commit()
+
+        handled = set(self.db.execute(
+            select(JobRunItem.user_id).where(
+                JobRunItem.run_id == run.id, JobRunItem.status.in_(FINISHED_ITEM_STATUSES)
+            )
+        ).scalars())
+        logger.info(f"Resuming {job_id} run {run_key}: {len(handled)} users already handled")
+        return run, handled
+
+    def set_total(self, run: JobRun, total: int):
+        run.total_items = total
+        self.db.commit()
+
+    def begin_item(self, run: JobRun, user_id: int) -> JobRunItem:
+        """Checkpoint that a user is about to be processed"""
+        item = JobRunItem(run_id=run.id, user_id=user_id, status="started", started_at=datetime.utcnow())
+        self.db.add(item)
+        self.db.commit()
+        self._item_clock[item.id] = time.perf_counter()
+        return item
+
+    def finish_item(self, run: JobRun, item: JobRunItem, status: str, error: Optional[str] = None):
+        """Record a user's outcome and latency, and bump the run counters"""
+        started = self._item_clock.pop(item.id, None)
+        item.status = status
+        item.error = error
+        item.finished_at = datetime.utcnow()
+        item.duration_ms = int((time.perf_counter() - started) * 1000) if started is not None else None
+
+        if status == "sent":
+            run.succeeded = (run.succeeded or 0) + 1
+        elif status == "skipped":
+            run.skipped = (run.skipped or 0) + 1
+        else:
+            run.failed = (run.failed or 0) + 1
+        self.db.commit()
+
+    def finish_run(self, run: JobRun, status: str = "completed", error: Optional[str] = None):
+        run.status = status
+        run.error = error
+        run.finished_at = datetime.utcnow()
+        self.db.commit()
+
+    def completed_run_keys(self, job_id: str, run_keys: Set[str]) -> Set[str]:
+        """Which of these run keys already have a completed run for the job"""
+        return set(self.db.execute(
+            select(JobRun.run_key).where(
+                JobRun.job_id == job_id, JobRun.run_key.in_(run_keys), JobRun.status == "completed"
+            )
+        ).scalars())
+
+    def find_interrupted_runs(self, max_age: timedelta = timedelta(hours=24)) -> List[JobRun]:
+        """Runs still marked running that are recent enough to resume and whose worker lost its lease.
+
+        A run belongs to a live leader while a lease row names its worker, is
+        unexpired and still has the generation the run was started under; such a
+        run is still in progress and is left alone. Anything else was abandoned -
+        its worker died, or lost the lease and stopped before its next item.
+        """
+        owner_is_live = exists().where(
+            SchedulerLease.holder == JobRun.worker,
+            SchedulerLease.generation == JobRun.lease_generation,
+            SchedulerLease.expires_at >= datetime.utcnow(),
+        )
+        return list(self.db.execute(
+            select(JobRun).where(
+                JobRun.status == "running", JobRun.started_at >= datetime.utcnow() - max_age, ~owner_is_live
+            )
+        ).scalars())
+
+    def get_run_history(self, job_id: Optional[str] = None, limit: int = 20) -> Dict:
+        """Recent runs with per-run and overall p50/p95 per-user durations"""
+        query = select(JobRun).order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit)
+        if job_id:
+            query = query.where(JobRun.job_id == job_id)
+        runs = list(self.db.execute(query).scalars())
+
+        durations: Dict[int, List[int]] = {run.id: [] for run in runs}
+        if runs:
+            rows = self.db.execute(
+                select(JobRunItem.run_id, JobRunItem.duration_ms).where(
+                    JobRunItem.run_id.in_(list(durations)), JobRunItem.duration_ms.isnot(None)
+                )
+            )
+            for run_id, duration_ms in rows:
+                durations[run_id].append(duration_ms)
+
+        history = []
+        for run in runs:
+            history.append({
+                "id": run.id,
+                "job_id": run.job_id,
+                "run_key": run.run_key,
+                "status": run.status,
+                "worker": run.worker,
+                "lease_generation": run.lease_generation,
+                "started_at": run.started_at.isoformat() if run.started_at else None,
+                "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+                "duration_seconds": (
+                    (run.finished_at - run.started_at).total_seconds()
+                    if run.finished_at and run.started_at else None
+                ),
+                "total_items": run.total_items,
+                "succeeded": run.succeeded,
+                "skipped": run.skipped,
+                "failed": run.failed,
+                "resume_count": run.resume_count,
+                "error": run.error,
+                **self._percentiles(durations[run.id]),
+            })
+
+        all_durations = [value for values in durations.values() for value in values]
+        return {"runs": history, "overall": self._percentiles(all_durations)}
+
+    def get_run_items(self, run_id: int) -> List[Dict]:
+        items = self.db.execute(
+            select(JobRunItem).where(JobRunItem.run_id == run_id).order_by(JobRunItem.id)
+        ).scalars()
+        return [
+            {
+                "user_id": item.user_id,
+                "status": item.status,
+                "error": item.error,
+                "started_at": item.started_at.isoformat() if item.started_at else None,
+                "duration_ms": item.duration_ms,
+            }
+            for item in items
+        ]
+
+    @staticmethod
+    def _percentiles(values: List[int]) -> Dict[str, Optional[float]]:
+        if not values:
+            return {"p50_ms": None, "p95_ms": None}
+        p50, p95 = np.percentile(np.asarray(values, dtype=float), [50, 95])
+        return {"p50_ms": round(float(p50), 1), "p95_ms": round(float(p95), 1)}
@@ -0,0 +1,119 @@
+"""
+Leader Lease for DealTracker Sales Agent
+Elects a single API worker to run the scheduled sales jobs using a lease row in the database
+"""
+
+import os
+import uuid
+import socket
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import update, insert, delete, or_, and_, case, func
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_TTL_SECONDS = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "60"))
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker finds it no longer holds the lease it started work under"""
+
+
+class LeaderLease:
+    """Time-bounded lease stored in the scheduler_leases table.
+
+    Works on both Postgres and SQLite. The holder must renew the lease well
+    within the TTL; if it dies, another worker takes over once the lease expires.
+    Every takeover bumps the lease generation, so work recorded under an older
+    generation is known to belong to a leader that has since lost the lease.
+    """
+
+    def __init__(self, name: str, ttl_seconds: int = LEASE_TTL_SECONDS):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_held = False
+        self.generation = None
+        self.expires_at = None
+
+    def is_valid(self) -> bool:
+        """Whether this worker still holds the lease, judged by its last successful renewal.
+
+        Needs no database round trip, so long-running jobs can check it before
+        every item and stop as soon as the lease may have passed to another worker.
+        """
+        return self.is_held and self.expires_at is not None and datetime.utcnow() < self.expires_at
+
+    def try_acquire(self) -> bool:
+        """Acquire or renew the lease. Returns True while this worker is the leader."""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            # Take over the lease if we already hold it or the previous holder let it expire.
+            # A renewal keeps the generation; a takeover (or re-taking our own expired lease) bumps it
+            renewal = and_(SchedulerLease.holder == self.holder_id, SchedulerLease.expires_at >= now)
+            generation = db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    or_(SchedulerLease.holder == self.holder_id, SchedulerLease.expires_at < now)
+                )
+                .values(
+                    holder=self.holder_id,
+                    expires_at=now + self.ttl,
+                    acquired_at=case(
+                        (SchedulerLease.holder == self.holder_id, SchedulerLease.acquired_at), else_=now
+                    ),
+                    generation=case(
+                        (renewal, func.coalesce(SchedulerLease.generation, 1)), else_=func.coalesce(SchedulerLease.generation, 0) + 1
+                    )
+                )
+                .returning(SchedulerLease.generation)
+            ).scalar_one_or_none()
+            if generation is None:
+                # No lease row yet - the primary key makes concurrent inserts race safely
+                generation = 1
+                try:
+                    db.execute(
+                        insert(SchedulerLease).values(
+                            name=self.name, holder=self.holder_id, expires_at=now + self.ttl, acquired_at=now,
+                            generation=generation
+                        )
+                    )
+                except IntegrityError:
+                    db.rollback()
+                    self.is_held = False
+                    return False
+            db.commit()
+            self.is_held = True
+            self.generation = generation
+            self.expires_at = now + self.ttl
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error acquiring leader lease {self.name}: {e}")
+            self.is_held = False
+        finally:
+            db.close()
+        return self.is_held
+
+    def release(self) -> None:
+        """Give up the lease so another worker can take over immediately"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                delete(SchedulerLease).where(
+                    SchedulerLease.name == self.name, SchedulerLease.holder == self.holder_id
+                )
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error releasing leader lease {self.name}: {e}")
+        finally:
+            db.close()
+            self.is_held = False
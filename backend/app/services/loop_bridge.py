@@ -0,0 +1,121 @@
+"""
+Loop Bridge for DealTracker Sales Agent
+Runs coroutines for synchronous callers on one long-lived background event loop
+"""
+
+import asyncio
+import contextvars
+import threading
+import logging
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 60
+
+
+async def _in_context(coro: Coroutine, context: contextvars.Context) -> Any:
+    """Await coro with the submitting thread's context variables (e.g. the current request's metrics)"""
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+class LoopBridge:
+    """A daemon thread that owns an event loop sync code can submit coroutines to.
+
+    Creating a loop per call pays loop setup every time, fails when called from
+    a thread that already runs a loop, and throws away HTTP connection pools.
+    The bridge keeps one loop for the life of the process, so the Slack and
+    OpenAI clients it hands out keep their sessions and reuse connections
+    across every synchronous caller.
+    """
+
+    def __init__(self, name: str = "loop-bridge"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._clients_lock = threading.Lock()
+        self._http_session = None
+        self._slack_service = None
+        self._ai_service = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                ready = threading.Event()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(self._loop, ready), name=self.name, daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS) -> Any:
+        """Run a coroutine on the bridge loop and block until it returns"""
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LoopBridge.run() called from the bridge loop itself - await the coroutine instead")
+
+        future = asyncio.run_coroutine_threadsafe(_in_context(coro, contextvars.copy_context()), loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Coroutine did not finish within {timeout}s on {self.name}")
+
+    @property
+    def slack_service(self):
+        """SlackService whose aiohttp session lives on the bridge loop and is reused"""
+        with self._clients_lock:
+            if self._slack_service is None:
+                from app.services.slack_service import SlackService, create_http_session
+                self._http_session = self.run(create_http_session())
+                self._slack_service = SlackService(session=self._http_session)
+        return self._slack_service
+
+    @property
+    def ai_service(self):
+        """AIService whose OpenAI connection pool is bound to the bridge loop"""
+        with self._clients_lock:
+            if self._ai_service is None:
+                from app.services.ai_service import AIService
+                self._ai_service = AIService()
+        return self._ai_service
+
+    async def _close_clients(self):
+        if self._http_session is not None:
+            await self._http_session.close()
+        if self._ai_service is not None:
+            await self._ai_service.close()
+
+    def stop(self):
+        """Close the shared HTTP clients and stop the loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+        if loop is None or loop.is_closed():
+            return
+        try:
+            self.run(self._close_clients(), timeout=10)
+        except Exception as e:
+            logger.warning(f"Error closing {self.name} clients: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
+        self._http_session = None
+        self._slack_service = None
+        self._ai_service = None
+
+
+# Global bridge shared by all synchronous callers
+loop_bridge = LoopBridge()
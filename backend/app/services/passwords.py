@@ -0,0 +1,102 @@
+"""
+Password Hashing for DealTracker Sales Agent
+bcrypt on a small dedicated thread pool so logins never block the event loop
+"""
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+# bcrypt work factor; each +1 doubles the time per hash (12 is ~250 ms on a typical core)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes waiting for a thread beyond this are refused (503) instead of queueing without bound
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+# bcrypt only looks at the first 72 bytes of a password
+MAX_PASSWORD_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """More hashes are in flight than PASSWORD_HASH_MAX_PENDING allows"""
+
+
+class PasswordHasher:
+    """bcrypt hash/verify as coroutines, run on a bounded ThreadPoolExecutor.
+
+    bcrypt releases the GIL while it works, so the event loop keeps serving
+    other requests during a login burst and up to `workers` hashes run in
+    parallel on multi-core hosts.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._dummy_hash: Optional[bytes] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    # ================== SYNC PRIMITIVES ==================
+
+    def hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    def verify_sync(self, password: str, hashed: Optional[str]) -> bool:
+        secret = password.encode()
+        if not hashed or len(secret) > MAX_PASSWORD_BYTES:
+            # Spend the same time as a real check so unknown emails can't be told apart by latency
+            if self._dummy_hash is None:
+                self._dummy_hash = bcrypt.hashpw(b"dummy", bcrypt.gensalt(rounds=self.rounds))
+            bcrypt.checkpw(b"dummy", self._dummy_hash)
+            return False
+        try:
+            return bcrypt.checkpw(secret, hashed.encode())
+        except ValueError:
+            logger.warning("Stored password hash is not a valid bcrypt hash")
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when the hash was made with a different cost than the one configured now"""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    # ================== ASYNC API ==================
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise PasswordHasherBusy(f"{self._pending} password hashes already pending")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.hash_sync, password)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> bool:
+        return await self._run(self.verify_sync, password, hashed)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Process-wide hasher so every request shares the one bounded pool
+password_hasher = PasswordHasher()
@@ -1,40 +1,145 @@
 import json
+import logging
 import math
 import random
-import asyncio
+import re
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, delete
-from app.models import User, Project, Task, Goal, WeeklyGoal
-from app.database import get_db
-from app.services.slack_service import SlackService
-from app.services.ai_service import AIService
+from sqlalchemy import func, select, delete
+from app.models import User, Project, Task, Goal, WeeklyGoal, SalesConversation
+from app.database import get_db, SessionLocal
+from app.services.slack_service import SlackService, slack_service as shared_slack_service
+from app.services.ai_service import AIService, ai_service as shared_ai_service
+from app.services.sales_metrics import SalesMetricsService
+from app.services.loop_bridge import loop_bridge
+from app.services.conversation_memory import conversation_memory
+from app.services.template_store import TemplateStore, CompiledTemplate
+from app.services.coaching_tips import CoachingTipBook
+from app.services.task_operations import TaskOperations
+from app.nlp import goal_parser
+
+logger = logging.getLogger(__name__)
+
+# Placeholder names each sender passes to its template; templates are validated against these on load
+PROGRESS_FIELDS = (
+    "calls_target", "calls_completed", "calls_percentage",
+    "demos_target", "demos_completed", "demos_percentage",
+    "proposals_target", "proposals_completed", "proposals_percentage",
+    "overall_percentage",
+)
+TEMPLATE_FIELDS = {
+    "weekly_goal_prompt.txt": ("name", "week_start", "week_end", "previous_performance"),
+    "mid_week_nudge_prompt.txt": ("name", "week_start", "days_left", "coaching_message", "specific_tips")
+                                 + PROGRESS_FIELDS,
+    "end_week_summary_prompt.txt": ("name", "week_start", "performance_assessment", "wins_list",
+                                    "improvement_areas", "team_ranking_message", "motivational_close")
+                                   + PROGRESS_FIELDS,
+}
+
+sales_templates = TemplateStore(Path("ai_templates/sales/"), TEMPLATE_FIELDS)
+coaching_tip_book = CoachingTipBook(sales_templates.base_path / "coaching_tips.txt")
+
+
+def weekly_progress(tasks: Iterable[Tuple[str, str, str, int]]) -> Dict:
+    """Targets, completions and percentages from a rep's week of (task_type, title, status, count) rows"""
+    progress = {
+        "calls_target": 0,
+        "calls_completed": 0,
+        "demos_target": 0,
+        "demos_completed": 0,
+        "proposals_target": 0,
+        "proposals_completed": 0
+    }
+
+    for task_type, title, status, count in tasks:
+        if task_type == "calls":
+            # Extract number from title like "☎️ Make 4 discovery calls"
+            numbers = re.findall(r'\d+', title or "")
+            if numbers:
+                progress["calls_target"] += int(numbers[0]) * count
+                if status == "Completed":
+                    progress["calls_completed"] += int(numbers[0]) * count
+        elif task_type == "demos":
+            progress["demos_target"] += count
+            if status == "Completed":
+                progress["demos_completed"] += count
+        elif task_type == "proposals":
+            progress["proposals_target"] += count
+            if status == "Completed":
+                progress["proposals_completed"] += count
+
+    # Calculate percentages
+    progress["calls_percentage"] = (
+        (progress["calls_completed"] / progress["calls_target"] * 100) 
+        if progress["calls_target"] > 0 else 0
+    )
+    progress["demos_percentage"] = (
+        (progress["demos_completed"] / progress["demos_target"] * 100) 
+        if progress["demos_target"] > 0 else 0
+    )
+    progress["proposals_percentage"] = (
+        (progress["proposals_completed"] / progress["proposals_target"] * 100) 
+        if progress["proposals_target"] > 0 else 0
+    )
+
+    # Overall percentage (weighted average)
+    total_targets = progress["calls_target"] + progress["demos_target"] + progress["proposals_target"]
+    if total_targets > 0:
+        progress["overall_percentage"] = (
+            (progress["calls_completed"] + progress["demos_completed"] + progress["proposals_completed"]) 
+            / total_targets * 100
+        )
+    else:
+        progress["overall_percentage"] = 0
+
+    return progress
 
 
 class SalesAgentService:
     """Autonomous Sales Project Manager Agent"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, slack_service: Optional[SlackService] = None,
+                 ai_service: Optional[AIService] = None):
         self.db = db
-        self.slack_service = SlackService()
-        self.ai_service = AIService()
-        self.templates_path = Path("ai_templates/sales/")
+        # Collaborators are resolved on first use, so read-only requests only touch the database
+        self._slack_service = slack_service
+        self._ai_service = ai_service
+        self._metrics = None
+        self._sales_project = None
+        self.templates_path = sales_templates.base_path
+    
+    @property
+    def slack_service(self) -> SlackService:
+        # Process-wide client by default so every request reuses the same connection pool
+        if self._slack_service is None:
+            self._slack_service = shared_slack_service
+        return self._slack_service
+    
+    @property
+    def ai_service(self) -> AIService:
+        if self._ai_service is None:
+            self._ai_service = shared_ai_service
+        return self._ai_service
+    
+    @property
+    def metrics(self) -> SalesMetricsService:
+        if self._metrics is None:
+            self._metrics = SalesMetricsService(self.db)
+        return self._metrics
     
     def _send_slack_message_sync(self, user_slack_id: str, message: str) -> bool:
         """Helper to send Slack message synchronously"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.slack_service.send_direct_message(user_slack_id, message)
+            # Runs on the shared background loop so the Slack session is reused between calls
+            result = loop_bridge.run(
+                loop_bridge.slack_service.send_direct_message(user_slack_id, message)
             )
-            loop.close()
             return result.get("ok", False)
         except Exception as e:
-            print(f"Error sending Slack message: {e}")
+            logger.error("Error sending Slack message: %s", e)
             return False
     
     async def _send_slack_message_async(self, user_slack_id: str, message: str) -> bool:
@@ -43,16 +148,12 @@ class SalesAgentService:
             result = await self.slack_service.send_direct_message(user_slack_id, message)
             return result.get("ok", False)
         except Exception as e:
-            print(f"Error sending Slack message: {e}")
+            logger.error("Error sending Slack message: %s", e)
             return False
     
-    def load_template(self, template_name: str) -> str:
-        """Load a sales prompt template"""
-        template_path = self.templates_path / template_name
-        if template_path.exists():
-            return template_path.read_text()
-        # Return fallback template if file doesn't exist
-        return f"Hi {{name}}! This is a {template_name.replace('_', ' ').replace('.txt', '')} message from DealTracker. Please check back later for more details."
+    def load_template(self, template_name: str) -> CompiledTemplate:
+        """Get a compiled sales prompt template (cached; re-read only when the file changes)"""
+        return sales_templates.get(template_name)
     
     def get_current_week_start(self) -> date:
         """Get the Monday of the current week"""
@@ -60,7 +161,9 @@ class SalesAgentService:
         return today - timedelta(days=today.weekday())
     
     def get_or_create_sales_project(self) -> Project:
-        """Get or create the persistent Sales Sprint project"""
+        """Get or create the persistent Sales Sprint project (looked up once per service instance)"""
+        if self._sales_project is not None:
+            return self._sales_project
         project = self.db.query(Project).filter(Project.name == "PSV Sales Agent Team").first()
         if not project:
             project = Project(
@@ -72,49 +175,16 @@ class SalesAgentService:
             )
             self.db.add(project)
             self.db.commit()
+        self._sales_project = project
         return project
     
     def parse_sales_response(self, text: str) -> Dict[str, int]:
-        """Parse sales rep's goal response using AI"""
-        prompt = f"""
-        You are SalesPM. Extract numbers for calls, demos, and proposals from the rep's response. 
-        If they don't mention a category, default to 0.
-        
-        Rep says: "{text}"
-        
-        Output JSON only in this exact format:
-        {{"calls_target": 0, "demos_target": 0, "proposals_target": 0}}
-        """
-        
-        try:
-            # For now, use simple parsing since AI service might not be available
-            # response = self.ai_service.generate_response(prompt)
-            # Extract JSON from response
-            # start_idx = response.find('{')
-            # end_idx = response.rfind('}') + 1
-            # if start_idx != -1 and end_idx != -1:
-            #     json_str = response[start_idx:end_idx]
-            #     return json.loads(json_str)
-            pass
-        except Exception as e:
-            print(f"Error parsing sales response: {e}")
-        
-        # Fallback: simple text parsing
-        text_lower = text.lower()
-        goals = {"calls_target": 0, "demos_target": 0, "proposals_target": 0}
-        
-        # Simple regex-like parsing
-        import re
-        numbers = re.findall(r'\d+', text)
-        if len(numbers) >= 3:
-            goals["calls_target"] = int(numbers[0])
-            goals["demos_target"] = int(numbers[1]) 
-            goals["proposals_target"] = int(numbers[2])
-        elif len(numbers) == 1:
-            # If only one number, assume it's calls
-            goals["calls_target"] = int(numbers[0])
-        
-        return goals
+        """Parse sales rep's goal response: deterministic extractor first, AI only if it's unsure"""
+        return goal_parser.parse(text)
+    
+    async def parse_sales_response_async(self, text: str) -> Dict[str, int]:
+        """Parse sales rep's goal response (async version)"""
+        return await goal_parser.aparse(text, self.ai_service)
     
     def create_weekly_sales_tasks(self, user_id: int, week_start: date, goals: Dict[str, int]) -> int:
         """Create micro-tasks from parsed goals"""
@@ -130,6 +200,7 @@ class SalesAgentService:
         ).all()
         
         for task in existing_tasks:
+            self.metrics.record_task_change(task, deleted=True, week_start=week_start)
             self.db.delete(task)
         
         tasks = []
@@ -154,6 +225,7 @@ class SalesAgentService:
         
         for task in tasks:
             self.db.add(task)
+            self.metrics.record_task_change(task, created=True, week_start=week_start)
         self.db.commit()
         
         return len(tasks)
@@ -220,115 +292,70 @@ class SalesAgentService:
     
     def get_weekly_progress(self, user_id: int, week_start: date) -> Dict:
         """Get current week's progress for a user"""
+        return self.get_team_weekly_progress([user_id], week_start)[user_id]
+    
+    def get_team_weekly_progress(self, user_ids: Iterable[int], week_start: date) -> Dict[int, Dict]:
+        """Week's progress for many reps, keyed by user id, from one grouped query over their tasks"""
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
         project = self.get_or_create_sales_project()
         
-        # Get tasks for this week
-        tasks = self.db.query(Task).filter(
-            Task.owner_id == user_id,
-            Task.project_id == project.id,
-            Task.created_at >= week_start,
-            Task.created_at < week_start + timedelta(days=7)
-        ).all()
-        
-        progress = {
-            "calls_target": 0,
-            "calls_completed": 0,
-            "demos_target": 0,
-            "demos_completed": 0,
-            "proposals_target": 0,
-            "proposals_completed": 0
-        }
-        
-        for task in tasks:
-            if task.task_type == "calls":
-                # Extract number from title like "☎️ Make 4 discovery calls"
-                import re
-                numbers = re.findall(r'\d+', task.title)
-                if numbers:
-                    progress["calls_target"] += int(numbers[0])
-                    if task.status == "Completed":
-                        progress["calls_completed"] += int(numbers[0])
-            elif task.task_type == "demos":
-                progress["demos_target"] += 1
-                if task.status == "Completed":
-                    progress["demos_completed"] += 1
-            elif task.task_type == "proposals":
-                progress["proposals_target"] += 1
-                if task.status == "Completed":
-                    progress["proposals_completed"] += 1
-        
-        # Calculate percentages
-        progress["calls_percentage"] = (
-            (progress["calls_completed"] / progress["calls_target"] * 100) 
-            if progress["calls_target"] > 0 else 0
-        )
-        progress["demos_percentage"] = (
-            (progress["demos_completed"] / progress["demos_target"] * 100) 
-            if progress["demos_target"] > 0 else 0
-        )
-        progress["proposals_percentage"] = (
-            (progress["proposals_completed"] / progress["proposals_target"] * 100) 
-            if progress["proposals_target"] > 0 else 0
-        )
-        
-        # Overall percentage (weighted average)
-        total_targets = progress["calls_target"] + progress["demos_target"] + progress["proposals_target"]
-        if total_targets > 0:
-            progress["overall_percentage"] = (
-                (progress["calls_completed"] + progress["demos_completed"] + progress["proposals_completed"]) 
-                / total_targets * 100
+        # Identical tasks (same rep, type, title and status) come back once with a count
+        rows = self.db.execute(
+            select(Task.owner_id, Task.task_type, Task.title, Task.status, func.count())
+            .where(
+                Task.owner_id.in_(user_ids),
+                Task.project_id == project.id,
+                Task.created_at >= week_start,
+                Task.created_at < week_start + timedelta(days=7)
             )
-        else:
-            progress["overall_percentage"] = 0
+            .group_by(Task.owner_id, Task.task_type, Task.title, Task.status)
+        ).all()
         
-        return progress
+        tasks_by_user = {user_id: [] for user_id in user_ids}
+        for owner_id, task_type, title, status, count in rows:
+            tasks_by_user[owner_id].append((task_type, title, status, count))
+        return {user_id: weekly_progress(tasks) for user_id, tasks in tasks_by_user.items()}
     
-    def generate_coaching_tips(self, progress: Dict) -> List[str]:
-        """Generate personalized coaching tips based on progress"""
+    def generate_coaching_tips(self, progress: Dict, user_id: Optional[int] = None,
+                               week_start: Optional[date] = None) -> List[str]:
+        """Pick up to 3 coaching tips from the tips knowledge base based on progress"""
         try:
-            # For now, generate tips based on progress data
-            tips = []
-            
-            # Analyze calls performance
-            if progress["calls_percentage"] < 50:
-                tips.append("📞 Focus on increasing your daily call volume. Try blocking 2-3 hours each morning for prospecting calls.")
-            elif progress["calls_percentage"] < 80:
-                tips.append("📞 Good call activity! Consider improving your call quality by preparing better opening statements.")
-            else:
-                tips.append("📞 Excellent call performance! Keep up the momentum and focus on qualifying prospects better.")
-            
-            # Analyze demos performance
-            if progress["demos_target"] > 0:
-                if progress["demos_percentage"] < 50:
-                    tips.append("🎬 Work on converting more calls to demos. Practice your discovery questions to identify pain points.")
-                elif progress["demos_percentage"] < 80:
-                    tips.append("🎬 Solid demo booking! Focus on demo preparation and customizing presentations to prospect needs.")
-                else:
-                    tips.append("🎬 Outstanding demo performance! Consider sharing your demo techniques with the team.")
-            
-            # Analyze proposals performance
-            if progress["proposals_target"] > 0:
-                if progress["proposals_percentage"] < 50:
-                    tips.append("📋 Focus on qualifying prospects better during demos to increase proposal conversion rates.")
-                elif progress["proposals_percentage"] < 80:
-                    tips.append("📋 Good proposal activity! Work on follow-up timing and addressing objections proactively.")
-                else:
-                    tips.append("📋 Excellent proposal performance! Your qualification and demo skills are paying off.")
-            
-            # Overall performance tip
-            if progress["overall_percentage"] >= 80:
-                tips.append("🚀 You're performing at a high level! Consider mentoring newer team members.")
-            elif progress["overall_percentage"] >= 60:
-                tips.append("💪 Solid overall performance! Focus on consistency across all activities.")
-            else:
-                tips.append("📈 Remember that every expert was once a beginner. Focus on daily improvement and the results will follow.")
-            
-            return tips[:3]  # Return max 3 tips
-            
+            week_start = week_start or self.get_current_week_start()
+            return coaching_tip_book.select_for_progress([progress], [user_id or 0], week_start)[0]
         except Exception as e:
-            print(f"Error generating coaching tips: {e}")
+            logger.error("Error generating coaching tips: %s", e)
             return ["Keep pushing! Focus on your daily activities and the results will follow."]
     
+    def generate_team_coaching_tips(self, week_start: Optional[date] = None) -> Dict[int, List[str]]:
+        """Coaching tips for every sales rep, selected in one pass over the team's progress"""
+        week_start = week_start or self.get_current_week_start()
+        users = self.db.query(User).filter(User.role == "sales").all()
+        team_progress = self.get_team_weekly_progress([user.id for user in users], week_start)
+        progress = [team_progress[user.id] for user in users]
+        tips = coaching_tip_book.select_for_progress(progress, [user.id for user in users], week_start)
+        return {user.id: user_tips for user, user_tips in zip(users, tips)}
+    
+    def find_goal_prompt(self, user_slack_id: str, week_start: date) -> Optional[SalesConversation]:
+        """The week's goal prompt the rep has not replied to yet, if any"""
+        return self.db.query(SalesConversation).filter(
+            SalesConversation.user_slack_id == user_slack_id,
+            SalesConversation.week_start == week_start,
+            SalesConversation.conversation_type == "weekly_goals_prompt"
+        ).first()
+    
+    def record_goal_prompt(self, user: User, week_start: date):
+        """Remember that the rep was asked for the week's goals, so their next DM is read as the reply"""
+        if self.find_goal_prompt(user.slack_user_id, week_start) is None:
+            self.db.add(SalesConversation(
+                user_slack_id=user.slack_user_id,
+                week_start=week_start,
+                conversation_type="weekly_goals_prompt",
+                created_at=datetime.now()
+            ))
+            self.db.commit()
+    
     def send_monday_goal_prompt(self, user_id: int) -> bool:
         """Send Monday morning goal-setting prompt"""
         user = self.db.query(User).filter(User.id == user_id).first()
@@ -346,7 +373,7 @@ class SalesAgentService:
         
         # Load and format template
         template = self.load_template("weekly_goal_prompt.txt")
-        message = template.format(
+        message = template.render(
             name=user.name or "there",
             week_start=week_start.strftime("%b %d"),
             week_end=week_end.strftime("%b %d"),
@@ -354,7 +381,10 @@ class SalesAgentService:
         )
         
         # Send Slack DM
-        return self._send_slack_message_sync(user.slack_user_id, message)
+        sent = self._send_slack_message_sync(user.slack_user_id, message)
+        if sent:
+            self.record_goal_prompt(user, week_start)
+        return sent
     
     def send_midweek_nudge(self, user_id: int) -> bool:
         """Send Wednesday mid-week coaching nudge"""
@@ -371,11 +401,11 @@ class SalesAgentService:
         days_left = (week_end - today).days
         
         # Generate coaching message
-        coaching_tips = self.generate_coaching_tips(progress)
+        coaching_tips = self.generate_coaching_tips(progress, user_id, week_start)
         
         # Load and format template
         template = self.load_template("mid_week_nudge_prompt.txt")
-        message = template.format(
+        message = template.render(
             name=user.name or "there",
             week_start=week_start.strftime("%b %d"),
             calls_target=progress["calls_target"],
@@ -384,10 +414,13 @@ class SalesAgentService:
             demos_completed=progress["demos_completed"],
             proposals_target=progress["proposals_target"],
             proposals_completed=progress["proposals_completed"],
+            calls_percentage=progress["calls_percentage"],
+            demos_percentage=progress["demos_percentage"],
+            proposals_percentage=progress["proposals_percentage"],
             overall_percentage=progress["overall_percentage"],
             days_left=days_left,
             coaching_message="Looking good!" if progress["overall_percentage"] >= 60 else "Let's pick up the pace!",
-            specific_tips=coaching_tips
+            specific_tips="\n".join(f"• {tip}" for tip in coaching_tips)
         )
         
         return self._send_slack_message_sync(user.slack_user_id, message)
@@ -427,7 +460,7 @@ class SalesAgentService:
         
         # Load and format template
         template = self.load_template("end_week_summary_prompt.txt")
-        message = template.format(
+        message = template.render(
             name=user.name or "there",
             week_start=week_start.strftime("%b %d"),
             calls_completed=progress["calls_completed"],
@@ -447,20 +480,23 @@ class SalesAgentService:
             motivational_close="Every week is a chance to level up! 🚀"
         )
         
-        return self._send_slack_message_sync(user.slack_user_id, message)
+        sent = self._send_slack_message_sync(user.slack_user_id, message)
+        if sent:
+            try:
+                loop_bridge.run(conversation_memory.remember_summary(
+                    user.slack_user_id, week_start, message, ai_service=loop_bridge.ai_service
+                ))
+            except Exception as e:
+                logger.error("Error storing weekly summary in memory: %s", e)
+        return sent
     
     def mark_task_complete(self, task_id: int) -> bool:
         """Mark a specific task as complete"""
         try:
-            task = self.db.query(Task).filter(Task.id == task_id).first()
-            
-            if task:
-                task.status = "Completed"
-                self.db.commit()
-                return True
-            return False
+            results = TaskOperations(self.db, self.metrics).complete([task_id])
+            return results.get(task_id) != "not_found"
         except Exception as e:
-            print(f"Error marking task complete: {e}")
+            logger.error("Error marking task complete: %s", e)
             return False
     
     def get_team_leaderboard(self, week_start: date = None) -> List[Dict]:
@@ -472,9 +508,10 @@ class SalesAgentService:
             # Get all sales users
             sales_users = self.db.query(User).filter(User.role == "sales").all()
             
+            team_progress = self.get_team_weekly_progress([user.id for user in sales_users], week_start)
             leaderboard = []
             for user in sales_users:
-                progress = self.get_weekly_progress(user.id, week_start)
+                progress = team_progress[user.id]
                 
                 # Calculate total score (weighted)
                 total_score = (
@@ -499,16 +536,17 @@ class SalesAgentService:
             return leaderboard
             
         except Exception as e:
-            print(f"Error generating leaderboard: {e}")
+            logger.error("Error generating leaderboard: %s", e)
             return []
     
-    async def send_monday_goal_prompt_async(self, user_id: int) -> bool:
+    async def send_monday_goal_prompt_async(self, user_id: int, week_start: Optional[date] = None) -> bool:
         """Send Monday morning goal-setting prompt (async version)"""
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             return False
         
-        week_start = self.get_current_week_start()
+        # The scheduler passes the rep's local week; default to the server's week
+        week_start = week_start or self.get_current_week_start()
         week_end = week_start + timedelta(days=6)
         
         # Get previous week's performance
@@ -519,7 +557,7 @@ class SalesAgentService:
         
         # Load and format template
         template = self.load_template("weekly_goal_prompt.txt")
-        message = template.format(
+        message = template.render(
             name=user.name or "there",
             week_start=week_start.strftime("%b %d"),
             week_end=week_end.strftime("%b %d"),
@@ -527,15 +565,19 @@ class SalesAgentService:
         )
         
         # Send Slack DM (async)
-        return await self._send_slack_message_async(user.slack_user_id, message)
+        sent = await self._send_slack_message_async(user.slack_user_id, message)
+        if sent:
+            self.record_goal_prompt(user, week_start)
+        return sent
 
-    async def send_midweek_nudge_async(self, user_id: int) -> bool:
+    async def send_midweek_nudge_async(self, user_id: int, week_start: Optional[date] = None) -> bool:
         """Send Wednesday mid-week coaching nudge (async version)"""
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             return False
         
-        week_start = self.get_current_week_start()
+        # The scheduler passes the rep's local week; default to the server's week
+        week_start = week_start or self.get_current_week_start()
         progress = self.get_weekly_progress(user_id, week_start)
         
         # Calculate days left
@@ -544,11 +586,11 @@ class SalesAgentService:
         days_left = (week_end - today).days
         
         # Generate coaching message
-        coaching_tips = self.generate_coaching_tips(progress)
+        coaching_tips = self.generate_coaching_tips(progress, user_id, week_start)
         
         # Load and format template
         template = self.load_template("mid_week_nudge_prompt.txt")
-        message = template.format(
+        message = template.render(
             name=user.name or "there",
             week_start=week_start.strftime("%b %d"),
             calls_target=progress["calls_target"],
@@ -557,21 +599,25 @@ class SalesAgentService:
             demos_completed=progress["demos_completed"],
             proposals_target=progress["proposals_target"],
             proposals_completed=progress["proposals_completed"],
+            calls_percentage=progress["calls_percentage"],
+            demos_percentage=progress["demos_percentage"],
+            proposals_percentage=progress["proposals_percentage"],
             overall_percentage=progress["overall_percentage"],
             days_left=days_left,
             coaching_message="Looking good!" if progress["overall_percentage"] >= 60 else "Let's pick up the pace!",
-            specific_tips=coaching_tips
+            specific_tips="\n".join(f"• {tip}" for tip in coaching_tips)
         )
         
         return await self._send_slack_message_async(user.slack_user_id, message)
 
-    async def send_weekly_summary_async(self, user_id: int) -> bool:
+    async def send_weekly_summary_async(self, user_id: int, week_start: Optional[date] = None) -> bool:
         """Send Friday end-of-week summary (async version)"""
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             return False
         
-        week_start = self.get_current_week_start()
+        # The scheduler passes the rep's local week; default to the server's week
+        week_start = week_start or self.get_current_week_start()
         progress = self.get_weekly_progress(user_id, week_start)
         
         # Performance assessment
@@ -600,7 +646,7 @@ class SalesAgentService:
         
         # Load and format template
         template = self.load_template("end_week_summary_prompt.txt")
-        message = template.format(
+        message = template.render(
             name=user.name or "there",
             week_start=week_start.strftime("%b %d"),
             calls_completed=progress["calls_completed"],
@@ -620,4 +666,26 @@ class SalesAgentService:
             motivational_close="Every week is a chance to level up! 🚀"
         )
         
-        return await self._send_slack_message_async(user.slack_user_id, message) 
\ No newline at end of file
+        sent = await self._send_slack_message_async(user.slack_user_id, message)
+        if sent:
+            # Later questions to the bot can then draw on how this week went
+            try:
+                await conversation_memory.remember_summary(
+                    user.slack_user_id, week_start, message, ai_service=self.ai_service
+                )
+            except Exception as e:
+                logger.error("Error storing weekly summary in memory: %s", e)
+        return sent
+
+
+def get_sales_agent():
+    """FastAPI dependency: one SalesAgentService per request on its own sync session.
+
+    FastAPI caches dependency results for the duration of a request, so every
+    dependency and endpoint that asks for the service shares this instance.
+    """
+    db = SessionLocal()
+    try:
+        yield SalesAgentService(db)
+    finally:
+        db.close()
@@ -0,0 +1,299 @@
+"""
+Sales Metrics Service for DealTracker Sales Agent
+Maintains the weekly per-rep funnel rollup stored in the sales_metrics table
+"""
+
+import re
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update, insert, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import User, Task, SalesMetric
+
+logger = logging.getLogger(__name__)
+
+# Columns derived from the tasks table - the backfill treats these as authoritative
+TASK_METRIC_FIELDS = ("calls_attempted", "demos_scheduled", "demos_completed", "proposals_sent")
+
+# Every counter column on SalesMetric that the funnel reads
+FUNNEL_FIELDS = (
+    "calls_attempted", "calls_connected", "calls_qualified",
+    "demos_scheduled", "demos_completed", "demos_no_show",
+    "proposals_sent", "proposals_accepted", "proposals_rejected",
+    "pipeline_value", "closed_deals", "revenue_generated",
+)
+
+# Patterns for self-reported activity in Slack updates ("did 12 calls, 4 connected, 1 no-show")
+SLACK_METRIC_PATTERNS = {
+    "calls_attempted": re.compile(r"(\d+)\s*(?:calls?|dials?)\b"),
+    "calls_connected": re.compile(r"(\d+)\s*(?:connects?|connected|conversations?)\b"),
+    "calls_qualified": re.compile(r"(\d+)\s*(?:qualified|sqls?)\b"),
+    "demos_scheduled": re.compile(r"(\d+)\s*(?:demos?|presentations?)\s*(?:booked|scheduled|set)\b"),
+    "demos_completed": re.compile(r"(\d+)\s*(?:demos?|presentations?)\b(?!\s*(?:booked|scheduled|set)\b)"),
+    "demos_no_show": re.compile(r"(\d+)\s*no[- ]?shows?\b"),
+    "proposals_sent": re.compile(r"(\d+)\s*(?:proposals?)\b(?!\s*(?:accepted|signed|won|rejected|lost)\b)"),
+    "proposals_accepted": re.compile(r"(\d+)\s*(?:proposals?\s*)?(?:accepted|signed|won)\b"),
+    "proposals_rejected": re.compile(r"(\d+)\s*(?:proposals?\s*)?(?:rejected|lost)\b"),
+}
+
+_NUMBER_RE = re.compile(r"\d+")
+
+# INSERT ... ON CONFLICT DO UPDATE for the dialects we run on, so a rep's weekly row is
+# created or updated in one statement and two concurrent first writes can't both insert
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_ROLLUP_KEY = ("user_id", "week_start")
+
+
+def week_start_for(value) -> date:
+    """Get the Monday of the week containing a date or datetime"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value - timedelta(days=value.weekday())
+
+
+def task_units(task_type: Optional[str], title: Optional[str]) -> int:
+    """Number of activities a task represents ("☎️ Make 4 discovery calls" is 4 calls)"""
+    if task_type == "calls":
+        numbers = _NUMBER_RE.findall(title or "")
+        return int(numbers[0]) if numbers else 0
+    return 1
+
+
+def task_contribution(task_type: Optional[str], title: Optional[str], status: Optional[str]) -> Dict[str, int]:
+    """Funnel counters contributed by a single task in its current state"""
+    completed = status == "Completed"
+    if task_type == "calls":
+        return {"calls_attempted": task_units(task_type, title) if completed else 0}
+    if task_type == "demos":
+        return {"demos_scheduled": 1, "demos_completed": 1 if completed else 0}
+    if task_type == "proposals":
+        return {"proposals_sent": 1 if completed else 0}
+    return {}
+
+
+def _rate(numerator: int, denominator: int) -> float:
+    """Percentage rounded to one decimal, 0 when there is nothing to convert"""
+    return round(numerator / denominator * 100, 1) if denominator else 0.0
+
+
+class SalesMetricsService:
+    """Ingestion and rollup pipeline for weekly per-rep funnel metrics.
+
+    Writes go through the caller's session and are not committed here, so the
+    rollup changes land in the same transaction as the task change that caused them.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ================== INCREMENTAL INGESTION ==================
+
+    def _upsert(self, user_id: int, week_start: date, insert_values: Dict, update_values: Dict) -> None:
+        """Insert the rep's weekly row, or apply update_values to it if it already exists"""
+        upsert_insert = _UPSERT_INSERTS[self.db.get_bind().dialect.name]
+        stmt = upsert_insert(SalesMetric).values(user_id=user_id, week_start=week_start, **insert_values)
+        self.db.execute(stmt.on_conflict_do_update(index_elements=_ROLLUP_KEY, set_=update_values))
+
+    def apply_deltas(self, user_id: int, week_start: date, deltas: Dict[str, int]) -> None:
+        """Atomically add deltas to a rep's weekly rollup row, creating it if needed"""
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+
+        values = {field: getattr(SalesMetric, field) + value for field, value in deltas.items()}
+        values["updated_at"] = datetime.utcnow()
+        self._upsert(user_id, week_start, {field: max(value, 0) for field, value in deltas.items()}, values)
+
+    def record_task_change(self, task: Task, previous_status: Optional[str] = None,
+                           created: bool = False, deleted: bool = False,
+                           week_start: Optional[date] = None) -> None:
+        """Apply the funnel delta for a task being created, deleted or changing status"""
+        week_start = week_start or week_start_for(task.created_at or datetime.utcnow())
+        after = {} if deleted else task_contribution(task.task_type, task.title, task.status)
+        before = {} if created else task_contribution(
+            task.task_type, task.title, task.status if deleted else previous_status
+        )
+
+        deltas = {field: after.get(field, 0) - before.get(field, 0) for field in set(after) | set(before)}
+        self.apply_deltas(task.owner_id, week_start, deltas)
+
+    def record_task_changes(self, changes: Iterable[Tuple[Task, Optional[str]]] = (),
+                            created: Iterable[Task] = (), removed: Iterable[Task] = ()) -> int:
+        """Apply the summed funnel deltas of many task changes, one rollup write per (rep, week).
+
+        changes holds (task, previous_status) pairs for updated tasks, created the
+        newly inserted ones and removed the deleted ones (or a task's state before
+        an edit); tasks can be any rows with the Task columns, e.g. from an
+        UPDATE ... RETURNING. Returns the number of rollup rows touched.
+        """
+        def contribution(task, status):
+            return task_contribution(task.task_type, task.title, status)
+
+        # (task, contribution before, contribution after)
+        entries = [(task, contribution(task, previous_status), contribution(task, task.status))
+                   for task, previous_status in changes]
+        entries += [(task, {}, contribution(task, task.status)) for task in created]
+        entries += [(task, contribution(task, task.status), {}) for task in removed]
+
+        totals: Dict[Tuple[int, date], Dict[str, int]] = {}
+        for task, before, after in entries:
+            deltas = totals.setdefault((task.owner_id, week_start_for(task.created_at or datetime.utcnow())), {})
+            for field in set(after) | set(before):
+                deltas[field] = deltas.get(field, 0) + after.get(field, 0) - before.get(field, 0)
+
+        for (user_id, week_start), deltas in totals.items():
+            self.apply_deltas(user_id, week_start, deltas)
+        return len(totals)
+
+    def parse_slack_update(self, text: str) -> Dict[str, int]:
+        """Extract self-reported funnel counts from a Slack progress update"""
+        text_lower = text.lower()
+        reported = {}
+        for field, pattern in SLACK_METRIC_PATTERNS.items():
+            match = pattern.search(text_lower)
+            if match:
+                reported[field] = int(match.group(1))
+        return reported
+
+    def record_slack_update(self, user_id: int, text: str, week_start: Optional[date] = None) -> Dict[str, int]:
+        """Merge a rep's self-reported numbers into their weekly rollup.
+
+        Reps usually report running totals ("15 calls so far"), so each reported
+        count raises the stored value to at least that number instead of adding
+        to it. Repeated updates and task completions are therefore not double counted.
+        """
+        reported = self.parse_slack_update(text)
+        if not reported:
+            return reported
+
+        week_start = week_start or week_start_for(date.today())
+        values = {
+            field: case((getattr(SalesMetric, field) < value, value), else_=getattr(SalesMetric, field))
+            for field, value in reported.items()
+        }
+        values["updated_at"] = datetime.utcnow()
+        self._upsert(user_id, week_start, reported, values)
+        return reported
+
+    # ================== BULK BACKFILL ==================
+
+    def _aggregate_tasks(self, since: Optional[date] = None,
+                         user_ids: Optional[Iterable[int]] = None) -> Dict[Tuple[int, date], Dict[str, int]]:
+        """Stream the tasks table once and fold it into per-(rep, week) counters"""
+        query = select(Task.owner_id, Task.created_at, Task.task_type, Task.title, Task.status).where(
+            Task.task_type.in_(("calls", "demos", "proposals"))
+        )
+        if since:
+            query = query.where(Task.created_at >= week_start_for(since))
+        if user_ids is not None:
+            query = query.where(Task.owner_id.in_(list(user_ids)))
+
+        rollup: Dict[Tuple[int, date], Dict[str, int]] = {}
+        rows = self.db.execute(query.execution_options(yield_per=5000))
+        for owner_id, created_at, task_type, title, status in rows:
+            if created_at is None:
+                continue
+            counters = rollup.setdefault(
+                (owner_id, week_start_for(created_at)), dict.fromkeys(TASK_METRIC_FIELDS, 0)
+            )
+            for field, value in task_contribution(task_type, title, status).items():
+                counters[field] += value
+        return rollup
+
+    def backfill(self, since: Optional[date] = None, user_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+        """Rebuild the task-derived rollup columns from historical tasks.
+
+        One streaming read of the tasks table, one read of the existing rollup rows
+        and two bulk statements (insert + update by primary key). Slack-only columns
+        such as calls_connected or revenue are left untouched.
+        """
+        rollup = self._aggregate_tasks(since, user_ids)
+
+        existing_query = select(SalesMetric.id, SalesMetric.user_id, SalesMetric.week_start)
+        if since:
+            existing_query = existing_query.where(SalesMetric.week_start >= week_start_for(since))
+        if user_ids is not None:
+            existing_query = existing_query.where(SalesMetric.user_id.in_(list(user_ids)))
+        existing = {
+            (row.user_id, row.week_start): row.id for row in self.db.execute(existing_query)
+        }
+
+        now = datetime.utcnow()
+        inserts: List[Dict] = []
+        updates: List[Dict] = []
+        for key, counters in rollup.items():
+            if key in existing:
+                updates.append({"id": existing.pop(key), "updated_at": now, **counters})
+            else:
+                inserts.append({"user_id": key[0], "week_start": key[1], **counters})
+
+        # Weeks whose tasks were all removed keep their row but lose the task-derived counts
+        for metric_id in existing.values():
+            updates.append({"id": metric_id, "updated_at": now, **dict.fromkeys(TASK_METRIC_FIELDS, 0)})
+
+        if inserts:
+            self.db.execute(insert(SalesMetric), inserts)
+        if updates:
+            self.db.execute(update(SalesMetric), updates)
+        self.db.commit()
+
+        logger.info(f"Backfilled sales metrics: {len(inserts)} created, {len(updates)} updated")
+        return {"created": len(inserts), "updated": len(updates), "weeks": len(rollup)}
+
+    # ================== FUNNEL READS ==================
+
+    def _funnel_from_counts(self, counts: Dict[str, int]) -> Dict:
+        """Attach conversion rates to a set of funnel counters"""
+        return {
+            **counts,
+            "connect_rate": _rate(counts["calls_connected"], counts["calls_attempted"]),
+            "qualify_rate": _rate(counts["calls_qualified"], counts["calls_connected"]),
+            "call_to_demo_rate": _rate(counts["demos_scheduled"], counts["calls_attempted"]),
+            "demo_show_rate": _rate(counts["demos_completed"], counts["demos_scheduled"]),
+            "no_show_rate": _rate(counts["demos_no_show"], counts["demos_scheduled"]),
+            "demo_to_proposal_rate": _rate(counts["proposals_sent"], counts["demos_completed"]),
+            "proposal_win_rate": _rate(counts["proposals_accepted"], counts["proposals_sent"]),
+        }
+
+    def _empty_counts(self) -> Dict[str, int]:
+        return dict.fromkeys(FUNNEL_FIELDS, 0)
+
+    def get_user_funnel(self, user_id: int, week_start: date) -> Dict:
+        """Funnel counts and conversion rates for one rep and week"""
+        metric = self.db.execute(
+            select(SalesMetric).where(SalesMetric.user_id == user_id, SalesMetric.week_start == week_start)
+        ).scalar_one_or_none()
+
+        counts = self._empty_counts()
+        if metric:
+            counts.update({field: getattr(metric, field) or 0 for field in FUNNEL_FIELDS})
+        return {"user_id": user_id, "week_start": week_start.isoformat(), **self._funnel_from_counts(counts)}
+
+    def get_team_funnel(self, week_start: date) -> Dict:
+        """Per-rep and team-total funnels for the sales team in a single query"""
+        rows = self.db.execute(
+            select(User.id, User.name, SalesMetric)
+            .outerjoin(SalesMetric, (SalesMetric.user_id == User.id) & (SalesMetric.week_start == week_start))
+            .where(User.role == "sales")
+            .order_by(User.id)
+        ).all()
+
+        totals = self._empty_counts()
+        reps = []
+        for user_id, name, metric in rows:
+            counts = self._empty_counts()
+            if metric:
+                counts.update({field: getattr(metric, field) or 0 for field in FUNNEL_FIELDS})
+            for field in FUNNEL_FIELDS:
+                totals[field] += counts[field]
+            reps.append({"user_id": user_id, "name": name, **self._funnel_from_counts(counts)})
+
+        return {
+            "week_start": week_start.isoformat(),
+            "team": self._funnel_from_counts(totals),
+            "reps": reps,
+        }
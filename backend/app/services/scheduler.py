@@ -1,262 +1,490 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from datetime import datetime, date
+from sqlalchemy import select, delete, insert
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from typing import Optional
 import asyncio
+import logging
+import os
+import numpy as np
+import pytz
 
-from app.database import get_db, SessionLocal
+from app.database import get_db, SessionLocal, sync_engine
+from app.services.leader_lease import LeaderLease, LeaseLostError, LEASE_TTL_SECONDS
+from app.services.job_ledger import JobLedger
 from app.services.sales_agent import SalesAgentService
+from app.services.sales_metrics import week_start_for
+from app.query_counter import query_scope
+from app.logging_config import PER_USER, log_context
 from app.models import User, TeamLeaderboard
 
+logger = logging.getLogger(__name__)
+
+# Server-side clock for the scheduler itself, and the zone assumed for reps without one
+SCHEDULER_TIMEZONE = os.getenv("SCHEDULER_TIMEZONE", "UTC")
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", SCHEDULER_TIMEZONE)
+
+# Local (weekday, hour, minute) each job targets in every rep's timezone; None = every day
+SALES_JOB_SLOTS = {
+    'monday_goal_prompts': (0, 9, 0),
+    'tuesday_followups': (1, 10, 0),
+    'wednesday_nudges': (2, 14, 0),
+    'friday_summaries': (4, 17, 0),
+    'daily_milestone_check': (None, 18, 0),
+}
+
+# How often the dispatcher looks for due timezones, and how late a slot may still run
+SLOT_CHECK_MINUTES = 15
+SLOT_CATCH_UP = timedelta(hours=3)
+
+
+@lru_cache(maxsize=256)
+def effective_timezone(name: Optional[str]) -> str:
+    """The IANA zone a rep's jobs run in - DEFAULT_TIMEZONE when unset or unknown"""
+    if name:
+        try:
+            pytz.timezone(name)
+            return name
+        except pytz.UnknownTimeZoneError:
+            logger.warning("⚠️ [SALES AGENT] Unknown timezone '%s', using %s", name, DEFAULT_TIMEZONE)
+    return DEFAULT_TIMEZONE
+
 
 class SalesAgentScheduler:
     """Autonomous Sales Agent Scheduler for proactive sales management"""
     
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
-        self.setup_sales_jobs()
+        # Only the lease renewal lives in memory on every worker; the sales jobs are
+        # kept in the database job store, which is attached by the elected leader
+        self.scheduler = AsyncIOScheduler(
+            timezone=SCHEDULER_TIMEZONE,
+            jobstores={"default": MemoryJobStore()},
+            job_defaults={"coalesce": True, "misfire_grace_time": 3600}
+        )
+        self.lease = LeaderLease("sales_scheduler")
+        self.is_leader = False
+        self._active_jobs = set()
+        self.scheduler.add_job(
+            func=self._renew_leadership,
+            trigger=IntervalTrigger(seconds=max(LEASE_TTL_SECONDS // 3, 1)),
+            id='leader_lease',
+            name='Renew scheduler leader lease',
+            next_run_time=datetime.now(),
+            max_instances=1,
+            replace_existing=True
+        )
     
     def setup_sales_jobs(self):
-        """Setup all sales agent automation jobs"""
+        """Setup all sales agent automation jobs in the persistent job store.
+
+        Jobs reference module-level functions so they can be stored by reference
+        and picked up by whichever worker holds the leader lease. Each job wakes
+        every SLOT_CHECK_MINUTES and runs for the timezones whose local slot is
+        due, so reps get their messages at local time and the Slack/LLM load is
+        spread across the day instead of arriving in one burst.
+        """
+        every_slot = CronTrigger(minute=f'*/{SLOT_CHECK_MINUTES}')
         
-        # Monday 9:00 AM - Send weekly goal prompts to all sales reps
+        # Monday 9:00 AM local - Send weekly goal prompts to all sales reps
         self.scheduler.add_job(
-            func=self.monday_goal_prompts,
-            trigger=CronTrigger(day_of_week=0, hour=9, minute=0),  # Monday 9 AM
+            func='app.services.scheduler:run_monday_goal_prompts',
+            trigger=every_slot,
             id='monday_goal_prompts',
             name='Send Monday Goal Prompts',
+            jobstore='persistent',
             replace_existing=True
         )
         
-        # Wednesday 2:00 PM - Send mid-week coaching nudges
+        # Wednesday 2:00 PM local - Send mid-week coaching nudges
         self.scheduler.add_job(
-            func=self.wednesday_nudges,
-            trigger=CronTrigger(day_of_week=2, hour=14, minute=0),  # Wednesday 2 PM
+            func='app.services.scheduler:run_wednesday_nudges',
+            trigger=every_slot,
             id='wednesday_nudges',
             name='Send Wednesday Coaching Nudges',
+            jobstore='persistent',
             replace_existing=True
         )
         
-        # Friday 5:00 PM - Send weekly summaries and generate leaderboards
+        # Friday 5:00 PM local - Send weekly summaries and generate leaderboards
         self.scheduler.add_job(
-            func=self.friday_summaries,
-            trigger=CronTrigger(day_of_week=4, hour=17, minute=0),  # Friday 5 PM
+            func='app.services.scheduler:run_friday_summaries',
+            trigger=every_slot,
             id='friday_summaries',
             name='Send Friday Weekly Summaries',
+            jobstore='persistent',
             replace_existing=True
         )
         
-        # Tuesday 10:00 AM - Follow up with non-responders from Monday
+        # Tuesday 10:00 AM local - Follow up with non-responders from Monday
         self.scheduler.add_job(
-            func=self.tuesday_followups,
-            trigger=CronTrigger(day_of_week=1, hour=10, minute=0),  # Tuesday 10 AM
+            func='app.services.scheduler:run_tuesday_followups',
+            trigger=every_slot,
             id='tuesday_followups',
             name='Follow up with non-responders',
+            jobstore='persistent',
             replace_existing=True
         )
         
-        # Daily 6:00 PM - Check for milestone achievements and celebrate
+        # Daily 6:00 PM local - Check for milestone achievements and celebrate
         self.scheduler.add_job(
-            func=self.daily_milestone_check,
-            trigger=CronTrigger(hour=18, minute=0),  # Daily 6 PM
+            func='app.services.scheduler:run_daily_milestone_check',
+            trigger=every_slot,
             id='daily_milestone_check',
             name='Daily Milestone Celebrations',
+            jobstore='persistent',
             replace_existing=True
         )
     
-    async def monday_goal_prompts(self):
-        """Send Monday morning goal-setting prompts to all sales reps"""
-        print(f"🎯 [SALES AGENT] Starting Monday goal prompts at {datetime.now()}")
+    def _sales_timezones(self) -> set:
+        """Distinct effective timezones across the sales team"""
+        db = SessionLocal()
+        try:
+            rows = db.execute(select(User.timezone).where(User.role == "sales").distinct())
+            return {effective_timezone(name) for (name,) in rows}
+        finally:
+            db.close()
+    
+    def due_timezones(self, job_id: str, now: Optional[datetime] = None) -> list:
+        """(timezone, local date) pairs whose local slot for the job is due now.
+
+        A slot is due from its local time until SLOT_CATCH_UP later, so a slot
+        missed during a restart or failover still runs; the job ledger makes
+        the repeated checks within that window no-ops once the run completes.
+        """
+        weekday, hour, minute = SALES_JOB_SLOTS[job_id]
+        now = now or datetime.now(pytz.utc)
+        due = []
+        for name in sorted(self._sales_timezones()):
+            zone = pytz.timezone(name)
+            local_now = now.astimezone(zone)
+            if weekday is not None and local_now.weekday() != weekday:
+                continue
+            slot = zone.localize(datetime(local_now.year, local_now.month, local_now.day, hour, minute))
+            if slot <= local_now < slot + SLOT_CATCH_UP:
+                due.append((name, local_now.date()))
+        return due
+    
+    async def dispatch_local_slots(self, job_id: str):
+        """Run a job once for every timezone whose local slot is due"""
+        job = getattr(self, job_id)
+        for name, local_date in self.due_timezones(job_id):
+            await job(timezone=name, local_date=local_date)
+    
+    async def _renew_leadership(self):
+        """Acquire or renew the leader lease and attach/detach the persistent jobs"""
+        is_leader = await asyncio.to_thread(self.lease.try_acquire)
         
+        if is_leader and not self.is_leader:
+            self.scheduler.add_jobstore(
+                SQLAlchemyJobStore(engine=sync_engine, tablename='apscheduler_jobs'), 'persistent'
+            )
+            self.setup_sales_jobs()
+            self.is_leader = True
+            self._resume_interrupted_runs()
+            logger.info("👑 [SALES AGENT] Worker %s is now the scheduler leader", self.lease.holder_id)
+        elif not is_leader and self.is_leader:
+            self._detach_sales_jobs()
+            logger.info("🛑 [SALES AGENT] Worker %s lost the scheduler lease", self.lease.holder_id)
+    
+    def _detach_sales_jobs(self):
+        """Stop running the persistent jobs on this worker (they stay stored for the next leader)"""
+        if self.is_leader:
+            self.scheduler.remove_jobstore('persistent')
+            self.is_leader = False
+    
+    async def _run_per_user(self, job_id: str, run_key: str, handle_user, manual: bool = False,
+                            timezone: Optional[str] = None):
+        """Run a per-user job body under the job ledger.
+
+        Each user's outcome and latency is checkpointed as it is processed. A run
+        for the same job and period that was interrupted resumes with the users it
+        had not reached; one that already completed is not repeated. Manual
+        triggers always get a fresh run. With a timezone only the reps in that
+        zone are processed, and the zone becomes part of the run key.
+        
+        A scheduled run checks the leader lease before each user and stops if it
+        has been lost, leaving the run for the new leader to resume, so a worker
+        that only lost its lease does not keep sending next to its successor.
+        """
+        if timezone:
+            run_key = f"{run_key}@{timezone}"
+        active_key = f"{job_id}:{run_key}"
+        if manual:
+            run_key = f"{run_key}:manual:{datetime.now().isoformat(timespec='seconds')}"
+        elif active_key in self._active_jobs:
+            # A catch-up run and a resumed run can be queued together after a failover
+            logger.info("⏩ [SALES AGENT] %s is already running on this worker for %s", job_id, run_key)
+            return None
+        
+        ledger = JobLedger(worker=self.lease.holder_id, lease_generation=self.lease.generation)
+        db = SessionLocal()
+        run = None
+        self._active_jobs.add(active_key)
         try:
-            # Use sync database session for SalesAgentService compatibility
-            db = SessionLocal()
-            try:
-                sales_agent = SalesAgentService(db)
-                
-                # Get all sales team members using sync query
-                sales_users = db.query(User).filter(User.role == "sales").all()
-                
-                success_count = 0
+            run, handled_user_ids = ledger.start_run(job_id, run_key)
+            if run is None:
+                return None
+            
+            sales_agent = SalesAgentService(db)
+            sales_users = db.query(User).filter(User.role == "sales").all()
+            if timezone:
+                sales_users = [user for user in sales_users if effective_timezone(user.timezone) == timezone]
+            ledger.set_total(run, len(sales_users))
+            
+            # The job as a whole repeats its statements once per user by design, so N+1
+            # shapes are looked for within each user's handling and the job only totals
+            with log_context(job_id=job_id, run_key=run_key), query_scope(job_id, threshold=None) as job_queries:
                 for user in sales_users:
-                    try:
-                        # Check if user already has goals for this week
-                        week_start = sales_agent.get_current_week_start()
-                        existing_progress = sales_agent.get_weekly_progress(user.id, week_start)
-                        
-                        if existing_progress['calls_target'] > 0:
-                            # User already set goals, send confirmation instead
-                            await self._send_goal_confirmation(sales_agent, user, existing_progress)
-                        else:
-                            # Send goal-setting prompt
-                            success = await sales_agent.send_monday_goal_prompt_async(user.id)
-                            if success:
-                                success_count += 1
-                                print(f"✅ Sent Monday prompt to {user.name}")
-                            else:
-                                print(f"❌ Failed to send Monday prompt to {user.name}")
-                                
-                    except Exception as e:
-                        print(f"❌ Error sending prompt to {user.name}: {e}")
-                
-                print(f"🎯 [SALES AGENT] Monday prompts completed: {success_count}/{len(sales_users)} sent")
-            finally:
-                db.close()
+                    if user.id in handled_user_ids:
+                        continue
+                    if not manual and not self.lease.is_valid():
+                        raise LeaseLostError(f"{self.lease.name} lease lost during {job_id} {run_key}")
+                    item = ledger.begin_item(run, user.id)
+                    with log_context(user_id=user.id):
+                        try:
+                            with query_scope(f"{job_id} user {user.id}"):
+                                status = await handle_user(sales_agent, user)
+                            ledger.finish_item(run, item, status)
+                        except Exception as e:
+                            logger.error("❌ Error in %s for %s: %s", job_id, user.name, e)
+                            ledger.finish_item(run, item, "failed", str(e))
+            
+            ledger.finish_run(run)
+            if job_queries is not None:
+                logger.info("🔢 [SALES AGENT] %s", job_queries.format(limit=5))
+            return run
+        except LeaseLostError as e:
+            # The run stays "running" under the old lease generation; the new leader resumes it
+            logger.warning("🛑 [SALES AGENT] Stopping %s: %s", job_id, e)
+            return None
+        except Exception as e:
+            if run is not None:
+                ledger.finish_run(run, "failed", str(e))
+            raise
+        finally:
+            self._active_jobs.discard(active_key)
+            db.close()
+            ledger.close()
+    
+    async def monday_goal_prompts(self, manual: bool = False, timezone: Optional[str] = None,
+                                  local_date: Optional[date] = None):
+        """Send Monday morning goal-setting prompts to all sales reps (or those in one timezone)"""
+        logger.info("🎯 [SALES AGENT] Starting Monday goal prompts at %s%s", datetime.now(), self._zone_label(timezone))
+        week_start = week_start_for(local_date or date.today())
+        
+        async def handle_user(sales_agent: SalesAgentService, user: User) -> str:
+            # Check if user already has goals for this week
+            existing_progress = sales_agent.get_weekly_progress(user.id, week_start)
+            
+            if existing_progress['calls_target'] > 0:
+                # User already set goals, send confirmation instead
+                await self._send_goal_confirmation(sales_agent, user, existing_progress)
+                return "sent"
             
+            # Send goal-setting prompt
+            success = await sales_agent.send_monday_goal_prompt_async(user.id, week_start)
+            if success:
+                logger.info("✅ Sent Monday prompt to %s", user.name, extra=PER_USER)
+                return "sent"
+            logger.warning("❌ Failed to send Monday prompt to %s", user.name)
+            return "failed"
+        
+        try:
+            run = await self._run_per_user('monday_goal_prompts', week_start.isoformat(), handle_user, manual, timezone)
+            if run:
+                logger.info("🎯 [SALES AGENT] Monday prompts completed: %s/%s sent", run.succeeded, run.total_items)
         except Exception as e:
-            print(f"❌ [SALES AGENT] Error in Monday goal prompts: {e}")
+            logger.error("❌ [SALES AGENT] Error in Monday goal prompts: %s", e)
     
-    async def wednesday_nudges(self):
+    async def wednesday_nudges(self, manual: bool = False, timezone: Optional[str] = None,
+                               local_date: Optional[date] = None):
         """Send Wednesday mid-week coaching nudges"""
-        print(f"📊 [SALES AGENT] Starting Wednesday nudges at {datetime.now()}")
+        logger.info("📊 [SALES AGENT] Starting Wednesday nudges at %s%s", datetime.now(), self._zone_label(timezone))
+        week_start = week_start_for(local_date or date.today())
+        
+        async def handle_user(sales_agent: SalesAgentService, user: User) -> str:
+            # Only send nudge if user has goals for this week
+            progress = sales_agent.get_weekly_progress(user.id, week_start)
+            
+            if progress['calls_target'] > 0 or progress['demos_target'] > 0 or progress['proposals_target'] > 0:
+                success = await sales_agent.send_midweek_nudge_async(user.id, week_start)
+                if success:
+                    logger.info("✅ Sent Wednesday nudge to %s", user.name, extra=PER_USER)
+                    return "sent"
+                logger.warning("❌ Failed to send Wednesday nudge to %s", user.name)
+                return "failed"
+            
+            logger.info("⏩ Skipping %s - no goals set for this week", user.name, extra=PER_USER)
+            return "skipped"
         
         try:
-            # Use sync database session for SalesAgentService compatibility
-            db = SessionLocal()
-            try:
-                sales_agent = SalesAgentService(db)
-                
-                # Get all sales team members using sync query
-                sales_users = db.query(User).filter(User.role == "sales").all()
-                
-                success_count = 0
-                for user in sales_users:
-                    try:
-                        # Only send nudge if user has goals for this week
-                        week_start = sales_agent.get_current_week_start()
-                        progress = sales_agent.get_weekly_progress(user.id, week_start)
-                        
-                        if progress['calls_target'] > 0 or progress['demos_target'] > 0 or progress['proposals_target'] > 0:
-                            success = await sales_agent.send_midweek_nudge_async(user.id)
-                            if success:
-                                success_count += 1
-                                print(f"✅ Sent Wednesday nudge to {user.name}")
-                            else:
-                                print(f"❌ Failed to send Wednesday nudge to {user.name}")
-                        else:
-                            print(f"⏩ Skipping {user.name} - no goals set for this week")
-                            
-                    except Exception as e:
-                        print(f"❌ Error sending nudge to {user.name}: {e}")
-                
-                print(f"📊 [SALES AGENT] Wednesday nudges completed: {success_count}/{len(sales_users)} sent")
-            finally:
-                db.close()
-                
+            run = await self._run_per_user('wednesday_nudges', week_start.isoformat(), handle_user, manual, timezone)
+            if run:
+                logger.info("📊 [SALES AGENT] Wednesday nudges completed: %s/%s sent", run.succeeded, run.total_items)
         except Exception as e:
-            print(f"❌ [SALES AGENT] Error in Wednesday nudges: {e}")
+            logger.error("❌ [SALES AGENT] Error in Wednesday nudges: %s", e)
     
-    async def friday_summaries(self):
+    async def friday_summaries(self, manual: bool = False, timezone: Optional[str] = None,
+                               local_date: Optional[date] = None):
         """Send Friday weekly summaries and update leaderboards"""
-        print(f"🏁 [SALES AGENT] Starting Friday summaries at {datetime.now()}")
+        logger.info("🏁 [SALES AGENT] Starting Friday summaries at %s%s", datetime.now(), self._zone_label(timezone))
         
         try:
-            async for db in get_db():
-                sales_agent = SalesAgentService(db)
-                
-                result = await db.execute(select(User).where(User.role == "sales"))
-                sales_users = result.scalars().all()
-                week_start = sales_agent.get_current_week_start()
+            week_start = week_start_for(local_date or date.today())
+            
+            async def handle_user(sales_agent: SalesAgentService, user: User) -> str:
+                progress = sales_agent.get_weekly_progress(user.id, week_start)
                 
-                # Generate and store leaderboard
-                leaderboard = await sales_agent.get_team_leaderboard(week_start)
-                await self._store_weekly_leaderboard(db, leaderboard, week_start)
+                if progress['calls_target'] > 0 or progress['demos_target'] > 0 or progress['proposals_target'] > 0:
+                    success = await sales_agent.send_weekly_summary_async(user.id, week_start)
+                    if success:
+                        logger.info("✅ Sent Friday summary to %s", user.name, extra=PER_USER)
+                        return "sent"
+                    logger.warning("❌ Failed to send Friday summary to %s", user.name)
+                    return "failed"
                 
-                # Send individual summaries
-                summary_count = 0
-                for user in sales_users:
-                    try:
-                        progress = await sales_agent.get_weekly_progress(user.id, week_start)
-                        
-                        if progress['calls_target'] > 0 or progress['demos_target'] > 0 or progress['proposals_target'] > 0:
-                            success = await sales_agent.send_weekly_summary(user.id)
-                            if success:
-                                summary_count += 1
-                                print(f"✅ Sent Friday summary to {user.name}")
-                            else:
-                                print(f"❌ Failed to send Friday summary to {user.name}")
-                        else:
-                            print(f"⏩ Skipping {user.name} - no goals set for this week")
-                            
-                    except Exception as e:
-                        print(f"❌ Error sending summary to {user.name}: {e}")
+                logger.info("⏩ Skipping %s - no goals set for this week", user.name, extra=PER_USER)
+                return "skipped"
+            
+            run = await self._run_per_user('friday_summaries', week_start.isoformat(), handle_user, manual, timezone)
+            if run:
+                logger.info("🏁 [SALES AGENT] Friday summaries completed: %s/%s sent", run.succeeded, run.total_items)
+                await self._friday_team_wrapup(week_start, manual)
                 
+        except Exception as e:
+            logger.error("❌ [SALES AGENT] Error in Friday summaries: %s", e)
+    
+    async def _friday_team_wrapup(self, week_start: date, manual: bool = False):
+        """Store the week's leaderboard and celebrate top performers, once per week.
+
+        Friday summaries run once per timezone slot, so the team-wide part waits
+        until every sales timezone has completed its run and is then gated on its
+        own ledger run ("friday_team", keyed by week); later slot checks and
+        resumed runs find it completed and do nothing. Manual triggers always
+        refresh it.
+        """
+        period = week_start.isoformat()
+        ledger = JobLedger(worker=self.lease.holder_id, lease_generation=self.lease.generation)
+        run = None
+        try:
+            if manual:
+                run_key = f"{period}:manual:{datetime.now().isoformat(timespec='seconds')}"
+            else:
+                zone_keys = {period} | {f"{period}@{name}" for name in self._sales_timezones()}
+                completed = ledger.completed_run_keys('friday_summaries', zone_keys)
+                if period not in completed and completed != zone_keys - {period}:
+                    logger.info("⏳ [SALES AGENT] Team leaderboard waits for the remaining timezones' summaries")
+                    return
+                run_key = period
+            
+            run, _ = ledger.start_run('friday_team', run_key)
+            if run is None:
+                return
+            
+            db = SessionLocal()
+            try:
+                sales_agent = SalesAgentService(db)
+                leaderboard = sales_agent.get_team_leaderboard(week_start)
+                async for async_db in get_db():
+                    await self._store_weekly_leaderboard(async_db, leaderboard, week_start)
+                    break
                 # Send team celebration message if there are high performers
                 await self._send_team_celebration(sales_agent, leaderboard)
-                
-                print(f"🏁 [SALES AGENT] Friday summaries completed: {summary_count}/{len(sales_users)} sent")
-                break
-                
+            finally:
+                db.close()
+            ledger.set_total(run, len(leaderboard))
+            ledger.finish_run(run)
         except Exception as e:
-            print(f"❌ [SALES AGENT] Error in Friday summaries: {e}")
+            if run is not None:
+                ledger.finish_run(run, "failed", str(e))
+            raise
+        finally:
+            ledger.close()
     
-    async def tuesday_followups(self):
+    async def tuesday_followups(self, manual: bool = False, timezone: Optional[str] = None,
+                                local_date: Optional[date] = None):
         """Follow up with sales reps who didn't respond to Monday's prompt"""
-        print(f"🔔 [SALES AGENT] Starting Tuesday followups at {datetime.now()}")
+        logger.info("🔔 [SALES AGENT] Starting Tuesday followups at %s%s", datetime.now(), self._zone_label(timezone))
+        week_start = week_start_for(local_date or date.today())
+        
+        async def handle_user(sales_agent: SalesAgentService, user: User) -> str:
+            progress = sales_agent.get_weekly_progress(user.id, week_start)
+            
+            # If no goals set, send friendly followup
+            if progress['calls_target'] == 0 and progress['demos_target'] == 0 and progress['proposals_target'] == 0:
+                await self._send_tuesday_followup(sales_agent, user)
+                logger.info("✅ Sent Tuesday followup to %s", user.name, extra=PER_USER)
+                return "sent"
+            return "skipped"
         
         try:
-            async for db in get_db():
-                sales_agent = SalesAgentService(db)
-                
-                result = await db.execute(select(User).where(User.role == "sales"))
-                sales_users = result.scalars().all()
-                
-                followup_count = 0
-                for user in sales_users:
-                    try:
-                        week_start = sales_agent.get_current_week_start()
-                        progress = await sales_agent.get_weekly_progress(user.id, week_start)
-                        
-                        # If no goals set, send friendly followup
-                        if progress['calls_target'] == 0 and progress['demos_target'] == 0 and progress['proposals_target'] == 0:
-                            await self._send_tuesday_followup(sales_agent, user)
-                            followup_count += 1
-                            print(f"✅ Sent Tuesday followup to {user.name}")
-                            
-                    except Exception as e:
-                        print(f"❌ Error sending followup to {user.name}: {e}")
-                
-                print(f"🔔 [SALES AGENT] Tuesday followups completed: {followup_count} sent")
-                break
-                
+            run = await self._run_per_user('tuesday_followups', week_start.isoformat(), handle_user, manual, timezone)
+            if run:
+                logger.info("🔔 [SALES AGENT] Tuesday followups completed: %s sent", run.succeeded)
         except Exception as e:
-            print(f"❌ [SALES AGENT] Error in Tuesday followups: {e}")
+            logger.error("❌ [SALES AGENT] Error in Tuesday followups: %s", e)
     
-    async def daily_milestone_check(self):
+    async def daily_milestone_check(self, manual: bool = False, timezone: Optional[str] = None,
+                                    local_date: Optional[date] = None):
         """Check for daily milestones and send celebrations"""
-        print(f"🎉 [SALES AGENT] Starting daily milestone check at {datetime.now()}")
+        logger.info("🎉 [SALES AGENT] Starting daily milestone check at %s%s", datetime.now(), self._zone_label(timezone))
+        run_date = local_date or date.today()
+        week_start = week_start_for(run_date)
+        
+        async def handle_user(sales_agent: SalesAgentService, user: User) -> str:
+            progress = sales_agent.get_weekly_progress(user.id, week_start)
+            
+            # Check for milestone achievements
+            milestone_message = self._check_milestones(user, progress)
+            if milestone_message:
+                # Send celebration DM (simulated since Slack is disabled)
+                logger.info("🎉 Milestone celebration for %s: %s", user.name, milestone_message, extra=PER_USER)
+                return "sent"
+            return "skipped"
         
         try:
-            async for db in get_db():
-                sales_agent = SalesAgentService(db)
-                
-                result = await db.execute(select(User).where(User.role == "sales"))
-                sales_users = result.scalars().all()
-                week_start = sales_agent.get_current_week_start()
-                
-                celebrations_sent = 0
-                for user in sales_users:
-                    try:
-                        progress = await sales_agent.get_weekly_progress(user.id, week_start)
-                        
-                        # Check for milestone achievements
-                        milestone_message = self._check_milestones(user, progress)
-                        if milestone_message:
-                            # Send celebration DM (simulated since Slack is disabled)
-                            print(f"🎉 Milestone celebration for {user.name}: {milestone_message}")
-                            celebrations_sent += 1
-                            
-                    except Exception as e:
-                        print(f"❌ Error checking milestones for {user.name}: {e}")
-                
-                if celebrations_sent > 0:
-                    print(f"🎉 [SALES AGENT] Daily milestones: {celebrations_sent} celebrations sent")
-                break
-                
+            run = await self._run_per_user('daily_milestone_check', run_date.isoformat(), handle_user, manual, timezone)
+            if run and run.succeeded > 0:
+                logger.info("🎉 [SALES AGENT] Daily milestones: %s celebrations sent", run.succeeded)
         except Exception as e:
-            print(f"❌ [SALES AGENT] Error in daily milestone check: {e}")
+            logger.error("❌ [SALES AGENT] Error in daily milestone check: %s", e)
+    
+    def _resume_interrupted_runs(self):
+        """Re-queue runs a previous leader left unfinished so they continue from their checkpoint.
+
+        Only runs whose worker no longer holds a live lease are picked up (see
+        JobLedger.find_interrupted_runs).
+        """
+        ledger = JobLedger()
+        try:
+            interrupted = ledger.find_interrupted_runs()
+        finally:
+            ledger.close()
+        
+        for run in interrupted:
+            if ':manual:' in run.run_key or run.job_id not in SALES_JOB_SLOTS:
+                continue
+            # Run keys are "<period>" or "<period>@<timezone>" for sharded runs
+            period, _, timezone = run.run_key.partition('@')
+            logger.info("♻️ [SALES AGENT] Resuming interrupted %s run for %s", run.job_id, run.run_key)
+            self.scheduler.add_job(
+                func=getattr(self, run.job_id),
+                trigger='date',
+                run_date=datetime.now(),
+                kwargs={"timezone": timezone or None, "local_date": date.fromisoformat(period)},
+                id=f"resume_{run.job_id}_{run.run_key}",
+                replace_existing=True
+            )
+    
+    @staticmethod
+    def _zone_label(timezone: Optional[str]) -> str:
+        return f" for {timezone}" if timezone else ""
     
     async def _send_goal_confirmation(self, sales_agent: SalesAgentService, user: User, progress: dict):
         """Send confirmation message for users who already set goals"""
@@ -270,7 +498,7 @@ I see you've already set your goals for this week:
 Would you like to revise them, or are you ready to crush these numbers? Reply with new numbers if you want to adjust, otherwise you're all set! 💪"""
         
         # Simulate sending message since Slack is disabled
-        print(f"📧 Goal confirmation to {user.name}: {message}")
+        logger.debug("📧 Goal confirmation to %s: %s", user.name, message, extra=PER_USER)
         return True
     
     async def _send_tuesday_followup(self, sales_agent: SalesAgentService, user: User):
@@ -289,7 +517,7 @@ For example: "I'll do 15 calls, 4 demos, and 2 proposals this week"
 The week is still young - let's make it count! 🚀"""
         
         # Simulate sending message since Slack is disabled
-        print(f"📧 Tuesday followup to {user.name}: {message}")
+        logger.debug("📧 Tuesday followup to %s: %s", user.name, message, extra=PER_USER)
         return True
     
     def _check_milestones(self, user: User, progress: dict) -> str:
@@ -319,33 +547,58 @@ The week is still young - let's make it count! 🚀"""
         
         return None
     
+    @staticmethod
+    def _rank_leaderboard(leaderboard: list) -> np.ndarray:
+        """Competition-rank (1, 2, 2, 4) every category column in one pass.
+
+        Returns an (entries x 4) array of overall/calls/demos/proposals ranks where
+        each rank is 1 + the number of reps with a strictly higher score.
+        """
+        scores = np.array(
+            [[entry['total_score'], entry['calls_pct'], entry['demos_pct'], entry['proposals_pct']]
+             for entry in leaderboard],
+            dtype=float
+        ).reshape(-1, 4)
+        ascending = np.sort(scores, axis=0)
+        ranks = np.empty(scores.shape, dtype=int)
+        for column in range(scores.shape[1]):
+            higher = len(scores) - np.searchsorted(ascending[:, column], scores[:, column], side='right')
+            ranks[:, column] = higher + 1
+        return ranks
+    
     async def _store_weekly_leaderboard(self, db: AsyncSession, leaderboard: list, week_start: date):
-        """Store weekly leaderboard snapshot in database"""
+        """Replace the week's leaderboard snapshot in a single transaction"""
         try:
-            # Clear existing leaderboard for this week
-            await db.execute(
-                select(TeamLeaderboard).where(TeamLeaderboard.week_start == week_start)
-            )
-            
-            # Store new leaderboard
-            for rank, entry in enumerate(leaderboard, 1):
-                leaderboard_entry = TeamLeaderboard(
-                    week_start=week_start,
-                    user_id=entry['user_id'],
-                    overall_percentage=entry['overall_pct'],
-                    calls_percentage=entry['calls_pct'],
-                    demos_percentage=entry['demos_pct'],
-                    proposals_percentage=entry['proposals_pct'],
-                    overall_rank=rank
-                )
-                db.add(leaderboard_entry)
+            ranks = self._rank_leaderboard(leaderboard)
+            rows = [
+                {
+                    "week_start": week_start,
+                    "user_id": entry['user_id'],
+                    "overall_percentage": round(entry['overall_pct']),
+                    "calls_percentage": round(entry['calls_pct']),
+                    "demos_percentage": round(entry['demos_pct']),
+                    "proposals_percentage": round(entry['proposals_pct']),
+                    "overall_rank": int(overall_rank),
+                    "calls_rank": int(calls_rank),
+                    "demos_rank": int(demos_rank),
+                    "proposals_rank": int(proposals_rank),
+                }
+                for entry, (overall_rank, calls_rank, demos_rank, proposals_rank) in zip(leaderboard, ranks)
+            ]
             
+            # Delete the week's rows and multi-row insert the new snapshot atomically,
+            # so re-running Friday's job replaces the snapshot instead of appending to it
+            await db.execute(delete(TeamLeaderboard).where(TeamLeaderboard.week_start == week_start))
+            if rows:
+                await db.execute(insert(TeamLeaderboard), rows)
             await db.commit()
-            print(f"📊 Stored weekly leaderboard for {week_start}")
+            logger.info("📊 Stored weekly leaderboard for %s (%s entries)", week_start, len(rows))
             
         except Exception as e:
-            print(f"❌ Error storing leaderboard: {e}")
+            logger.error("❌ Error storing leaderboard: %s", e)
             await db.rollback()
+            # Leave the week's team run unfinished so the next slot check retries it
+            raise
     
     async def _send_team_celebration(self, sales_agent: SalesAgentService, leaderboard: list):
         """Send team celebration message for top performers"""
@@ -357,29 +610,31 @@ The week is still young - let's make it count! 🚀"""
         
         if top_performers:
             # This would send to a team channel - for now just log
-            print(f"🏆 Top performers this week: {[p['name'] for p in top_performers[:3]]}")
+            logger.info("🏆 Top performers this week: %s", [p['name'] for p in top_performers[:3]])
     
     def start(self):
-        """Start the scheduler"""
+        """Start the scheduler and begin competing for the leader lease"""
         if not self.scheduler.running:
             self.scheduler.start()
-            print("🤖 [SALES AGENT] Scheduler started - autonomous sales management active!")
-            print("📅 Scheduled jobs:")
-            print("   - Monday 9:00 AM: Goal setting prompts")
-            print("   - Tuesday 10:00 AM: Follow-up with non-responders") 
-            print("   - Wednesday 2:00 PM: Mid-week coaching nudges")
-            print("   - Friday 5:00 PM: Weekly summaries & leaderboards")
-            print("   - Daily 6:00 PM: Milestone celebrations")
+            logger.info("🤖 [SALES AGENT] Scheduler started - autonomous sales management active!")
+            logger.info(
+                "📅 Scheduled jobs (run by the worker holding the leader lease, in each rep's local time): "
+                "Monday 9:00 AM goal setting prompts; Tuesday 10:00 AM follow-up with non-responders; "
+                "Wednesday 2:00 PM mid-week coaching nudges; Friday 5:00 PM weekly summaries & leaderboards; "
+                "daily 6:00 PM milestone celebrations"
+            )
         else:
-            print("🤖 [SALES AGENT] Scheduler is already running")
+            logger.info("🤖 [SALES AGENT] Scheduler is already running")
     
     def stop(self):
-        """Stop the scheduler"""
+        """Stop the scheduler and hand the leader lease to another worker"""
         if self.scheduler.running:
+            self._detach_sales_jobs()
             self.scheduler.shutdown()
-            print("🛑 [SALES AGENT] Scheduler stopped")
+            self.lease.release()
+            logger.info("🛑 [SALES AGENT] Scheduler stopped")
         else:
-            print("🛑 [SALES AGENT] Scheduler is not running")
+            logger.info("🛑 [SALES AGENT] Scheduler is not running")
     
     def get_job_status(self):
         """Get status of all scheduled jobs"""
@@ -395,4 +650,25 @@ The week is still young - let's make it count! 🚀"""
 
 
 # Global scheduler instance
-sales_scheduler = SalesAgentScheduler() 
\ No newline at end of file
+sales_scheduler = SalesAgentScheduler()
+
+
+# Module-level entry points so the persistent job store can reference the jobs
+async def run_monday_goal_prompts():
+    await sales_scheduler.dispatch_local_slots('monday_goal_prompts')
+
+
+async def run_wednesday_nudges():
+    await sales_scheduler.dispatch_local_slots('wednesday_nudges')
+
+
+async def run_friday_summaries():
+    await sales_scheduler.dispatch_local_slots('friday_summaries')
+
+
+async def run_tuesday_followups():
+    await sales_scheduler.dispatch_local_slots('tuesday_followups')
+
+
+async def run_daily_milestone_check():
+    await sales_scheduler.dispatch_local_slots('daily_milestone_check')
@@ -12,19 +12,53 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Connection pool for the shared Slack session; keep-alive skips the TLS handshake on repeat calls
+SLACK_POOL_SIZE = int(os.getenv("SLACK_POOL_SIZE", "20"))
+SLACK_KEEPALIVE_SECONDS = float(os.getenv("SLACK_KEEPALIVE_SECONDS", "60"))
+
+
+async def create_http_session(trace_configs: Optional[List] = None):
+    """aiohttp session tuned for Slack: pooled keep-alive connections and cached DNS.
+
+    Must be created (and used) on the event loop that will make the requests.
+    """
+    import aiohttp
+    from app.metrics import aiohttp_trace_config
+    connector = aiohttp.TCPConnector(
+        limit=SLACK_POOL_SIZE,
+        keepalive_timeout=SLACK_KEEPALIVE_SECONDS,
+        ttl_dns_cache=300
+    )
+    # Every Slack call is timed for the /metrics endpoint
+    trace_configs = [*(trace_configs or []), aiohttp_trace_config("slack")]
+    return aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+
+
 class SlackService:
     """Service for interacting with Slack API"""
     
-    def __init__(self):
+    def __init__(self, session=None):
         self.token = os.getenv("SLACK_BOT_TOKEN")
         self.channel_id = os.getenv("SLACK_CHANNEL_ID")
         self.client = None
         
         if self.token:
-            self.client = AsyncWebClient(token=self.token)
+            # An aiohttp session passed in is reused across calls instead of one per request
+            self.client = AsyncWebClient(token=self.token, session=session)
         else:
             logger.warning("SLACK_BOT_TOKEN not found. Slack functionality will be disabled.")
     
+    async def open(self):
+        """Attach a pooled keep-alive session; until then each call opens its own connection"""
+        if self.client and self.client.session is None:
+            self.client.session = await create_http_session()
+    
+    async def close(self):
+        """Close the pooled session, if one was attached"""
+        if self.client and self.client.session is not None:
+            await self.client.session.close()
+            self.client.session = None
+    
     async def send_message(self, channel: str, text: str, blocks: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """Send a message to a Slack channel"""
         if not self.client:
@@ -265,4 +299,9 @@ class SlackService:
         return await self.send_message(channel_id, text, blocks)
 
 # Global instance
-slack_service = SlackService() 
\ No newline at end of file
+slack_service = SlackService()
+
+
+def get_slack_service() -> SlackService:
+    """FastAPI dependency returning the process-wide Slack client"""
+    return slack_service
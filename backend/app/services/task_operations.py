@@ -0,0 +1,176 @@
+"""
+Task Operations for DealTracker Sales Agent
+Creates and updates many tasks in one transaction with a single funnel rollup pass
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, any_, bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Task
+from app.services.sales_metrics import SalesMetricsService
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUSES = ("Not Started", "In Progress", "Completed")
+
+# Columns the funnel rollup needs from every created or updated task
+_CHANGE_COLUMNS = (Task.id, Task.owner_id, Task.project_id, Task.created_at, Task.task_type, Task.title, Task.status)
+
+
+def id_in(column, ids: Sequence[int], dialect_name: str):
+    """column = ANY(:ids) with one array parameter on Postgres, IN (...) elsewhere"""
+    if dialect_name == "postgresql":
+        return column == any_(bindparam("ids", list(ids), type_=postgresql.ARRAY(Integer)))
+    return column.in_(list(ids))
+
+
+class TaskOperations:
+    """Bulk task writes on a sync session.
+
+    Each status update is one UPDATE over all its ids, tasks are created with
+    one multi-row INSERT ... RETURNING, and the funnel rollup is updated once
+    per (rep, week) for the whole batch, in the same transaction.
+    """
+
+    def __init__(self, db: Session, metrics: Optional[SalesMetricsService] = None):
+        self.db = db
+        self.metrics = metrics or SalesMetricsService(db)
+
+    @property
+    def dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    def _create(self, tasks: Sequence[Dict]) -> List:
+        if not tasks:
+            return []
+        now = datetime.utcnow()
+        rows = []
+        for task in tasks:
+            row = dict(task)
+            row["created_at"] = row.get("created_at") or now
+            # Every row needs the same keys for a single multi-row INSERT
+            row["completed_at"] = row.get("completed_at") or (now if row.get("status") == "Completed" else None)
+            rows.append(row)
+        return self.db.execute(insert(Task).returning(*Task.__table__.columns), rows).all()
+
+    def _set_status(self, ids: Sequence[int], status: str) -> Tuple[Dict[int, str], List[Tuple]]:
+        ids = list(dict.fromkeys(int(task_id) for task_id in ids))
+        if not ids:
+            return {}, []
+        # Lock the rows so the previous statuses the rollup is based on can't change underneath us
+        previous = dict(self.db.execute(
+            select(Task.id, Task.status).where(id_in(Task.id, ids, self.dialect)).with_for_update()
+        ).all())
+
+        completed_at = func.coalesce(Task.completed_at, datetime.utcnow()) if status == "Completed" else None
+        changed = self.db.execute(
+            update(Task)
+            .where(id_in(Task.id, ids, self.dialect), or_(Task.status != status, Task.status.is_(None)))
+            .values(status=status, completed_at=completed_at)
+            .returning(*_CHANGE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        changed_ids = {row.id for row in changed}
+        results = {
+            task_id: "updated" if task_id in changed_ids else "unchanged" if task_id in previous else "not_found"
+            for task_id in ids
+        }
+        return results, [(row, previous[row.id]) for row in changed]
+
+    def apply(self, create: Sequence[Dict] = (), updates: Iterable[Tuple[Sequence[int], str]] = ()) -> Dict:
+        """Create tasks and apply (ids, status) updates as one transaction.
+
+        Returns the created tasks and a per-id result ("updated", "unchanged" or
+        "not_found"); an id listed in several updates reports its last one.
+        """
+        try:
+            created = self._create(create)
+            results: Dict[int, str] = {}
+            changes = []
+            for ids, status in updates:
+                if status not in TASK_STATUSES:
+                    raise ValueError(f"Unknown task status {status!r}; expected one of {TASK_STATUSES}")
+                update_results, update_changes = self._set_status(ids, status)
+                results.update(update_results)
+                changes.extend(update_changes)
+
+            # One rollup pass for the whole batch instead of one per task
+            rollups = self.metrics.record_task_changes(changes, created=created)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return {
+            "created": [dict(row._mapping) for row in created],
+            "results": results,
+            "rollups_updated": rollups,
+        }
+
+    def complete(self, ids: Sequence[int]) -> Dict[int, str]:
+        return self.apply(updates=[(ids, "Completed")])["results"]
+
+    def create(self, task: Dict):
+        return self.apply(create=[task])["created"][0]
+
+    def edit(self, task_id: int, values: Dict) -> Optional[Dict]:
+        """Change any task fields with one UPDATE ... RETURNING; None if there is no such task.
+
+        The rollup takes back the task's old contribution and adds the new one,
+        since a new title or task_type can change it as much as a new status.
+        """
+        values = dict(values)
+        if "status" in values:
+            values["completed_at"] = (
+                func.coalesce(Task.completed_at, datetime.utcnow()) if values["status"] == "Completed" else None
+            )
+        try:
+            before = self.db.execute(
+                select(*_CHANGE_COLUMNS).where(Task.id == task_id).with_for_update()
+            ).first()
+            if before is None:
+                self.db.rollback()
+                return None
+            if values:
+                after = self.db.execute(
+                    update(Task).where(Task.id == task_id).values(**values)
+                    .returning(*Task.__table__.columns)
+                    .execution_options(synchronize_session=False)
+                ).one()
+                self.metrics.record_task_changes(created=[after], removed=[before])
+            else:
+                after = self.db.execute(select(*Task.__table__.columns).where(Task.id == task_id)).one()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return dict(after._mapping)
+
+    def delete(self, task_id: int) -> bool:
+        try:
+            removed = self.db.execute(
+                delete(Task).where(Task.id == task_id).returning(*_CHANGE_COLUMNS)
+                .execution_options(synchronize_session=False)
+            ).all()
+            self.metrics.record_task_changes(removed=removed)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return bool(removed)
+
+
+def get_task_operations():
+    """FastAPI dependency: TaskOperations on its own sync session for the request"""
+    db = SessionLocal()
+    try:
+        yield TaskOperations(db)
+    finally:
+        db.close()
@@ -0,0 +1,148 @@
+"""
+Template Store for DealTracker Sales Agent
+Loads the ai_templates prompt files once, pre-parses them, and reloads them only when a file changes
+"""
+
+import logging
+import threading
+from pathlib import Path
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_formatter = Formatter()
+
+
+class TemplateError(Exception):
+    """Raised when a template cannot be compiled or rendered"""
+
+
+class CompiledTemplate:
+    """A template split once into literal text and {placeholder:spec} fields.
+
+    Rendering walks the pre-parsed segments instead of re-parsing the text with
+    str.format on every message.
+    """
+
+    __slots__ = ("name", "mtime", "placeholders", "_segments")
+
+    def __init__(self, name: str, text: str, mtime: Optional[int] = None):
+        self.name = name
+        self.mtime = mtime
+        self._segments: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        placeholders = set()
+        try:
+            for literal, field, spec, conversion in _formatter.parse(text):
+                if field is not None:
+                    if not field.isidentifier():
+                        raise TemplateError(f"{name}: unsupported placeholder {{{field}}} - use plain names")
+                    if spec and "{" in spec:
+                        raise TemplateError(f"{name}: nested placeholders in {{{field}:{spec}}} are not supported")
+                    placeholders.add(field)
+                self._segments.append((literal, field, spec or "", conversion))
+        except ValueError as e:
+            raise TemplateError(f"{name}: {e}") from e
+        self.placeholders = frozenset(placeholders)
+
+    def render(self, **values) -> str:
+        missing = self.placeholders.difference(values)
+        if missing:
+            raise TemplateError(f"{self.name}: missing values for {sorted(missing)}")
+
+        parts = []
+        for literal, field, spec, conversion in self._segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            parts.append(format(value, spec))
+        return "".join(parts)
+
+
+class TemplateStore:
+    """Compiled templates from one directory, checked against the values their senders provide.
+
+    `fields` maps each template file to the placeholder names its callers pass.
+    A template that uses any other placeholder is rejected when it is loaded,
+    so a typo in a prompt file shows up at startup (or when the file is edited)
+    rather than as a KeyError halfway through a scheduled run. A rejected edit
+    keeps serving the last good version of the file.
+    """
+
+    def __init__(self, base_path: Path, fields: Dict[str, Iterable[str]]):
+        self.base_path = Path(base_path)
+        self.fields = {name: frozenset(names) for name, names in fields.items()}
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def _compile(self, name: str, text: str, mtime: Optional[int]) -> CompiledTemplate:
+        template = CompiledTemplate(name, text, mtime)
+        allowed = self.fields.get(name)
+        if allowed is not None:
+            unknown = template.placeholders - allowed
+            if unknown:
+                raise TemplateError(f"{name}: placeholders {sorted(unknown)} are not provided by the sender")
+        return template
+
+    def _fallback(self, name: str) -> CompiledTemplate:
+        # Same message the agent has always used when a template file is missing
+        label = name.replace('_', ' ').replace('.txt', '')
+        return CompiledTemplate(
+            name, f"Hi {{name}}! This is a {label} message from DealTracker. Please check back later for more details."
+        )
+
+    def _load(self, name: str) -> CompiledTemplate:
+        path = self.base_path / name
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            cached = self._templates.get(name)
+            if cached is None or cached.mtime is not None:
+                cached = self._templates[name] = self._fallback(name)
+            return cached
+
+        cached = self._templates.get(name)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+
+        with self._lock:
+            cached = self._templates.get(name)
+            if cached is not None and cached.mtime == mtime:
+                return cached
+            try:
+                template = self._compile(name, path.read_text(), mtime)
+            except TemplateError as e:
+                logger.error(f"Rejected template {path}: {e}")
+                if cached is None:
+                    cached = self._fallback(name)
+                # Remember the rejected mtime so the file is not re-read until it changes again
+                cached.mtime = mtime
+                self._templates[name] = cached
+                raise
+            self._templates[name] = template
+            logger.info(f"Loaded template {path}")
+            return template
+
+    def get(self, name: str) -> CompiledTemplate:
+        """Compiled template, re-read only if the file's mtime changed since it was loaded"""
+        try:
+            return self._load(name)
+        except TemplateError:
+            return self._templates[name]
+
+    def preload(self) -> Dict[str, str]:
+        """Compile every registered template now. Returns {template: error} for rejected ones."""
+        errors = {}
+        for name in self.fields:
+            try:
+                self._load(name)
+            except TemplateError as e:
+                errors[name] = str(e)
+        return errors
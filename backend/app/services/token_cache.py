@@ -0,0 +1,168 @@
+"""
+Token Cache for DealTracker Sales Agent
+Remembers which user a verified JWT belongs to, so authenticated requests skip the decode and the user query
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set
+
+from pydantic import BaseModel, ConfigDict
+
+# How long a verified token maps to a cached user before the user is re-read from the database;
+# bounds how stale a logout or a change made without touching users.auth_changed_at (a script) can be
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+# How often each worker reads users.auth_changed_at for profiles changed on other workers
+AUTH_SYNC_SECONDS = float(os.getenv("AUTH_SYNC_SECONDS", "1"))
+# Overlap between successive reads, so a change committed with a slightly skewed clock is not missed
+AUTH_SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class Principal(BaseModel):
+    """The authenticated user as endpoints see it"""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    name: str
+    email: str
+    role: Optional[str] = None
+    slack_user_id: Optional[str] = None
+
+
+class _Entry:
+    __slots__ = ("signed_part", "principal", "expires_at", "token_exp")
+
+    def __init__(self, signed_part: str, principal: Principal, expires_at: float, token_exp: float):
+        self.signed_part = signed_part
+        self.principal = principal
+        self.expires_at = expires_at
+        self.token_exp = token_exp
+
+
+def split_token(token: str):
+    """(header.payload, signature) of a compact JWT"""
+    signed_part, _, signature = token.rpartition(".")
+    return signed_part, signature
+
+
+def token_fingerprint(token: str) -> str:
+    """sha256 of the token's signature, the key a revocation is stored under in revoked_tokens"""
+    return hashlib.sha256(split_token(token)[1].encode()).hexdigest()
+
+
+class TokenCache:
+    """TTL + LRU map from token signature to Principal, with logout revocation.
+
+    A hit requires the whole token to match the one that was verified, not just
+    the signature. Entries never outlive the token's own exp. Revoked
+    signatures are kept until their token would have expired anyway.
+
+    Revocations here only cover this process; the revoked_tokens table is the
+    shared record every worker checks on a miss, so another worker's logout
+    reaches a cached token within the TTL. Profile changes (role, email) made
+    on another worker are picked up sooner: at most every sync_interval the
+    caller reads the users changed since the last read (see sync_due) and
+    evicts them with apply_changes.
+    """
+
+    def __init__(self, ttl_seconds: float = AUTH_CACHE_TTL_SECONDS, max_size: int = AUTH_CACHE_SIZE,
+                 sync_interval: float = AUTH_SYNC_SECONDS):
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        self.sync_interval = sync_interval
+        self._last_sync: Optional[float] = None
+        self._synced_until = datetime.utcnow() - AUTH_SYNC_OVERLAP
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0}
+
+    def _drop(self, signature: str):
+        entry = self._entries.pop(signature, None)
+        if entry is not None:
+            signatures = self._by_user.get(entry.principal.id)
+            if signatures is not None:
+                signatures.discard(signature)
+                if not signatures:
+                    del self._by_user[entry.principal.id]
+
+    def get(self, token: str) -> Optional[Principal]:
+        signed_part, signature = split_token(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None or entry.signed_part != signed_part:
+                self._counts["misses"] += 1
+                return None
+            if now >= entry.expires_at or now >= entry.token_exp:
+                self._drop(signature)
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(signature)
+            self._counts["hits"] += 1
+            return entry.principal
+
+    def put(self, token: str, principal: Principal, token_exp: float):
+        signed_part, signature = split_token(token)
+        with self._lock:
+            self._drop(signature)
+            self._entries[signature] = _Entry(signed_part, principal, time.time() + self.ttl, token_exp)
+            self._by_user.setdefault(principal.id, set()).add(signature)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        """Forget every cached token of a user, e.g. after their role changed"""
+        with self._lock:
+            for signature in list(self._by_user.get(user_id, ())):
+                self._drop(signature)
+
+    def sync_due(self) -> Optional[datetime]:
+        """The time to read profile changes from, if a read is due now; None otherwise.
+
+        Claims the read, so concurrent requests in this process do not all repeat it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._last_sync is not None and now < self._last_sync + self.sync_interval:
+                return None
+            self._last_sync = now
+            return self._synced_until
+
+    def apply_changes(self, user_ids: Iterable[int], read_at: datetime):
+        """Evict users whose profile changed; read_at is when the changes were read"""
+        with self._lock:
+            for user_id in user_ids:
+                for signature in list(self._by_user.get(user_id, ())):
+                    self._drop(signature)
+            self._synced_until = max(self._synced_until, read_at - AUTH_SYNC_OVERLAP)
+
+    def revoke(self, token: str, token_exp: float):
+        """Reject this token from now on in this process (see auth.logout for the shared record)"""
+        _, signature = split_token(token)
+        now = time.time()
+        with self._lock:
+            self._drop(signature)
+            self._revoked[signature] = token_exp
+            # Expired tokens fail verification on their own; stop tracking them
+            for expired in [sig for sig, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[expired]
+
+    def is_revoked(self, token: str) -> bool:
+        _, signature = split_token(token)
+        with self._lock:
+            return signature in self._revoked
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counts, "cached_tokens": len(self._entries), "revoked_tokens": len(self._revoked)}
+
+
+# Process-wide cache shared by every request
+token_cache = TokenCache()
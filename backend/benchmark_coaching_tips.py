@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark team coaching tip selection
+
+Generates random weekly progress for N reps and times selecting tips for the
+whole team with CoachingTipBook (one NumPy pass over the per-rep percentage
+arrays) against calling SalesAgentService.generate_coaching_tips once per rep.
+Also checks that a rep doesn't see the same tip twice in a row across weeks.
+
+Usage: python benchmark_coaching_tips.py [--reps 1000] [--rounds 20]
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.sales_agent import SalesAgentService, coaching_tip_book
+
+
+def random_progress(reps: int, rng: np.random.Generator):
+    progress = []
+    for _ in range(reps):
+        row = {}
+        for category, high in (("calls", 40), ("demos", 6), ("proposals", 4)):
+            target = int(rng.integers(0, high))
+            completed = int(rng.integers(0, target + 2))
+            row[f"{category}_target"] = target
+            row[f"{category}_completed"] = completed
+            row[f"{category}_percentage"] = completed / target * 100 if target else 0
+        total = row["calls_target"] + row["demos_target"] + row["proposals_target"]
+        done = row["calls_completed"] + row["demos_completed"] + row["proposals_completed"]
+        row["overall_percentage"] = done / total * 100 if total else 0
+        progress.append(row)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reps", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    progress = random_progress(args.reps, rng)
+    user_ids = list(range(1, args.reps + 1))
+    week_start = date.today() - timedelta(days=date.today().weekday())
+    agent = SalesAgentService(db=None)
+    coaching_tip_book.sections  # parse the tips file outside the timed loop
+
+    print(f"🏁 Coaching tip selection - {args.reps} reps, {args.rounds} rounds")
+    print("=" * 60)
+
+    per_rep = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for user_id, row in zip(user_ids, progress):
+            agent.generate_coaching_tips(row, user_id, week_start)
+        per_rep.append(time.perf_counter() - start)
+
+    team = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        coaching_tip_book.select_for_progress(progress, user_ids, week_start)
+        team.append(time.perf_counter() - start)
+
+    per_rep_ms, team_ms = np.median(per_rep) * 1000, np.median(team) * 1000
+    print(f"  {'one call per rep':<28}{per_rep_ms:9.2f} ms")
+    print(f"  {'one team pass':<28}{team_ms:9.2f} ms   ({per_rep_ms / team_ms:.1f}x)")
+
+    this_week = coaching_tip_book.select_for_progress(progress, user_ids, week_start)
+    next_week = coaching_tip_book.select_for_progress(progress, user_ids, week_start + timedelta(days=7))
+    repeats = sum(len(set(a) & set(b)) for a, b in zip(this_week, next_week))
+    print(f"  tips repeated week over week: {repeats}")
+
+
+if __name__ == "__main__":
+    main()
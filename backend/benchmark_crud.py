@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CRUD layer: INSERT ... RETURNING against add/commit/refresh
+
+Creates N users the old app/crud.py way (session.add, commit, refresh - two
+statements plus the transaction) and through crud.create (one INSERT ...
+RETURNING), counting SQL statements per create. Then drives the mounted
+/users and /tasks routers in-process over ASGI and reports median latency per
+request.
+
+Defaults to a throwaway SQLite file; pass --database-url (async driver) to
+run against Postgres, where the saved round-trip matters more. The database
+is used as app.database's DATABASE_URL and all tables in it are dropped.
+
+Usage: python benchmark_crud.py [--requests 500] [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+async def legacy_create(db: AsyncSession, values: dict):
+    from app.models import User
+    user = User(**values)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def time_creates(session_factory, counter, create, n: int, prefix: str):
+    timings = []
+    counter.count = 0
+    async with session_factory() as db:
+        for i in range(n):
+            begin = time.perf_counter()
+            await create(db, {"name": f"{prefix} {i}", "email": f"{prefix}{i}@example.com", "role": "sales"})
+            timings.append(time.perf_counter() - begin)
+    return float(np.median(timings)) * 1000, counter.count / n
+
+
+async def time_requests(client, method: str, url, n: int, payload=None):
+    timings = []
+    for i in range(n):
+        begin = time.perf_counter()
+        response = await client.request(method, url(i) if callable(url) else url,
+                                        json=payload(i) if callable(payload) else payload)
+        timings.append(time.perf_counter() - begin)
+        response.raise_for_status()
+    return float(np.median(timings)) * 1000
+
+
+async def run(args):
+    # Imported here so app.database picks up the benchmark's DATABASE_URL
+    from app import crud
+    from app.api import users, projects, tasks
+    from app.database import AsyncSessionLocal, engine, sync_engine
+    from app.models import Base, User
+    engine.echo = sync_engine.echo = False
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    counter = StatementCounter(engine)
+
+    print(f"🏁 Creating {args.requests} users, median per create")
+    print("=" * 60)
+    legacy_ms, legacy_statements = await time_creates(AsyncSessionLocal, counter, legacy_create, args.requests, "legacy")
+    returning_ms, returning_statements = await time_creates(
+        AsyncSessionLocal, counter, lambda db, values: crud.create(db, User, values), args.requests, "returning"
+    )
+    print(f"  {'add/commit/refresh':<24}{legacy_ms:8.3f} ms  {legacy_statements:.1f} statements")
+    print(f"  {'INSERT ... RETURNING':<24}{returning_ms:8.3f} ms  {returning_statements:.1f} statements")
+
+    app = FastAPI()
+    app.include_router(users.router, prefix="/users")
+    app.include_router(projects.router, prefix="/projects")
+    app.include_router(tasks.router, prefix="/tasks")
+
+    print(f"🏁 API requests over ASGI, {args.requests} each, median per request")
+    print("=" * 60)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        project = (await client.post("/projects/", json={"name": "Bench", "owner_id": 1})).json()
+        results = {
+            "POST /users": await time_requests(
+                client, "POST", "/users/", args.requests,
+                lambda i: {"name": f"Api {i}", "email": f"api{i}@example.com"}),
+            "GET /users/{id}": await time_requests(client, "GET", lambda i: f"/users/{i % args.requests + 1}", args.requests),
+            "GET /users (page of 50)": await time_requests(client, "GET", "/users/?limit=50", args.requests),
+            "POST /tasks": await time_requests(
+                client, "POST", "/tasks/", args.requests,
+                lambda i: {"title": f"Call {i}", "task_type": "calls", "owner_id": 1, "project_id": project["id"]}),
+            "GET /projects/{id}": await time_requests(client, "GET", f"/projects/{project['id']}", args.requests),
+        }
+    for label, ms in results.items():
+        print(f"  {label:<24}{ms:8.3f} ms")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'crud.db')}"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
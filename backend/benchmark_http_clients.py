@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark shared keep-alive HTTP clients against a fresh client per request
+
+Sends the same request N times to Slack and OpenAI, once opening a new client
+for every call (the old behaviour) and once through the pooled session the
+services now share, and reports p50/p95 latency and new TCP/TLS connections.
+
+Usage: python benchmark_http_clients.py [--requests 30] [--slack-url URL] [--openai-url URL]
+"""
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+import httpx
+import numpy as np
+
+from app.services.slack_service import create_http_session
+from app.services.ai_service import create_http_client
+
+
+def summarize(label: str, latencies: list, connections: int):
+    p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+    print(f"  {label:<28} p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   new connections {connections}")
+
+
+def connection_counter():
+    counter = {"connections": 0}
+    trace = aiohttp.TraceConfig()
+
+    async def on_connection_create_end(session, context, params):
+        counter["connections"] += 1
+
+    trace.on_connection_create_end.append(on_connection_create_end)
+    return counter, trace
+
+
+async def bench_slack(url: str, requests: int):
+    print(f"📡 Slack ({url})")
+
+    counter, trace = connection_counter()
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with aiohttp.ClientSession(trace_configs=[trace]) as session:
+            async with session.post(url) as response:
+                await response.read()
+        latencies.append(time.perf_counter() - start)
+    summarize("new session per request", latencies, counter["connections"])
+
+    counter, trace = connection_counter()
+    session = await create_http_session(trace_configs=[trace])
+    latencies = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            async with session.post(url) as response:
+                await response.read()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await session.close()
+    summarize("shared keep-alive session", latencies, counter["connections"])
+
+
+async def bench_openai(url: str, requests: int):
+    print(f"🤖 OpenAI ({url})")
+
+    counter = {"connections": 0}
+
+    async def trace(event_name, info):
+        # httpcore reports every newly opened TCP connection through the trace extension
+        if event_name == "connection.connect_tcp.complete":
+            counter["connections"] += 1
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            await client.get(url, extensions={"trace": trace})
+        latencies.append(time.perf_counter() - start)
+    summarize("new client per request", latencies, counter["connections"])
+
+    counter["connections"] = 0
+    client = create_http_client()
+    latencies = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            await client.get(url, extensions={"trace": trace})
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.aclose()
+    summarize("shared keep-alive client", latencies, counter["connections"])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--slack-url", default="https://slack.com/api/api.test")
+    parser.add_argument("--openai-url", default="https://api.openai.com/v1/models")
+    args = parser.parse_args()
+
+    print(f"🏁 HTTP client reuse benchmark - {args.requests} sequential requests each")
+    print("=" * 70)
+    await bench_slack(args.slack_url, args.requests)
+    await bench_openai(args.openai_url, args.requests)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
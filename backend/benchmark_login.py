@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark a login burst: bcrypt on the thread pool vs in the event loop
+
+Registers N users, then fires B concurrent POST /auth/token requests at the
+auth router in-process over ASGI while a heartbeat task asks to wake every
+10 ms. Reports logins per second, login latency, and how late the heartbeat
+woke up - the delay every other request on the same event loop would see.
+
+Runs once with PasswordHasher as shipped (bcrypt on its thread pool) and once
+with bcrypt called inline on the event loop, the naive implementation.
+
+Usage: python benchmark_login.py [--burst 40] [--rounds 10] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+HEARTBEAT_SECONDS = 0.01
+
+
+class InlineHasher:
+    """bcrypt straight on the event loop thread"""
+
+    def __init__(self, hasher):
+        self.hasher = hasher
+
+    async def hash(self, password):
+        return self.hasher.hash_sync(password)
+
+    async def verify(self, password, hashed):
+        return self.hasher.verify_sync(password, hashed)
+
+    def needs_rehash(self, hashed):
+        return self.hasher.needs_rehash(hashed)
+
+
+async def heartbeat(lags, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(time.perf_counter() - start - HEARTBEAT_SECONDS)
+
+
+async def burst(client, users: int, size: int):
+    async def login(i):
+        start = time.perf_counter()
+        response = await client.post("/auth/token", data={"username": f"rep{i % users}@example.com",
+                                                          "password": f"password-{i % users}"})
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(login(i) for i in range(size)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    return elapsed, latencies, lags
+
+
+async def run(args):
+    # Imported here so app.database and the hasher pick up the benchmark's settings
+    from app.api import auth
+    from app.database import engine, sync_engine
+    from app.models import Base
+    from app.services.passwords import PasswordHasher
+    engine.echo = sync_engine.echo = False
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    pooled = PasswordHasher(rounds=args.rounds, workers=args.workers, max_pending=args.burst)
+    auth.password_hasher = pooled
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        for i in range(args.users):
+            response = await client.post("/auth/register", json={
+                "username": f"Rep {i}", "email": f"rep{i}@example.com", "password": f"password-{i}"})
+            response.raise_for_status()
+
+        print(f"🏁 Login burst - {args.burst} concurrent logins, bcrypt cost {args.rounds}, "
+              f"{args.workers} hash threads, {os.cpu_count()} CPUs")
+        print("=" * 78)
+        print(f"  {'':<22}{'logins/s':>10}{'p50 login':>12}{'p99 login':>12}{'p50 lag':>10}{'max lag':>10}")
+        for label, hasher in (("inline on event loop", InlineHasher(pooled)), ("thread pool", pooled)):
+            auth.password_hasher = hasher
+            elapsed, latencies, lags = await burst(client, args.users, args.burst)
+            lags = lags or [0.0]
+            print(f"  {label:<22}{args.burst / elapsed:10.1f}"
+                  f"{np.percentile(latencies, 50) * 1000:10.0f}ms{np.percentile(latencies, 99) * 1000:10.0f}ms"
+                  f"{np.percentile(lags, 50) * 1000:8.1f}ms{max(lags) * 1000:8.1f}ms")
+    pooled.close()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'login.db')}"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
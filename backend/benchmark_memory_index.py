@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark MemoryStore index types: exact flat vs IVF-PQ vs HNSW
+
+Builds each index from app.memory.build_index over synthetic clustered
+embeddings (the default 1536 dims of text-embedding-ada-002) and reports build
+time, serialized index size, queries per second and recall@k against exact
+search, sweeping nprobe for IVF-PQ and efSearch for HNSW.
+
+1M x 1536 float32 vectors take ~6 GB for the raw data plus the flat ground
+truth index, so run the large sizes on a machine with the memory for it.
+
+Usage: python benchmark_memory_index.py [--sizes 100000,1000000] [--dim 1536] [--queries 1000] [--k 10]
+                                        [--nprobe 1,4,16,64] [--ef-search 16,64,256]
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from app.memory import build_index, ivf_nlist_for, EMBEDDING_DIM, MEMORY_PQ_M, MEMORY_HNSW_M
+
+
+def clustered_vectors(n: int, dim: int, rng: np.random.Generator, centers: int = 256) -> np.ndarray:
+    """Embedding-like data: points scattered around a few hundred topic centroids"""
+    centroids = rng.standard_normal((centers, dim), dtype=np.float32)
+    vectors = centroids[rng.integers(0, centers, n)]
+    vectors += 0.5 * rng.standard_normal((n, dim), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def index_size_mb(index: faiss.Index) -> float:
+    return len(faiss.serialize_index(index)) / 1e6
+
+
+def timed_search(index: faiss.Index, queries: np.ndarray, k: int, params=None):
+    start = time.perf_counter()
+    if params is None:
+        _, ids = index.search(queries, k)
+    else:
+        _, ids = index.search(queries, k, params=params)
+    return ids, len(queries) / (time.perf_counter() - start)
+
+
+def recall(ids: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(np.intersect1d(row, true_row)) / k for row, true_row in zip(ids, truth)]))
+
+
+def report(label: str, build_seconds: float, size_mb: float, qps: float, hit_rate: float):
+    print(f"  {label:<26}{build_seconds:9.1f}s{size_mb:11.1f} MB{qps:11.0f}{hit_rate:10.3f}")
+
+
+def bench_size(n: int, args, rng: np.random.Generator):
+    data = clustered_vectors(n, args.dim, rng)
+    queries = clustered_vectors(args.queries, args.dim, rng)
+    ids = np.arange(n, dtype=np.int64)
+
+    print(f"\n📦 {n:,} vectors x {args.dim} dims, {args.queries} queries, recall@{args.k}")
+    print(f"  {'index':<26}{'build':>10}{'size':>14}{'QPS':>11}{'recall':>10}")
+
+    start = time.perf_counter()
+    flat = build_index(args.dim, "flat")
+    flat.add_with_ids(data, ids)
+    flat_build = time.perf_counter() - start
+    truth, qps = timed_search(flat, queries, args.k)
+    report("flat (exact)", flat_build, index_size_mb(flat), qps, 1.0)
+    del flat
+
+    nlist = ivf_nlist_for(n)
+    start = time.perf_counter()
+    ivfpq = build_index(args.dim, "ivfpq", n_vectors=n, pq_m=args.pq_m)
+    # Train on a sample like a production rebuild would; faiss wants ~39-256 points per cell
+    sample = data[rng.choice(n, min(n, nlist * 64), replace=False)]
+    ivfpq.train(sample)
+    ivfpq.add_with_ids(data, ids)
+    ivfpq_build = time.perf_counter() - start
+    size = index_size_mb(ivfpq)
+    for nprobe in args.nprobe:
+        found, qps = timed_search(ivfpq, queries, args.k, faiss.SearchParametersIVF(nprobe=nprobe))
+        report(f"IVF{nlist},PQ{args.pq_m} np={nprobe}", ivfpq_build, size, qps, recall(found, truth))
+    del ivfpq
+
+    start = time.perf_counter()
+    hnsw = build_index(args.dim, "hnsw", hnsw_m=args.hnsw_m)
+    hnsw.add_with_ids(data, ids)
+    hnsw_build = time.perf_counter() - start
+    size = index_size_mb(hnsw)
+    for ef_search in args.ef_search:
+        found, qps = timed_search(hnsw, queries, args.k, faiss.SearchParametersHNSW(efSearch=ef_search))
+        report(f"HNSW{args.hnsw_m} ef={ef_search}", hnsw_build, size, qps, recall(found, truth))
+
+
+def int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int_list, default=[100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int_list, default=[1, 4, 16, 64])
+    parser.add_argument("--ef-search", type=int_list, default=[16, 64, 256])
+    parser.add_argument("--pq-m", type=int, default=MEMORY_PQ_M)
+    parser.add_argument("--hnsw-m", type=int, default=MEMORY_HNSW_M)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"🏁 MemoryStore index benchmark - FAISS {faiss.__version__}, {faiss.omp_get_max_threads()} threads")
+    print("=" * 72)
+    rng = np.random.default_rng(args.seed)
+    for n in args.sizes:
+        bench_size(n, args, rng)
+
+
+if __name__ == "__main__":
+    main()
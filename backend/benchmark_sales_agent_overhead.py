@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request SalesAgentService overhead on the read-only sales endpoints
+
+Runs the bodies of /sales/goals/{id}/current, /sales/coaching/{id}/tips,
+/sales/progress/team and /sales/leaderboard/current against a seeded in-memory
+SQLite database, once the old way (a SalesAgentService that eagerly builds its
+own SlackService, AIService/OpenAI client and metrics service, and looks up the
+sales project on every progress call) and once through the lazy, request-scoped
+service the endpoints now get from get_sales_agent.
+
+Usage: python benchmark_sales_agent_overhead.py [--requests 200] [--reps 20]
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Dummy credentials so the eager path really constructs both API clients (nothing is sent)
+os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from app.models import Base, User, Project, Task
+from app.services.sales_agent import SalesAgentService
+from app.services.sales_metrics import SalesMetricsService
+from app.services.slack_service import SlackService
+from app.services.ai_service import AIService
+
+
+def seed(session_factory, reps: int):
+    db = session_factory()
+    owner = User(name="System", email="system@example.com", role="admin")
+    db.add(owner)
+    db.flush()
+    project = Project(name="PSV Sales Agent Team", owner_id=owner.id)
+    db.add(project)
+    db.flush()
+    now = datetime.now()
+    for i in range(reps):
+        user = User(name=f"Rep {i}", email=f"rep{i}@example.com", role="sales")
+        db.add(user)
+        db.flush()
+        db.add_all([
+            Task(title="☎️ Make 4 discovery calls", task_type="calls", status="Completed" if i % 2 else "Not Started",
+                 owner_id=user.id, project_id=project.id, created_at=now),
+            Task(title="🎬 Demo 1", task_type="demos", owner_id=user.id, project_id=project.id, created_at=now),
+            Task(title="📋 Proposal 1", task_type="proposals", owner_id=user.id, project_id=project.id, created_at=now),
+        ])
+    db.commit()
+    user_id = db.query(User.id).filter(User.role == "sales").first()[0]
+    db.close()
+    return user_id
+
+
+def eager_service(db) -> SalesAgentService:
+    """What each request used to build: fresh clients, metrics service and uncached project lookups"""
+    service = SalesAgentService(db, slack_service=SlackService(), ai_service=AIService())
+    service.ai_service.client
+    service.metrics
+    lookup = service.get_or_create_sales_project
+
+    def uncached_lookup():
+        service._sales_project = None
+        return lookup()
+
+    service.get_or_create_sales_project = uncached_lookup
+    return service
+
+
+def lazy_service(db) -> SalesAgentService:
+    return SalesAgentService(db)
+
+
+def endpoints(user_id: int):
+    def goals_current(service):
+        service.db.get(User, user_id)
+        service.get_weekly_progress(user_id, service.get_current_week_start())
+
+    def coaching_tips(service):
+        progress = service.get_weekly_progress(user_id, service.get_current_week_start())
+        service.generate_coaching_tips(progress)
+
+    def team_progress(service):
+        week_start = service.get_current_week_start()
+        for user in service.db.query(User).filter(User.role == "sales").all():
+            service.get_weekly_progress(user.id, week_start)
+
+    def leaderboard(service):
+        service.get_team_leaderboard(service.get_current_week_start())
+
+    return {
+        "GET /goals/{id}/current": goals_current,
+        "GET /coaching/{id}/tips": coaching_tips,
+        "GET /progress/team": team_progress,
+        "GET /leaderboard/current": leaderboard,
+    }
+
+
+def measure(session_factory, build_service, endpoint, requests: int) -> np.ndarray:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        db = session_factory()
+        try:
+            endpoint(build_service(db))
+        finally:
+            db.close()
+        latencies.append(time.perf_counter() - start)
+    return np.asarray(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--reps", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    user_id = seed(session_factory, args.reps)
+
+    print(f"🏁 SalesAgentService per-request overhead - {args.requests} requests, {args.reps} reps")
+    print("=" * 86)
+    print(f"  {'endpoint':<28}{'eager p50':>12}{'eager p95':>12}{'lazy p50':>12}{'lazy p95':>12}{'speedup':>10}")
+    for name, endpoint in endpoints(user_id).items():
+        # Warm up imports and SQLAlchemy statement caches before timing
+        measure(session_factory, eager_service, endpoint, 5)
+        measure(session_factory, lazy_service, endpoint, 5)
+        eager = measure(session_factory, eager_service, endpoint, args.requests)
+        lazy = measure(session_factory, lazy_service, endpoint, args.requests)
+        eager_p50, eager_p95 = np.percentile(eager, [50, 95])
+        lazy_p50, lazy_p95 = np.percentile(lazy, [50, 95])
+        print(f"  {name:<28}{eager_p50:10.2f}ms{eager_p95:10.2f}ms{lazy_p50:10.2f}ms{lazy_p95:10.2f}ms"
+              f"{eager_p50 / lazy_p50:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
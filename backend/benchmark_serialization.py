@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of the /sales/progress/team payload
+
+Builds the team progress response for N reps and times turning it into
+response bytes the way each version of the endpoint does:
+
+  models + response_model + json   WeeklyProgressResponse per rep, FastAPI
+                                   validates and serializes the list against
+                                   response_model, stdlib JSONResponse encodes
+  models + response_model + orjson the same with ORJSONResponse as the
+                                   app's default_response_class
+  TypeAdapter.dump_json            models serialized once by pydantic-core
+  dict rows + orjson               progress_row dicts returned through
+                                   json_response (what the endpoint does now)
+
+Usage: python benchmark_serialization.py [--reps 1000] [--rounds 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date
+from typing import List
+
+import numpy as np
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app.api.sales import WeeklyProgressResponse, progress_row
+from app.responses import adapter_response, json_response
+
+
+def random_progress(reps: int, rng: np.random.Generator):
+    progress = []
+    for _ in range(reps):
+        row = {}
+        for category, high in (("calls", 40), ("demos", 6), ("proposals", 4)):
+            target = int(rng.integers(0, high))
+            completed = int(rng.integers(0, target + 1))
+            row[f"{category}_target"] = target
+            row[f"{category}_completed"] = completed
+            row[f"{category}_percentage"] = completed / target * 100 if target else 0
+        row["overall_percentage"] = float(rng.uniform(0, 120))
+        progress.append(row)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reps", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=1000)
+    args = parser.parse_args()
+
+    progress = random_progress(args.reps, np.random.default_rng(0))
+    week_start = date(2024, 1, 1)
+    field = create_response_field(name="Response", type_=List[WeeklyProgressResponse])
+    adapter = TypeAdapter(List[WeeklyProgressResponse])
+    loop = asyncio.new_event_loop()
+
+    def as_models():
+        models = [
+            WeeklyProgressResponse(user_id=i, user_name=f"Rep {i}", week_start=week_start, **row)
+            for i, row in enumerate(progress, 1)
+        ]
+        models.sort(key=lambda model: model.overall_percentage, reverse=True)
+        for rank, model in enumerate(models, 1):
+            model.rank = rank
+        return models
+
+    def as_rows():
+        rows = [progress_row(i, f"Rep {i}", week_start, row) for i, row in enumerate(progress, 1)]
+        rows.sort(key=lambda row: row["overall_percentage"], reverse=True)
+        for rank, row in enumerate(rows, 1):
+            row["rank"] = rank
+        return rows
+
+    def through_response_model(response_class):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=as_models()))
+        return response_class(content).body
+
+    paths = {
+        "models + response_model + json": lambda: through_response_model(JSONResponse),
+        "models + response_model + orjson": lambda: through_response_model(ORJSONResponse),
+        "TypeAdapter.dump_json": lambda: adapter_response(adapter, as_models()).body,
+        "dict rows + orjson": lambda: json_response(as_rows()).body,
+    }
+
+    # Every path must produce the same document
+    reference = json.loads(paths["models + response_model + json"]())
+    for label, build in paths.items():
+        assert json.loads(build()) == reference, label
+
+    print(f"🏁 Team progress serialization - {args.reps} reps, {args.rounds} rounds, {len(build())/1024:.0f} KiB")
+    print("=" * 70)
+    baseline = None
+    for label, build in paths.items():
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            build()
+            timings.append(time.perf_counter() - start)
+        ms = float(np.median(timings)) * 1000
+        baseline = baseline or ms
+        print(f"  {label:<36}{ms:8.3f} ms   ({baseline / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyset vs OFFSET pagination of the task listing
+
+Seeds a database with N tasks spread over reps, projects and weeks, then
+fetches pages at increasing depth with the /tasks listing query: once seeking
+past a (created_at, id) cursor, once with OFFSET. Reports median latency per
+page, unfiltered and filtered by owner.
+
+Defaults to a throwaway SQLite file; pass --database-url to run against Postgres
+(the tasks table there is dropped and re-seeded).
+
+Usage: python benchmark_task_listing.py [--tasks 1000000] [--limit 50] [--database-url URL]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, select
+
+from app.models import Base, User, Project, Task
+from app.api.tasks import task_page_query, DEFAULT_TASK_FIELDS
+
+STATUSES = ("Not Started", "In Progress", "Completed")
+TASK_TYPES = ("calls", "demos", "proposals", "general")
+
+
+def seed(engine, tasks: int, reps: int, chunk: int = 50_000):
+    Base.metadata.drop_all(engine, tables=[Task.__table__])
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        if not conn.execute(select(User.id).limit(1)).first():
+            conn.execute(User.__table__.insert(), [
+                {"id": i, "name": f"Rep {i}", "email": f"rep{i}@example.com", "role": "sales"}
+                for i in range(1, reps + 1)
+            ])
+            conn.execute(Project.__table__.insert(), [
+                {"id": i, "name": f"Project {i}", "owner_id": 1} for i in range(1, 11)
+            ])
+
+    start = datetime(2024, 1, 1)
+    rng = np.random.default_rng(0)
+    for offset in range(0, tasks, chunk):
+        n = min(chunk, tasks - offset)
+        minutes = np.sort(rng.integers(0, 60 * 24 * 365, n)) + offset  # roughly increasing over a year
+        owners = rng.integers(1, reps + 1, n)
+        projects = rng.integers(1, 11, n)
+        statuses = rng.integers(0, len(STATUSES), n)
+        types = rng.integers(0, len(TASK_TYPES), n)
+        rows = [
+            {
+                "title": f"Task {offset + i}",
+                "status": STATUSES[statuses[i]],
+                "task_type": TASK_TYPES[types[i]],
+                "owner_id": int(owners[i]),
+                "project_id": int(projects[i]),
+                "created_at": start + timedelta(minutes=int(minutes[i])),
+            }
+            for i in range(n)
+        ]
+        with engine.begin() as conn:
+            conn.execute(Task.__table__.insert(), rows)
+
+
+def median_ms(engine, stmt, repeats: int) -> float:
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(repeats):
+            begin = time.perf_counter()
+            conn.execute(stmt).all()
+            timings.append(time.perf_counter() - begin)
+    return float(np.median(timings)) * 1000
+
+
+def cursor_at(engine, depth: int, filters: dict):
+    """(created_at, id) of the last row before the page at this depth, as a client would hold it"""
+    if depth == 0:
+        return None
+    stmt = task_page_query(("created_at", "id"), 0, **filters).limit(1).offset(depth - 1)
+    with engine.connect() as conn:
+        row = conn.execute(stmt).first()
+    return (row.created_at, row.id) if row else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--reps", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tasks.db')}"
+    engine = create_engine(url)
+    print(f"🌱 Seeding {args.tasks:,} tasks into {engine.url.render_as_string(hide_password=True)}")
+    begin = time.perf_counter()
+    seed(engine, args.tasks, args.reps)
+    print(f"   done in {time.perf_counter() - begin:.1f}s")
+
+    print(f"🏁 Task listing, {args.limit} per page, median of {args.repeats}")
+    print("=" * 66)
+    for label, filters in (("all tasks", {}), ("owner_id=1", {"owner_id": 1})):
+        print(f"  {label}")
+        print(f"  {'page depth':>14}{'OFFSET':>14}{'keyset':>14}{'speedup':>12}")
+        total = args.tasks if not filters else args.tasks // args.reps
+        depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, 900_000) if d < total]
+        for depth in depths:
+            offset_stmt = task_page_query(DEFAULT_TASK_FIELDS, args.limit, **filters).offset(depth)
+            keyset_stmt = task_page_query(DEFAULT_TASK_FIELDS, args.limit, cursor_at(engine, depth, filters), **filters)
+            offset_ms = median_ms(engine, offset_stmt, args.repeats)
+            keyset_ms = median_ms(engine, keyset_stmt, args.repeats)
+            print(f"  {depth:>14,}{offset_ms:12.2f}ms{keyset_ms:12.2f}ms{offset_ms / keyset_ms:11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Test fixtures for DealTracker Sales Agent
+Every test gets an empty SQLite database (aiosqlite for the API, sqlite for the sync services).
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+
+# app.database builds its engines at import time, so point it at the test database first
+_test_dir = tempfile.mkdtemp(prefix="dealtracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_test_dir}/test.db"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", f"{_test_dir}/embeddings")
+os.environ.setdefault("MEMORY_STORE_PATH", f"{_test_dir}/memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# app.main, app.api.sales and app.api.slack_events import the Slack channel sync service,
+# which is not in this tree; stand in a no-op one so the app can be imported
+if importlib.util.find_spec("app.services.auto_sync_users") is None:
+    _auto_sync_users = types.ModuleType("app.services.auto_sync_users")
+    _auto_sync_users.auto_sync_service = None
+    sys.modules["app.services.auto_sync_users"] = _auto_sync_users
+
+from datetime import timedelta
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.api.auth import create_access_token
+from app.database import AsyncSessionLocal, SessionLocal, engine, sync_engine
+from app.models import Base, User
+from app.services.slack_service import get_slack_service
+from app.services.token_cache import token_cache
+
+# The query_budget fixture
+pytest_plugins = ["app.query_counter"]
+
+
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    # Postgres always enforces them; SQLite only when asked, per connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+event.listen(engine.sync_engine, "connect", _enforce_foreign_keys)
+event.listen(sync_engine, "connect", _enforce_foreign_keys)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.drop_all(sync_engine)
+    Base.metadata.create_all(sync_engine)
+    yield
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+async def client():
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await engine.dispose()
+
+
+@pytest.fixture
+async def async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def make_user(db):
+    """make_user(name="Ann", role="manager") adds a user; the email is derived from the name"""
+    def make(**values) -> User:
+        values.setdefault("name", "Rep")
+        values.setdefault("email", f"{values['name'].lower().replace(' ', '.')}@example.com")
+        values.setdefault("role", "sales")
+        user = User(**values)
+        db.add(user)
+        db.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def auth_headers():
+    """auth_headers(user) is a bearer token header for that user"""
+    def headers(user: User) -> dict:
+        # Ids are reused between tests, so drop whatever an earlier test cached for this one
+        token_cache.invalidate_user(user.id)
+        token = create_access_token({"sub": str(user.id)}, expires_delta=timedelta(minutes=5))
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
+
+
+@pytest.fixture
+def manager(make_user):
+    return make_user(name="Manager", role="manager")
+
+
+@pytest.fixture
+def manager_headers(manager, auth_headers):
+    return auth_headers(manager)
+
+
+class RecordingSlack:
+    """Stands in for SlackService and keeps what would have been sent"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, channel, text, blocks=None):
+        self.messages.append((channel, text))
+        return {"ok": True}
+
+    async def send_direct_message(self, user_id, text, blocks=None):
+        self.messages.append((user_id, text))
+        return {"ok": True}
+
+
+@pytest.fixture
+async def slack(client):
+    """The Slack client the /slack endpoints use, recording instead of sending"""
+    from app.main import app
+
+    recorder = RecordingSlack()
+    app.dependency_overrides[get_slack_service] = lambda: recorder
+    yield recorder
+    app.dependency_overrides.pop(get_slack_service, None)
+
+
+@pytest.fixture
+def dm_event():
+    """dm_event(slack_user_id, text) is the /slack/events payload for a direct message to the bot"""
+    def event(user_id: str, text: str) -> dict:
+        return {
+            "type": "event_callback",
+            "event": {"type": "message", "channel_type": "im", "user": user_id, "text": text, "channel": "D1"},
+        }
+
+    return event
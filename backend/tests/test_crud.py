@@ -0,0 +1,107 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import crud
+from app.models import Goal, Project, User
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_returns_the_inserted_row(async_db):
+    user = await crud.create(async_db, User, {"name": "Ann", "email": "ann@example.com", "role": "sales"})
+
+    assert user.id is not None
+    assert user.name == "Ann"
+    # Column defaults come back through RETURNING, without a refresh
+    assert user.created_at is not None
+
+
+async def test_create_duplicate_raises_integrity_error(async_db):
+    await crud.create(async_db, User, {"name": "Ann", "email": "ann@example.com"})
+
+    with pytest.raises(IntegrityError):
+        await crud.create(async_db, User, {"name": "Other Ann", "email": "ann@example.com"})
+    await async_db.rollback()
+
+
+async def test_update_returns_the_changed_row(async_db):
+    user = await crud.create(async_db, User, {"name": "Ann", "email": "ann@example.com", "role": "sales"})
+
+    updated = await crud.update(async_db, User, user.id, {"role": "manager"})
+
+    assert updated.id == user.id
+    assert updated.role == "manager"
+    assert updated.email == "ann@example.com"
+
+
+async def test_update_without_values_returns_the_row_unchanged(async_db):
+    user = await crud.create(async_db, User, {"name": "Ann", "email": "ann@example.com"})
+
+    assert (await crud.update(async_db, User, user.id, {})).name == "Ann"
+
+
+async def test_update_and_get_missing_row_return_none(async_db):
+    assert await crud.update(async_db, User, 999, {"name": "Nobody"}) is None
+    assert await crud.get(async_db, User, 999) is None
+
+
+async def test_delete_reports_whether_a_row_was_removed(async_db):
+    user = await crud.create(async_db, User, {"name": "Ann", "email": "ann@example.com"})
+
+    assert await crud.delete(async_db, User, user.id) is True
+    assert await crud.delete(async_db, User, user.id) is False
+
+
+async def test_delete_referenced_row_raises_integrity_error(async_db):
+    user = await crud.create(async_db, User, {"name": "Ann", "email": "ann@example.com"})
+    await crud.create(async_db, Project, {"name": "Q3", "owner_id": user.id})
+
+    with pytest.raises(IntegrityError):
+        await crud.delete(async_db, User, user.id)
+    await async_db.rollback()
+
+
+async def test_page_walks_every_row_once_with_cursors(async_db):
+    for number in range(7):
+        await crud.create(async_db, User, {"name": f"Rep {number}", "email": f"rep{number}@example.com"})
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = await crud.page(async_db, User, 3, cursor)
+        seen += [row.id for row in rows]
+        pages += 1
+        if cursor is None:
+            break
+        assert cursor == rows[-1].id
+
+    assert pages == 3
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 7
+
+
+async def test_page_exact_multiple_has_no_empty_last_page(async_db):
+    for number in range(4):
+        await crud.create(async_db, User, {"name": f"Rep {number}", "email": f"rep{number}@example.com"})
+
+    rows, cursor = await crud.page(async_db, User, 2)
+    rows, cursor = await crud.page(async_db, User, 2, cursor)
+
+    assert len(rows) == 2
+    assert cursor is None
+
+
+async def test_page_filters_ignore_none(async_db):
+    ann = await crud.create(async_db, User, {"name": "Ann", "email": "ann@example.com"})
+    project = await crud.create(async_db, Project, {"name": "Q3", "owner_id": ann.id})
+    for week in (date(2024, 1, 1), date(2024, 1, 8)):
+        await crud.create(async_db, Goal, {
+            "description": "Ten demos", "week_start": week, "owner_id": ann.id, "project_id": project.id
+        })
+
+    rows, _ = await crud.page(async_db, Goal, 10, week_start=date(2024, 1, 8), project_id=None)
+    assert [row.week_start for row in rows] == [date(2024, 1, 8)]
+
+    rows, _ = await crud.page(async_db, Goal, 10, owner_id=ann.id, week_start=None)
+    assert len(rows) == 2
@@ -0,0 +1,65 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def project(client, make_user):
+    owner = make_user(name="Ann")
+    return (await client.post("/projects/", json={"name": "Q3", "owner_id": owner.id})).json()
+
+
+def goal_payload(project, **values):
+    return {"description": "Ten demos", "week_start": "2024-01-08", "owner_id": project["owner_id"],
+            "project_id": project["id"], **values}
+
+
+async def test_create_and_get_goal(client, project):
+    created = await client.post("/goals/", json=goal_payload(project))
+
+    assert created.status_code == 200
+    goal = created.json()
+    assert goal["id"] and goal["achieved"] is False and goal["created_at"]
+    assert (await client.get(f"/goals/{goal['id']}")).json() == goal
+
+
+async def test_create_goal_for_unknown_project_is_400(client, project):
+    response = await client.post("/goals/", json=goal_payload(project, project_id=999))
+
+    assert response.status_code == 400
+
+
+async def test_update_goal_returns_the_changed_row(client, project):
+    goal = (await client.post("/goals/", json=goal_payload(project))).json()
+
+    response = await client.put(f"/goals/{goal['id']}", json={"achieved": True})
+
+    assert response.status_code == 200
+    assert response.json()["achieved"] is True
+    assert response.json()["description"] == "Ten demos"
+
+
+async def test_missing_goal_is_404(client):
+    assert (await client.get("/goals/999")).status_code == 404
+    assert (await client.put("/goals/999", json={"achieved": True})).status_code == 404
+    assert (await client.delete("/goals/999")).status_code == 404
+
+
+async def test_delete_goal(client, project):
+    goal = (await client.post("/goals/", json=goal_payload(project))).json()
+
+    assert (await client.delete(f"/goals/{goal['id']}")).status_code == 200
+    assert (await client.get(f"/goals/{goal['id']}")).status_code == 404
+
+
+async def test_list_goals_filters_and_pages(client, project):
+    for week in ("2024-01-01", "2024-01-08", "2024-01-08", "2024-01-08"):
+        await client.post("/goals/", json=goal_payload(project, week_start=week))
+
+    first = (await client.get("/goals/", params={"week_start": "2024-01-08", "limit": 2})).json()
+    second = (await client.get("/goals/", params={"week_start": "2024-01-08", "limit": 2,
+                                                  "cursor": first["next_cursor"]})).json()
+
+    assert len(first["items"]) == 2 and len(second["items"]) == 1
+    assert second["next_cursor"] is None
+    assert {goal["week_start"] for goal in first["items"] + second["items"]} == {"2024-01-08"}
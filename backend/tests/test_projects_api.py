@@ -0,0 +1,77 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def owner(make_user):
+    return make_user(name="Ann")
+
+
+async def test_create_project_returns_counts(client, owner):
+    response = await client.post("/projects/", json={"name": "Q3", "owner_id": owner.id})
+
+    assert response.status_code == 200
+    project = response.json()
+    assert project["id"] and project["created_at"]
+    assert project["tasks_total"] == 0 and project["goals_total"] == 0
+
+
+async def test_create_project_for_unknown_owner_is_400(client):
+    assert (await client.post("/projects/", json={"name": "Q3", "owner_id": 999})).status_code == 400
+
+
+async def test_get_project_counts_tasks_and_goals(client, owner):
+    project = (await client.post("/projects/", json={"name": "Q3", "owner_id": owner.id})).json()
+    for status in ("Not Started", "Completed", "Completed"):
+        await client.post("/tasks/", json={"title": "Call", "status": status, "owner_id": owner.id,
+                                           "project_id": project["id"]})
+    await client.post("/goals/", json={"description": "Ten demos", "week_start": "2024-01-08", "achieved": True,
+                                       "owner_id": owner.id, "project_id": project["id"]})
+
+    response = await client.get(f"/projects/{project['id']}")
+
+    body = response.json()
+    assert body["tasks_total"] == 3
+    assert body["task_counts"]["Completed"] == 2
+    assert body["goals_total"] == body["goals_achieved"] == 1
+    cached = await client.get(f"/projects/{project['id']}", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+async def test_update_project(client, owner):
+    project = (await client.post("/projects/", json={"name": "Q3", "owner_id": owner.id})).json()
+
+    response = await client.put(f"/projects/{project['id']}", json={"name": "Q4"})
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Q4"
+
+
+async def test_missing_project_is_404(client):
+    assert (await client.get("/projects/999")).status_code == 404
+    assert (await client.put("/projects/999", json={"name": "X"})).status_code == 404
+    assert (await client.delete("/projects/999")).status_code == 404
+
+
+async def test_delete_project_with_tasks_is_409(client, owner):
+    project = (await client.post("/projects/", json={"name": "Q3", "owner_id": owner.id})).json()
+    task = (await client.post("/tasks/", json={"title": "Call", "owner_id": owner.id,
+                                               "project_id": project["id"]})).json()
+
+    assert (await client.delete(f"/projects/{project['id']}")).status_code == 409
+    await client.delete(f"/tasks/{task['id']}")
+    assert (await client.delete(f"/projects/{project['id']}")).status_code == 200
+
+
+async def test_list_projects_pages_newest_first(client, owner):
+    for number in range(3):
+        await client.post("/projects/", json={"name": f"Project {number}", "owner_id": owner.id})
+
+    first = (await client.get("/projects/", params={"limit": 2})).json()
+    second = (await client.get("/projects/", params={"limit": 2, "cursor": first["next_cursor"]})).json()
+
+    ids = [project["id"] for project in first["items"] + second["items"]]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 3
+    assert second["next_cursor"] is None
+    assert (await client.get("/projects/", params={"cursor": "abc"})).status_code == 400
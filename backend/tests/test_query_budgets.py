@@ -0,0 +1,70 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from app.models import Task
+from app.services.sales_agent import SalesAgentService
+from app.services.sales_metrics import week_start_for
+from app.services.scheduler import SalesAgentScheduler
+
+pytestmark = pytest.mark.anyio
+
+WEEK_START = week_start_for(date.today())
+# Statements one rep's progress may take in a per-user job body
+PROGRESS_QUERIES = 3
+# Job ledger bookkeeping _run_per_user adds for each rep: insert its item, then update the item and the run
+LEDGER_QUERIES_PER_USER = 3
+
+
+def add_reps(make_user, start: int, count: int):
+    return [make_user(name=f"Rep {number}") for number in range(start, start + count)]
+
+
+async def test_team_progress_query_budget(client, make_user, db, query_budget):
+    reps = add_reps(make_user, 0, 6)
+    # The sales project already exists in steady state; creating it is a one-off
+    project = SalesAgentService(db).get_or_create_sales_project()
+    for rep, (calls, status) in zip(reps, [(4, "Completed"), (6, "Not Started"), (2, "Completed")]):
+        db.add(Task(title=f"Make {calls} discovery calls", task_type="calls", status=status,
+                    owner_id=rep.id, project_id=project.id, created_at=datetime.combine(WEEK_START, time(9))))
+    db.commit()
+
+    # Reps, the sales project and one grouped query over every rep's tasks
+    with query_budget(3):
+        response = await client.get("/sales/progress/team")
+
+    assert response.status_code == 200
+    rows = response.json()
+    assert len(rows) == 6
+    for row in rows:
+        single = (await client.get(f"/sales/goals/{row['user_id']}/current")).json()
+        assert {key: row[key] for key in single if key != "rank"} == {key: value for key, value in single.items()
+                                                                      if key != "rank"}
+    assert rows[0]["calls_completed"] == 4 and rows[0]["overall_percentage"] == 100.0
+
+
+async def run_progress_job(query_budget, job_id: str):
+    async def handle_user(sales_agent, user):
+        with query_budget(PROGRESS_QUERIES, name=f"user {user.id}"):
+            sales_agent.get_weekly_progress(user.id, WEEK_START)
+        return "skipped"
+
+    # The job repeats its per-user statements by design, so only the total is budgeted here
+    with query_budget(10_000, n_plus_one=None, name="job") as job:
+        run = await SalesAgentScheduler()._run_per_user(
+            job_id, WEEK_START.isoformat(), handle_user, manual=True
+        )
+    return run, job.count
+
+
+async def test_scheduler_per_user_query_budget(make_user, query_budget):
+    add_reps(make_user, 0, 3)
+    run, few = await run_progress_job(query_budget, "three_reps")
+    assert run.skipped == 3 and run.failed == 0
+
+    add_reps(make_user, 3, 3)
+    run, more = await run_progress_job(query_budget, "six_reps")
+    assert run.skipped == 6 and run.failed == 0
+
+    # Each extra rep costs its progress budget plus the ledger bookkeeping, nothing more
+    assert (more - few) / 3 <= PROGRESS_QUERIES + LEDGER_QUERIES_PER_USER, (few, more)
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.models import SalesMetric
+from app.services.sales_metrics import SalesMetricsService, week_start_for
+
+pytestmark = pytest.mark.anyio
+
+WEEK_START = week_start_for(date.today())
+
+
+def rollups(db, user_id):
+    db.expire_all()
+    return db.scalars(select(SalesMetric).where(SalesMetric.user_id == user_id)).all()
+
+
+def test_apply_deltas_upserts_one_row_per_rep_and_week(db, make_user):
+    rep = make_user(name="Ann")
+    metrics = SalesMetricsService(db)
+
+    metrics.apply_deltas(rep.id, WEEK_START, {"calls_attempted": 3})
+    metrics.apply_deltas(rep.id, WEEK_START, {"calls_attempted": 2, "demos_completed": 1})
+    db.commit()
+
+    [row] = rollups(db, rep.id)
+    assert (row.calls_attempted, row.demos_completed) == (5, 1)
+
+
+def test_slack_update_raises_counts_to_the_reported_totals(db, make_user):
+    rep = make_user(name="Ann")
+    metrics = SalesMetricsService(db)
+
+    metrics.record_slack_update(rep.id, "12 calls, 4 connected", WEEK_START)
+    metrics.record_slack_update(rep.id, "only 10 calls so far, 2 demos", WEEK_START)
+    db.commit()
+
+    [row] = rollups(db, rep.id)
+    assert (row.calls_attempted, row.calls_connected, row.demos_completed) == (12, 4, 2)
+
+
+async def test_task_api_changes_update_the_rollup(client, db, make_user):
+    rep = make_user(name="Ann")
+    project = (await client.post("/projects/", json={"name": "Q3", "owner_id": rep.id})).json()
+    task = (await client.post("/tasks/", json={"title": "Make 4 discovery calls", "task_type": "calls",
+                                               "owner_id": rep.id, "project_id": project["id"]})).json()
+
+    await client.post(f"/tasks/{task['id']}/complete")
+
+    [row] = rollups(db, rep.id)
+    assert row.week_start == WEEK_START
+    assert row.calls_attempted == 4
+
+
+async def test_slack_progress_update_updates_the_rollup(client, slack, dm_event, db, make_user):
+    rep = make_user(name="Ann", slack_user_id="UROLLUP1")
+
+    first = await client.post("/slack/events", json=dm_event(rep.slack_user_id, "Progress update: 12 calls, 3 demos"))
+    second = await client.post("/slack/events", json=dm_event(rep.slack_user_id, "Update: 15 calls done"))
+
+    assert first.json() == second.json() == {"status": "progress_updated"}
+    [row] = rollups(db, rep.id)
+    assert row.week_start == WEEK_START
+    assert (row.calls_attempted, row.demos_completed) == (15, 3)
+    assert slack.messages[-1][1].startswith("Thanks for the update!")
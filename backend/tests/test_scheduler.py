@@ -0,0 +1,130 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models import JobRun, JobRunItem, SchedulerLease, TeamLeaderboard
+from app.services.job_ledger import JobLedger
+from app.services.sales_metrics import week_start_for
+from app.services.scheduler import SalesAgentScheduler
+
+pytestmark = pytest.mark.anyio
+
+FRIDAY = date(2024, 1, 12)
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = SalesAgentScheduler()
+    # Scheduled (non-manual) runs only go ahead on the worker holding the lease
+    assert scheduler.lease.try_acquire()
+    scheduler.celebrations = []
+    scheduler.leaderboard_writes = 0
+    store = scheduler._store_weekly_leaderboard
+
+    async def store_weekly_leaderboard(db, leaderboard, week_start):
+        scheduler.leaderboard_writes += 1
+        await store(db, leaderboard, week_start)
+
+    async def send_team_celebration(sales_agent, leaderboard):
+        scheduler.celebrations.append(leaderboard)
+
+    monkeypatch.setattr(scheduler, "_store_weekly_leaderboard", store_weekly_leaderboard)
+    monkeypatch.setattr(scheduler, "_send_team_celebration", send_team_celebration)
+    return scheduler
+
+
+async def test_friday_team_wrapup_runs_once_after_every_timezone(scheduler, make_user, db):
+    make_user(name="Ann", timezone="America/New_York")
+    make_user(name="Ben", timezone="Europe/London")
+
+    await scheduler.friday_summaries(timezone="Europe/London", local_date=FRIDAY)
+    assert scheduler.leaderboard_writes == 0 and scheduler.celebrations == []
+
+    # The last zone's slot, then the repeated 15-minute checks within the catch-up window
+    for _ in range(3):
+        for zone in ("America/New_York", "Europe/London"):
+            await scheduler.friday_summaries(timezone=zone, local_date=FRIDAY)
+
+    assert scheduler.leaderboard_writes == 1
+    assert len(scheduler.celebrations) == 1 and len(scheduler.celebrations[0]) == 2
+    week_start = week_start_for(FRIDAY)
+    assert len(db.scalars(select(TeamLeaderboard).where(TeamLeaderboard.week_start == week_start)).all()) == 2
+    [team_run] = db.scalars(select(JobRun).where(JobRun.job_id == "friday_team")).all()
+    assert (team_run.run_key, team_run.status) == (week_start.isoformat(), "completed")
+
+
+async def test_manual_friday_summaries_refresh_the_leaderboard(scheduler, make_user):
+    make_user(name="Ann", timezone="America/New_York")
+
+    await scheduler.friday_summaries(local_date=FRIDAY)
+    await scheduler.friday_summaries(manual=True, local_date=FRIDAY)
+
+    assert scheduler.leaderboard_writes == len(scheduler.celebrations) == 2
+
+
+def expire_lease(db):
+    """The holder missed its renewals: the lease row is past its expiry"""
+    db.execute(update(SchedulerLease).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+
+def test_lease_takeover_bumps_the_generation(db):
+    first, second = SalesAgentScheduler().lease, SalesAgentScheduler().lease
+
+    assert first.try_acquire() and first.try_acquire() and first.generation == 1
+    assert not second.try_acquire()
+    expire_lease(db)
+
+    assert second.try_acquire() and second.generation == 2
+    assert not first.try_acquire() and not first.is_valid()
+
+
+async def test_leader_that_lost_the_lease_stops_and_its_run_is_resumed(make_user, db):
+    reps = [make_user(name=f"Rep {number}") for number in range(3)]
+    old, new = SalesAgentScheduler(), SalesAgentScheduler()
+    assert old.lease.try_acquire()
+    handled = []
+
+    async def handle_user(sales_agent, user):
+        handled.append(user.id)
+        if len(handled) == 1:
+            # The old leader stalls past its lease while sending; another worker takes over
+            old.lease.expires_at = datetime.utcnow()
+            expire_lease(db)
+            assert new.lease.try_acquire()
+        return "sent"
+
+    assert await old._run_per_user("nudges", "2024-01-08", handle_user) is None
+    assert handled == [reps[0].id]
+
+    ledger = JobLedger()
+    try:
+        [run] = ledger.find_interrupted_runs()
+        assert (run.worker, run.status) == (old.lease.holder_id, "running")
+    finally:
+        ledger.close()
+
+    run = await new._run_per_user("nudges", "2024-01-08", handle_user)
+    assert handled == [rep.id for rep in reps]
+    assert (run.status, run.succeeded, run.resume_count) == ("completed", 3, 1)
+    assert db.scalars(select(JobRunItem.status)).all() == ["sent"] * 3
+
+
+async def test_runs_of_the_live_leader_are_not_resumed(make_user):
+    make_user(name="Ann")
+    scheduler = SalesAgentScheduler()
+    assert scheduler.lease.try_acquire()
+    interrupted = []
+
+    async def handle_user(sales_agent, user):
+        ledger = JobLedger()
+        try:
+            interrupted.extend(ledger.find_interrupted_runs())
+        finally:
+            ledger.close()
+        return "skipped"
+
+    await scheduler._run_per_user("nudges", "2024-01-08", handle_user)
+
+    assert interrupted == []
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.models import MemorySnippet
+from app.services.ai_service import ai_service
+from app.services.conversation_memory import conversation_memory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_direct_message_recalls_and_stores_conversation_memory(client, slack, dm_event, make_user, db,
+                                                                    monkeypatch):
+    rep = make_user(name="Ann", slack_user_id="UMEMORY1")
+    prompts = []
+
+    async def generate_response(prompt, system_message=None):
+        prompts.append(system_message)
+        return "Lead with the ROI calculator when they push back on pricing."
+
+    monkeypatch.setattr(ai_service, "generate_response", generate_response)
+
+    question = "How do I handle pricing objections?"
+    first = await client.post("/slack/events", json=dm_event(rep.slack_user_id, question))
+    assert first.status_code == 200
+    assert first.json() == {"status": "general_handled"}
+    await asyncio.gather(*conversation_memory._background_tasks)
+
+    stored = db.scalars(select(MemorySnippet).where(MemorySnippet.namespace == f"user:{rep.slack_user_id}")).all()
+    assert len(stored) == 1 and "ROI calculator" in stored[0].text
+
+    second = await client.post("/slack/events", json=dm_event(rep.slack_user_id, question))
+    assert second.json() == {"status": "general_handled"}
+    assert "Relevant history" not in prompts[0]
+    assert "ROI calculator" in prompts[1]
+    assert slack.messages[-1] == ("D1", "Lead with the ROI calculator when they push back on pricing.")
+
+
+async def test_reply_to_monday_prompt_sets_the_weeks_goals(client, slack, dm_event, make_user, db):
+    rep = make_user(name="Ann", slack_user_id="UGOALS1")
+
+    sent = await client.post("/slack/agent/send-monday-prompts")
+    assert sent.json()["results"] == [{"user_id": rep.id, "name": "Ann", "success": True}]
+    assert slack.messages[-1][0] == rep.slack_user_id
+
+    reply = await client.post("/slack/events", json=dm_event(rep.slack_user_id, "20 calls, 5 demos and 2 proposals"))
+
+    assert reply.json() == {"status": "goals_recorded"}
+    confirmation = slack.messages[-1][1]
+    assert "**Calls:** 20" in confirmation and "**Demos:** 5" in confirmation and "**Proposals:** 2" in confirmation
+    progress = (await client.get(f"/sales/goals/{rep.id}/current")).json()
+    assert (progress["calls_target"], progress["demos_target"], progress["proposals_target"]) == (20, 5, 2)
+
+    # The prompt is answered, so the next DM is routed on its own merits
+    follow_up = await client.post("/slack/events", json=dm_event(rep.slack_user_id, "Progress update: 4 calls"))
+    assert follow_up.json() == {"status": "progress_updated"}
+
+
+async def test_slash_commands_use_the_reps_session(client, make_user, db):
+    rep = make_user(name="Ann", slack_user_id="UCOMMANDS1")
+    project = (await client.post("/projects/", json={"name": "Q3", "owner_id": rep.id})).json()
+    task = (await client.post("/tasks/", json={"title": "Make 3 calls", "task_type": "calls",
+                                               "owner_id": rep.id, "project_id": project["id"]})).json()
+
+    done = await client.post("/slack/commands", data={"command": "/done", "text": str(task["id"]),
+                                                      "user_id": rep.slack_user_id})
+    progress = await client.post("/slack/commands", data={"command": "/progress", "text": "",
+                                                          "user_id": rep.slack_user_id})
+
+    assert done.json()["text"] == f"✅ Task {task['id']} marked as completed"
+    assert (await client.get(f"/tasks/{task['id']}")).json()["status"] == "Completed"
+    assert progress.json()["text"].startswith("📊 **Your Sales Progress")
+
+
+async def test_slack_summary_serves_the_reps_coaching_tips(client, slack, dm_event, make_user):
+    rep = make_user(name="Ann", slack_user_id="UTIPS1")
+    tips = (await client.get(f"/sales/coaching/{rep.id}/tips")).json()["data"]["tips"]
+    assert tips and not any(tip.startswith("Keep pushing! Focus on your daily activities") for tip in tips)
+
+    response = await client.post("/slack/events", json=dm_event(rep.slack_user_id, "How am I doing this week?"))
+
+    assert response.json() == {"status": "query_handled"}
+    summary = slack.messages[-1][1]
+    assert summary.startswith("📊 **Your Week Progress Summary**")
+    assert all(tip in summary for tip in tips)
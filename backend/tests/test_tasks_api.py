@@ -0,0 +1,75 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def project(client, make_user):
+    owner = make_user(name="Ann")
+    return (await client.post("/projects/", json={"name": "Q3", "owner_id": owner.id})).json()
+
+
+def task_payload(project, **values):
+    return {"title": "Call Acme", "task_type": "calls", "owner_id": project["owner_id"],
+            "project_id": project["id"], **values}
+
+
+async def test_create_and_get_task(client, project):
+    created = await client.post("/tasks/", json=task_payload(project))
+
+    assert created.status_code == 200
+    task = created.json()
+    assert task["id"] and task["status"] == "Not Started" and task["created_at"]
+    assert (await client.get(f"/tasks/{task['id']}")).json()["title"] == "Call Acme"
+
+
+async def test_create_task_for_unknown_owner_is_400(client, project):
+    response = await client.post("/tasks/", json=task_payload(project, owner_id=999))
+
+    assert response.status_code == 400
+
+
+async def test_update_task_returns_the_changed_row(client, project):
+    task = (await client.post("/tasks/", json=task_payload(project))).json()
+
+    response = await client.put(f"/tasks/{task['id']}", json={"status": "Completed"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "Completed"
+    assert response.json()["completed_at"]
+
+
+async def test_missing_task_is_404(client):
+    assert (await client.get("/tasks/999")).status_code == 404
+    assert (await client.put("/tasks/999", json={"title": "X"})).status_code == 404
+    assert (await client.delete("/tasks/999")).status_code == 404
+    assert (await client.post("/tasks/999/complete")).status_code == 404
+
+
+async def test_complete_and_delete_task(client, project):
+    task = (await client.post("/tasks/", json=task_payload(project))).json()
+
+    assert (await client.post(f"/tasks/{task['id']}/complete")).json()["result"] == "updated"
+    assert (await client.post(f"/tasks/{task['id']}/complete")).json()["result"] == "unchanged"
+    assert (await client.delete(f"/tasks/{task['id']}")).status_code == 200
+    assert (await client.get(f"/tasks/{task['id']}")).status_code == 404
+
+
+async def test_list_tasks_pages_newest_first(client, project):
+    for number in range(5):
+        await client.post("/tasks/", json=task_payload(project, title=f"Task {number}"))
+
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "title"}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/tasks/", params=params)).json()
+        ids += [task["id"] for task in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(ids) == len(set(ids)) == 5
+    assert (await client.get("/tasks/", params={"cursor": "not-a-cursor"})).status_code == 400
+    assert (await client.get("/tasks/", params={"fields": "password"})).status_code == 400
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import User
+from app.services.token_cache import token_cache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_user_returns_the_new_row(client, manager_headers):
+    response = await client.post("/users/", json={"name": "Ann", "email": "ann@example.com", "role": "sales"},
+                                 headers=manager_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] and body["email"] == "ann@example.com" and body["created_at"]
+
+
+async def test_create_user_with_taken_email_is_409(client, manager, manager_headers):
+    response = await client.post("/users/", json={"name": "Again", "email": manager.email}, headers=manager_headers)
+
+    assert response.status_code == 409
+
+
+async def test_user_writes_require_a_manager(client, make_user, auth_headers):
+    rep = make_user(name="Ann")
+    other = make_user(name="Bob")
+    headers = auth_headers(rep)
+
+    assert (await client.post("/users/", json={"name": "C", "email": "c@example.com"})).status_code == 401
+    assert (await client.post("/users/", json={"name": "C", "email": "c@example.com"}, headers=headers)).status_code == 403
+    assert (await client.put(f"/users/{other.id}", json={"name": "B"}, headers=headers)).status_code == 403
+    assert (await client.put(f"/users/{rep.id}", json={"role": "admin"}, headers=headers)).status_code == 403
+    assert (await client.delete(f"/users/{other.id}", headers=headers)).status_code == 403
+
+
+async def test_users_may_edit_their_own_profile(client, make_user, auth_headers):
+    rep = make_user(name="Ann")
+
+    response = await client.put(f"/users/{rep.id}", json={"timezone": "America/Denver"}, headers=auth_headers(rep))
+
+    assert response.status_code == 200
+    assert response.json()["timezone"] == "America/Denver"
+    assert response.json()["role"] == "sales"
+
+
+async def test_manager_changes_role(client, make_user, manager_headers):
+    rep = make_user(name="Ann")
+
+    response = await client.put(f"/users/{rep.id}", json={"role": "manager"}, headers=manager_headers)
+
+    assert response.status_code == 200
+    assert response.json()["role"] == "manager"
+    assert (await client.get(f"/users/{rep.id}")).json()["role"] == "manager"
+
+
+async def test_role_change_on_another_worker_reaches_cached_tokens(client, make_user, auth_headers, db,
+                                                                   monkeypatch):
+    boss = make_user(name="Boss", role="manager")
+    headers = auth_headers(boss)
+    monkeypatch.setattr(token_cache, "sync_interval", 0)
+    assert (await client.post("/users/", json={"name": "A", "email": "a@example.com"}, headers=headers)).status_code == 200
+
+    # Another worker demotes them: this worker's cache still holds the manager principal
+    db.get(User, boss.id).role = "sales"
+    db.commit()
+    assert (await client.post("/users/", json={"name": "B", "email": "b@example.com"}, headers=headers)).status_code == 200
+
+    db.get(User, boss.id).auth_changed_at = datetime.utcnow()
+    db.commit()
+    assert (await client.post("/users/", json={"name": "C", "email": "c@example.com"}, headers=headers)).status_code == 403
+
+
+async def test_update_to_taken_email_is_409(client, make_user, manager, manager_headers):
+    rep = make_user(name="Ann")
+
+    response = await client.put(f"/users/{rep.id}", json={"email": manager.email}, headers=manager_headers)
+
+    assert response.status_code == 409
+
+
+async def test_missing_user_is_404(client, manager_headers):
+    assert (await client.get("/users/999")).status_code == 404
+    assert (await client.put("/users/999", json={"name": "X"}, headers=manager_headers)).status_code == 404
+    assert (await client.delete("/users/999", headers=manager_headers)).status_code == 404
+
+
+async def test_delete_user_who_owns_a_project_is_409(client, make_user, manager_headers):
+    rep = make_user(name="Ann")
+    project = await client.post("/projects/", json={"name": "Q3", "owner_id": rep.id})
+    assert project.status_code == 200
+
+    response = await client.delete(f"/users/{rep.id}", headers=manager_headers)
+
+    assert response.status_code == 409
+    assert (await client.get(f"/users/{rep.id}")).status_code == 200
+
+
+async def test_delete_user(client, make_user, manager_headers):
+    rep = make_user(name="Ann")
+
+    assert (await client.delete(f"/users/{rep.id}", headers=manager_headers)).status_code == 200
+    assert (await client.get(f"/users/{rep.id}")).status_code == 404
+
+
+async def test_list_users_pages_by_cursor(client, make_user):
+    for number in range(5):
+        make_user(name=f"Rep {number}", role="sales" if number % 2 else "manager")
+
+    first = (await client.get("/users/", params={"limit": 2})).json()
+    second = (await client.get("/users/", params={"limit": 2, "cursor": first["next_cursor"]})).json()
+    last = (await client.get("/users/", params={"limit": 2, "cursor": second["next_cursor"]})).json()
+
+    ids = [user["id"] for page in (first, second, last) for user in page["items"]]
+    assert ids == sorted(set(ids)) and len(ids) == 5
+    assert last["next_cursor"] is None
+    sales = (await client.get("/users/", params={"role": "sales"})).json()["items"]
+    assert {user["role"] for user in sales} == {"sales"} and len(sales) == 2